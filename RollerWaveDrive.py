@@ -1,12 +1,25 @@
 # Assuming you have not changed the general structure of the template no modification is needed in this file.
+import sys
+import time
+
+# The commands only register their buttons, the builder and the analyses are imported on first use.
+# Startup time and the add-in modules loaded by it are logged, so it is noticed when it grows.
+IMPORT_STARTED = time.perf_counter()
 from . import commands
 from .lib import fusionAddInUtils as futil
 
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
+
 
 def run(context):
     try:
         # This will run the start function in each of your commands as defined in commands/__init__.py
+        started = time.perf_counter()
         commands.start()
+        modules = [name for name in sys.modules if name.startswith(__package__ + '.')]
+        futil.log(f'Startup: imports {IMPORT_SECONDS * 1000:.1f} ms, commands '
+                  f'{(time.perf_counter() - started) * 1000:.1f} ms, {len(modules)} add-in modules loaded, '
+                  f'NumPy {"loaded" if "numpy" in sys.modules else "not loaded"}')
 
     except:
         futil.handle_error('run')
@@ -1,8 +1,10 @@
 # Here you define the commands that will be added to your add-in.
 from .createWaveDrive import entry as createWaveDrive
+from .batchWaveDrive import entry as batchWaveDrive
 
 commands = [
-    createWaveDrive
+    createWaveDrive,
+    batchWaveDrive
 ]
 
 
@@ -0,0 +1,147 @@
+import json
+import math
+import os
+import time
+
+import adsk.core
+import adsk.fusion
+
+from ..createWaveDrive.RollerWaveDriveInstrumentation import BuildRecorder
+from ..createWaveDrive.RollerWaveDriveParams import RollerWaveDriveParams
+from ..createWaveDrive.RollerWaveDriveSpec import load_spec
+from ... import config
+from ...lib import fusionAddInUtils as futil
+
+app = adsk.core.Application.get()
+ui = app.userInterface
+
+CMD_ID = f'{config.COMPANY_NAME}_{config.ADDIN_NAME}_waveDriveBatch'
+CMD_NAME = 'Wave Drive Batch'
+CMD_Description = 'Create a family of wave drives from a CSV or JSON specification'
+
+IS_PROMOTED = False
+
+WORKSPACE_ID = 'FusionSolidEnvironment'
+PANEL_ID = 'OncenweekAddinsPanel'
+
+ICON_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'createWaveDrive',
+                           'resources', '')
+
+# Gap between the bodies of neighbouring drives in the grid
+GRID_GAP = 1.0
+
+local_handlers = []
+
+
+# Executed when add-in is run.
+def start():
+    cmd_def = ui.commandDefinitions.itemById(CMD_ID)
+    if not cmd_def:
+        cmd_def = ui.commandDefinitions.addButtonDefinition(CMD_ID, CMD_NAME, CMD_Description, ICON_FOLDER)
+    futil.add_handler(cmd_def.commandCreated, command_created)
+
+    # The panel is shared with the wave drive dialog, whichever starts first creates it
+    workspace = ui.workspaces.itemById(WORKSPACE_ID)
+    panels = workspace.toolbarPanels
+    panel = panels.itemById(PANEL_ID)
+    if not panel:
+        panel = panels.add(PANEL_ID, 'ROLLER WAVE DRIVE', 'SelectPanel', False)
+
+    control = panel.controls.itemById(CMD_ID)
+    if not control:
+        control = panel.controls.addCommand(cmd_def)
+    control.isPromoted = IS_PROMOTED
+
+
+# Executed when add-in is stopped.
+def stop():
+    workspace = ui.workspaces.itemById(WORKSPACE_ID)
+    panel = workspace.toolbarPanels.itemById(PANEL_ID)
+    command_control = panel.controls.itemById(CMD_ID) if panel else None
+    command_definition = ui.commandDefinitions.itemById(CMD_ID)
+
+    if command_control:
+        command_control.deleteMe()
+
+    if command_definition:
+        command_definition.deleteMe()
+
+    # The last command to stop removes the shared panel
+    if panel and panel.controls.count == 0:
+        panel.deleteMe()
+
+
+# The command has no inputs, so execute is called right after this event.
+def command_created(args: adsk.core.CommandCreatedEventArgs):
+    futil.log(f'{CMD_NAME} Command Created Event')
+
+    futil.add_handler(args.command.execute, command_execute, local_handlers=local_handlers)
+    futil.add_handler(args.command.destroy, command_destroy, local_handlers=local_handlers)
+
+
+def command_execute(args: adsk.core.CommandEventArgs):
+    futil.log(f'{CMD_NAME} Command Execute Event')
+
+    dialog = ui.createFileDialog()
+    dialog.title = 'Select wave drive specification'
+    dialog.filter = 'Wave drive specification (*.csv *.json);;All files (*.*)'
+    if dialog.showOpen() != adsk.core.DialogResults.DialogOK:
+        return
+
+    try:
+        drives = load_spec(dialog.filename)
+    except ValueError as e:
+        ui.messageBox(str(e))
+        return
+
+    design = adsk.fusion.Design.cast(app.activeProduct)
+    build_drives(design, drives)
+
+
+def build_drives(design: adsk.fusion.Design, drives: list):
+    # Imported on first use, they pull in NumPy
+    from ..createWaveDrive import RollerWaveDriveBuilder as builder
+    from ..createWaveDrive import RollerWaveDriveCache as cache
+
+    if not drives:
+        futil.log(f'{CMD_NAME} No drives to build')
+        return
+
+    root = design.rootComponent
+    columns = max(1, math.ceil(math.sqrt(len(drives))))
+    # The wheel sketch circle has a radius of body_diameter
+    pitch = max(params.body_diameter for params in drives) * 2 + GRID_GAP
+
+    # The design compute is not deferred: the builder names the bodies of its features and finds faces on
+    # them, which only exist once the feature is computed. The builder defers the compute of the sketches
+    # it draws many curves in.
+    reports = []
+    started = time.perf_counter()
+    for i, params in enumerate(drives):
+        drive_started = time.perf_counter()
+        transform = adsk.core.Matrix3D.create()
+        transform.translation = adsk.core.Vector3D.create((i % columns) * pitch, -(i // columns) * pitch, 0)
+        component = root.occurrences.addNewComponent(transform).component
+        component.name = 'RollerWaveDrive-1-to-{}'.format(params.roller_number)
+
+        start_index = design.timeline.count - 1
+        recorder = BuildRecorder(design, component, futil.log) if config.PROFILE_BUILD else None
+        drive_geometry = cache.drive_geometry(params, config.CACHE_PATH) if config.GEOMETRY_CACHE else None
+        builder.build(params, component, component.xYConstructionPlane, recorder, drive_geometry)
+        design.timeline.timelineGroups.add(start_index, design.timeline.count - 1)
+        if recorder is not None:
+            reports.append(recorder.report(component=component.name,
+                                           params=dict(zip(RollerWaveDriveParams.ARGUMENTS, params.key))))
+        futil.log(f'{CMD_NAME} {i + 1}/{len(drives)} {component.name} '
+                  f'built in {time.perf_counter() - drive_started:.2f} s')
+
+    futil.log(f'{CMD_NAME} Built {len(drives)} drives in {time.perf_counter() - started:.2f} s')
+    if config.PROFILE_BUILD:
+        with open(config.BUILD_PROFILE_PATH, 'w') as file:
+            json.dump({'drives': reports}, file, indent=2)
+
+
+def command_destroy(args: adsk.core.CommandEventArgs):
+    futil.log(f'{CMD_NAME} Command Destroy Event')
+    global local_handlers
+    local_handlers = []
@@ -0,0 +1,217 @@
+# Counts Fusion API calls and created objects of a build. Runs without Fusion on the recording
+# stand-in from lib/fakeAdsk:
+#
+#   cd commands
+#   python -m createWaveDrive.RollerWaveDriveApiBenchmark --output api_benchmark.json
+#
+# Call and object counts are deterministic, so a baseline report catches changes that multiply
+# the features, sketches or timeline items of a drive. The edits change the roller number of a built
+# drive, which rebuilds it, and check that the timeline group of the edit covers the new items only.
+import argparse
+import collections
+import json
+import math
+import os
+import platform
+import sys
+import time
+
+from .RollerWaveDriveBenchmark import make_params
+from .RollerWaveDriveInstrumentation import BuildRecorder
+
+FAKE_ADSK_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'lib', 'fakeAdsk')
+
+ROLLER_NUMBERS = (5, 17, 40, 100)
+MODES = {
+    'rollers': {},
+    'rollers-consolidated': {'consolidate_sketches': True},
+    'balls': {'use_balls': True},
+    'balls-patterned': {'use_balls': True, 'pattern_balls': True},
+    'balls-patterned-consolidated': {'use_balls': True, 'pattern_balls': True, 'consolidate_sketches': True},
+    'adaptive': {'profile_tolerance': 0.001},
+    'arcs': {'use_arcs': True, 'profile_tolerance': 0.001},
+}
+EDITS = ((17, 11), (17, 23), (5, 17))
+# Roller number, built and edited tool radius of the in place toolpath edits
+TOOL_EDITS = ((17, 0.01, 0.02), (40, 0.02, 0.05))
+COUNTED = ('calls', 'sketches', 'features', 'construction_planes', 'construction_axes', 'bodies', 'timeline')
+TOP_CALLS = 10
+
+
+def load_adsk():
+    # The real module wins when running inside Fusion
+    if 'adsk' not in sys.modules:
+        sys.path.insert(0, os.path.abspath(FAKE_ADSK_PATH))
+    import adsk
+    if not hasattr(adsk, 'calls'):
+        raise RuntimeError('the API benchmark needs the recording adsk from lib/fakeAdsk')
+    return adsk
+
+
+def run_case(roller_number: int, mode: str) -> dict:
+    adsk = load_adsk()
+    import adsk.core
+    import adsk.fusion
+    from . import RollerWaveDriveBuilder as builder
+
+    params = make_params(roller_number)
+    params = params.replace(body_diameter=params.cycloid_diameter, **MODES[mode])
+    design = adsk.fusion.Design()
+    component = design.rootComponent.occurrences.addNewComponent(adsk.core.Matrix3D.create()).component
+    recorder = BuildRecorder(design, component, log=lambda message: None)
+
+    adsk.reset()
+    started = time.perf_counter()
+    builder.build(params, component, component.xYConstructionPlane, recorder)
+    seconds = time.perf_counter() - started
+
+    calls = collections.Counter(name for name, _, _ in adsk.calls)
+    case = {'roller_number': roller_number, 'mode': mode, 'calls': len(adsk.calls), 'build_ms': seconds * 1000}
+    case.update(recorder.counts())
+    case['top_calls'] = dict(calls.most_common(TOP_CALLS))
+    case['stages'] = recorder.stages
+    return case
+
+
+def run_edit(built_rollers: int, edited_rollers: int, mode: str) -> dict:
+    # Edits a built drive like the command dialog does, the rebuilt drive must match a fresh build
+    adsk = load_adsk()
+    import adsk.core
+    import adsk.fusion
+    from . import RollerWaveDriveBuilder as builder
+    from . import RollerWaveDriveUpdate as update
+
+    def drive_params(roller_number):
+        params = make_params(roller_number)
+        return params.replace(body_diameter=params.cycloid_diameter, **MODES[mode])
+
+    fresh = adsk.fusion.Design()
+    component = fresh.rootComponent.occurrences.addNewComponent(adsk.core.Matrix3D.create()).component
+    builder.build(drive_params(edited_rollers), component, component.xYConstructionPlane)
+
+    design = adsk.fusion.Design()
+    component = design.rootComponent.occurrences.addNewComponent(adsk.core.Matrix3D.create()).component
+    builder.build(drive_params(built_rollers), component, component.xYConstructionPlane)
+    _, start_index = update.update(drive_params(edited_rollers), component)
+    end_index = design.timeline.count - 1
+
+    errors = []
+    if start_index is None:
+        errors.append('updated in place instead of rebuilt')
+    elif not 0 <= start_index <= end_index:
+        errors.append('timeline group {}..{} outside of the timeline'.format(start_index, end_index))
+    elif end_index - start_index != fresh.timeline.count - 2:
+        errors.append('timeline group {}..{} holds {} items, a fresh build has {}'.format(
+            start_index, end_index, end_index - start_index + 1, fresh.timeline.count - 1))
+    if design.timeline.count != fresh.timeline.count:
+        errors.append('{} timeline items, a fresh build has {}'.format(design.timeline.count, fresh.timeline.count))
+    return {'built_rollers': built_rollers, 'edited_rollers': edited_rollers, 'mode': mode,
+            'start_index': start_index, 'end_index': end_index, 'errors': errors}
+
+
+def run_tool_edit(roller_number: int, built_radius: float, edited_radius: float) -> dict:
+    # Another tool radius updates the drive in place, the toolpath sketch must keep its timeline item and
+    # match a fresh build
+    adsk = load_adsk()
+    import adsk.core
+    import adsk.fusion
+    from . import RollerWaveDriveBuilder as builder
+    from . import RollerWaveDriveUpdate as update
+
+    def drive_params(tool_radius):
+        params = make_params(roller_number)
+        return params.replace(body_diameter=params.cycloid_diameter, tool_radius=tool_radius)
+
+    def fit_points(component):
+        splines = component.sketches.itemByName('WheelToolpath').sketchCurves.sketchFittedSplines
+        return [(point.geometry.x, point.geometry.y) for spline in splines for point in spline.fitPoints]
+
+    fresh = adsk.fusion.Design()
+    fresh_component = fresh.rootComponent.occurrences.addNewComponent(adsk.core.Matrix3D.create()).component
+    builder.build(drive_params(edited_radius), fresh_component, fresh_component.xYConstructionPlane)
+
+    design = adsk.fusion.Design()
+    component = design.rootComponent.occurrences.addNewComponent(adsk.core.Matrix3D.create()).component
+    builder.build(drive_params(built_radius), component, component.xYConstructionPlane)
+    index = component.sketches.itemByName('WheelToolpath').timelineObject.index
+    _, start_index = update.update(drive_params(edited_radius), component)
+
+    errors = []
+    if start_index is not None:
+        errors.append('rebuilt instead of updated in place')
+    toolpath = component.sketches.itemByName('WheelToolpath')
+    if toolpath.timelineObject.index != index:
+        errors.append('toolpath sketch moved from timeline item {} to {}'.format(index,
+                                                                                 toolpath.timelineObject.index))
+    expected, points = fit_points(fresh_component), fit_points(component)
+    if len(points) != len(expected) or any(math.hypot(x - ex, y - ey) > 1e-9
+                                           for (x, y), (ex, ey) in zip(points, expected)):
+        errors.append('toolpath differs from a fresh build')
+    return {'roller_number': roller_number, 'built_radius': built_radius, 'edited_radius': edited_radius,
+            'errors': errors}
+
+
+def run(roller_numbers=ROLLER_NUMBERS, modes=tuple(MODES), edits=EDITS, tool_edits=TOOL_EDITS) -> dict:
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'cases': [run_case(roller_number, mode) for roller_number in roller_numbers for mode in modes],
+        'edits': [run_edit(built, edited, mode) for built, edited in edits for mode in modes],
+        'tool_edits': [run_tool_edit(*edit) for edit in tool_edits],
+    }
+
+
+def compare(report: dict, baseline: dict, slack: float) -> list:
+    expected = {(case['roller_number'], case['mode']): case for case in baseline['cases']}
+    regressions = []
+    for case in report['cases']:
+        old = expected.get((case['roller_number'], case['mode']))
+        if old is None:
+            continue
+        for key in COUNTED:
+            if case[key] > old[key] * (1 + slack):
+                regressions.append('{} {}: {} {} -> {}'.format(case['roller_number'], case['mode'], key, old[key],
+                                                               case[key]))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Count Fusion API calls of the wave drive build')
+    parser.add_argument('--output', default='api_benchmark.json', help='path of the JSON report')
+    parser.add_argument('--baseline', help='report to compare the results with')
+    parser.add_argument('--slack', type=float, default=0.0, help='allowed relative growth against the baseline')
+    parser.add_argument('--rollers', type=int, nargs='+', default=ROLLER_NUMBERS)
+    parser.add_argument('--modes', nargs='+', choices=tuple(MODES), default=tuple(MODES))
+    parser.add_argument('--no-edits', action='store_true', help='skip the edit checks')
+    args = parser.parse_args(argv)
+
+    report = run(args.rollers, args.modes, () if args.no_edits else EDITS, () if args.no_edits else TOOL_EDITS)
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+
+    for case in report['cases']:
+        print('{roller_number:4d} {mode:30s} {calls:6d} calls {sketches:3d} sketches {features:3d} features '
+              '{bodies:4d} bodies {timeline:3d} timeline {build_ms:8.1f} ms'.format(**case))
+    failed = [edit for edit in report['edits'] if edit['errors']]
+    for edit in failed:
+        print('EDIT {built_rollers} -> {edited_rollers} {mode}: '.format(**edit) + '; '.join(edit['errors']))
+    if report['edits'] and not failed:
+        print('{} edits rebuilt with matching timeline groups'.format(len(report['edits'])))
+    failed_tools = [edit for edit in report['tool_edits'] if edit['errors']]
+    for edit in failed_tools:
+        print('TOOL EDIT {roller_number} {built_radius} -> {edited_radius}: '.format(**edit)
+              + '; '.join(edit['errors']))
+    if report['tool_edits'] and not failed_tools:
+        print('{} tool radius edits updated in place'.format(len(report['tool_edits'])))
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(report, json.load(file), args.slack)
+        for regression in regressions:
+            print('REGRESSION ' + regression)
+    return 1 if regressions or failed or failed_tools else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
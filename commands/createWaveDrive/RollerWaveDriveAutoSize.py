@@ -0,0 +1,287 @@
+# Smallest drive for a reduction ratio within an envelope, around a cam bearing and with a minimum
+# clearance. Candidates are roller number, roller diameter and eccentricity factor combinations. The
+# eccentric bearing has to keep the clearance around the input shaft, which bounds the eccentricity.
+# For each candidate the cycloid diameter is the smallest one meeting
+#   - the dialog check, internal radius at least min_cycloid_radius,
+#   - room for the bearing in the cam, cam radius at least bearing radius + clearance,
+#   - neighbouring rollers apart by the clearance over the whole revolution,
+#   - a wheel profile without loops for rollers grown by the clearance.
+# The first two are closed form lower bounds. The other two only get easier with a larger cycloid
+# diameter, so the smallest diameter meeting them is found by bisection, batched over candidates.
+# Candidates are visited in order of their lower bound, the search stops as soon as no remaining
+# candidate can be smaller than the best one, or when the time budget is spent.
+#
+# All of these favour small rollers and a small eccentricity, so on its own the search returns the
+# smallest roller diameter and eccentricity factor allowed. What keeps the rollers from shrinking is
+# their load: with a StressLimit a candidate only wins if the peak contact stress of RollerWaveDriveLoad
+# under the torque stays below the limit at its cycloid diameter (NumPy required).
+#
+#   cd commands
+#   python -m createWaveDrive.RollerWaveDriveAutoSize --ratio 30 --envelope 80 --bearing-outer-diameter 21
+#   python -m createWaveDrive.RollerWaveDriveAutoSize --ratio 30 --envelope 80 --torque 20 --max-stress 1500
+import argparse
+import math
+import sys
+import time
+from typing import List, NamedTuple, Optional, Sequence
+
+from . import RollerWaveDriveGeometry as geometry
+from .RollerWaveDriveParams import RollerWaveDriveParams
+from .RollerWaveDriveSpec import MM
+
+BUDGET = 0.2
+ECCENTRICITY_FACTORS = tuple(0.1 + 0.025 * i for i in range(13))
+ROLLER_DIAMETER_STEP = 0.05
+MAX_ROLLER_DIAMETERS = 64
+# Samples of one lobe for the roller distance and profile checks
+LOBE_SAMPLES = 64
+BISECTION_STEPS = 24
+# Candidates checked at once, plain python batches are kept small to meet the budget
+BATCH = 64
+PYTHON_BATCH = 8
+# Wall between the wheel profile and the outside of the body, like the body diameter of the params
+RIM = 0.2
+# The dialog takes the cycloid diameter rounded up to this
+CYCLOID_STEP = 0.001
+# Input steps of the stress check
+STRESS_STEPS = 64
+
+
+class StressLimit(NamedTuple):
+    torque: float  # output torque, newton meters
+    max_stress: float  # largest contact stress allowed, pascals
+    roller_height: float = 0.6  # length of cylindrical rollers
+    use_balls: bool = False
+
+
+class Candidate(NamedTuple):
+    roller_number: int
+    roller_diameter: float
+    eccentricity_factor: float
+    lower_bound: float  # smallest cycloid diameter of the closed form constraints
+
+
+class AutoSize(NamedTuple):
+    roller_number: int
+    roller_diameter: float
+    eccentricity_factor: float
+    cycloid_diameter: float
+    outer_size: float  # body diameter of the params
+    candidates: int  # candidates checked
+    complete: bool  # False when the budget ran out before the search space was exhausted
+
+
+def lower_bound(roller_number: int, roller_diameter: float, eccentricity_factor: float,
+                bearing_outer_diameter: float, clearance: float) -> float:
+    eccentricity = eccentricity_factor * roller_diameter
+    min_cycloid_radius = 1.03 * roller_diameter / math.sin(math.pi / (roller_number + 1))
+    return max(min_cycloid_radius + 2 * eccentricity,
+               bearing_outer_diameter / 2 + clearance + eccentricity + roller_diameter)
+
+
+def candidates(roller_numbers: Sequence[int], roller_diameters: Sequence[float],
+               eccentricity_factors: Sequence[float], bearing_outer_diameter: float, clearance: float,
+               max_cycloid_diameter: float, max_eccentricity: float = math.inf) -> List[Candidate]:
+    # Combinations that may fit the envelope, smallest lower bound first and larger rollers first on ties
+    result = []
+    for roller_number in roller_numbers:
+        for roller_diameter in roller_diameters:
+            for eccentricity_factor in eccentricity_factors:
+                if eccentricity_factor * roller_diameter > max_eccentricity:
+                    continue
+                bound = lower_bound(roller_number, roller_diameter, eccentricity_factor, bearing_outer_diameter,
+                                    clearance)
+                if bound <= max_cycloid_diameter:
+                    result.append(Candidate(roller_number, roller_diameter, eccentricity_factor, bound))
+    result.sort(key=lambda candidate: (candidate.lower_bound, -candidate.roller_diameter))
+    return result
+
+
+def running_feasible(roller_numbers, roller_diameters, eccentricity_factors, cycloid_diameters, clearance: float):
+    # Per candidate: neighbouring rollers keep the clearance and the profile of rollers grown by the
+    # clearance has no loops. The roller centers repeat every lobe, so one lobe is sampled.
+    np = geometry.np
+    if np is None:
+        return [python_running_feasible(*candidate, clearance) for candidate in
+                zip(roller_numbers, roller_diameters, eccentricity_factors, cycloid_diameters)]
+
+    roller_numbers = np.asarray(roller_numbers)[:, None]
+    roller_diameters = np.asarray(roller_diameters, dtype=float)[:, None]
+    eccentricity = np.asarray(eccentricity_factors, dtype=float)[:, None] * roller_diameters
+    contact_radius = np.asarray(cycloid_diameters, dtype=float)[:, None] - eccentricity - roller_diameters / 2
+    num_dimples = roller_numbers + 1
+    thetas = 2 * math.pi / num_dimples * np.arange(LOBE_SAMPLES + 1) / LOBE_SAMPLES
+
+    def centers(angles):
+        offset = eccentricity * np.sin(num_dimples * angles)
+        s = np.sqrt(np.maximum(contact_radius ** 2 - offset ** 2, 0.0))
+        l = eccentricity * np.cos(num_dimples * angles) + s
+        return l * np.sin(angles), l * np.cos(angles), np.arctan2(num_dimples * offset, s)
+
+    x, y, xi = centers(thetas)
+    next_x, next_y, _ = centers(thetas + 2 * math.pi / roller_numbers)
+    gap_ok = (np.hypot(next_x - x, next_y - y) - roller_diameters).min(axis=1) >= clearance
+
+    grown = roller_diameters / 2 + clearance
+    ex, ey = x + grown * np.sin(thetas + xi), y + grown * np.cos(thetas + xi)
+    forward = np.diff(ex) * np.diff(x) + np.diff(ey) * np.diff(y)
+    return gap_ok & (forward > 0).all(axis=1)
+
+
+def python_running_feasible(roller_number: int, roller_diameter: float, eccentricity_factor: float,
+                            cycloid_diameter: float, clearance: float) -> bool:
+    eccentricity = eccentricity_factor * roller_diameter
+    contact_radius = cycloid_diameter - eccentricity - roller_diameter / 2
+    num_dimples = roller_number + 1
+    grown = roller_diameter / 2 + clearance
+
+    def center(angle: float) -> tuple:
+        offset = eccentricity * math.sin(num_dimples * angle)
+        s = math.sqrt(max(contact_radius ** 2 - offset ** 2, 0.0))
+        l = eccentricity * math.cos(num_dimples * angle) + s
+        return l * math.sin(angle), l * math.cos(angle), math.atan2(num_dimples * offset, s)
+
+    previous = None
+    for i in range(LOBE_SAMPLES + 1):
+        angle = 2 * math.pi / num_dimples * i / LOBE_SAMPLES
+        x, y, xi = center(angle)
+        next_x, next_y, _ = center(angle + 2 * math.pi / roller_number)
+        if math.hypot(next_x - x, next_y - y) - roller_diameter < clearance:
+            return False
+        ex, ey = x + grown * math.sin(angle + xi), y + grown * math.cos(angle + xi)
+        if previous is not None:
+            px, py, pex, pey = previous
+            if (ex - pex) * (x - px) + (ey - pey) * (y - py) <= 0:
+                return False
+        previous = x, y, ex, ey
+    return True
+
+
+def smallest_cycloid_diameters(batch: List[Candidate], clearance: float, max_cycloid_diameter: float) -> list:
+    # Smallest feasible cycloid diameter of every candidate, None when even the envelope is too small
+    columns = (
+        [candidate.roller_number for candidate in batch],
+        [candidate.roller_diameter for candidate in batch],
+        [candidate.eccentricity_factor for candidate in batch],
+    )
+    low = [candidate.lower_bound for candidate in batch]
+    high = [max_cycloid_diameter] * len(batch)
+    at_low = running_feasible(*columns, low, clearance)
+    at_high = running_feasible(*columns, high, clearance)
+    # Bisection is only needed where the bound is infeasible and the envelope is not
+    steps = BISECTION_STEPS if any(ok_high and not ok_low for ok_low, ok_high in zip(at_low, at_high)) else 0
+    for _ in range(steps):
+        middle = [(a + b) / 2 for a, b in zip(low, high)]
+        feasible = running_feasible(*columns, middle, clearance)
+        high = [m if ok else b for m, b, ok in zip(middle, high, feasible)]
+        low = [a if ok else m for m, a, ok in zip(middle, low, feasible)]
+    return [candidate.lower_bound if ok_low else (b if ok_high else None)
+            for candidate, ok_low, ok_high, b in zip(batch, at_low, at_high, high)]
+
+
+def within_stress(candidate: Candidate, cycloid_diameter: float, bearing_outer_diameter: float,
+                  stress: StressLimit) -> bool:
+    from . import RollerWaveDriveLoad as load
+    params = RollerWaveDriveParams(candidate.roller_diameter, candidate.roller_number, stress.use_balls,
+                                   stress.roller_height, False, cycloid_diameter, 0, 0, 0, bearing_outer_diameter, 0,
+                                   0, eccentricity_factor=candidate.eccentricity_factor)
+    return load.peak_stress(params, stress.torque, STRESS_STEPS) <= stress.max_stress
+
+
+def auto_size(ratio: int, envelope: float, bearing_outer_diameter: float, clearance: float,
+              min_roller_diameter: float, ratio_tolerance: float = 0.0,
+              eccentricity_factors: Sequence[float] = ECCENTRICITY_FACTORS, budget: float = BUDGET,
+              bearing_inner_diameter: float = None, shaft_diameter: float = 0.0,
+              stress: StressLimit = None) -> Optional[AutoSize]:
+    # envelope is the largest body diameter of the params, the roller number is the ratio within ratio_tolerance.
+    # With the bearing inner diameter the shaft keeps the clearance inside the eccentric bearing.
+    started = time.perf_counter()
+    if stress is not None:
+        geometry.require_numpy('the stress limit of the auto size')
+    max_cycloid_diameter = envelope - RIM
+    max_eccentricity = math.inf
+    if bearing_inner_diameter is not None:
+        max_eccentricity = bearing_inner_diameter / 2 - shaft_diameter / 2 - clearance
+    roller_numbers = [n for n in range(max(5, math.floor(ratio * (1 - ratio_tolerance))),
+                                       math.ceil(ratio * (1 + ratio_tolerance)) + 1)
+                      if abs(n - ratio) <= ratio * ratio_tolerance]
+    roller_diameters = [min_roller_diameter + ROLLER_DIAMETER_STEP * i for i in range(MAX_ROLLER_DIAMETERS)]
+    queue = candidates(roller_numbers, roller_diameters, eccentricity_factors, bearing_outer_diameter, clearance,
+                       max_cycloid_diameter, max_eccentricity)
+
+    batch_size = BATCH if geometry.np is not None else PYTHON_BATCH
+    best = None
+    checked = 0
+    while checked < len(queue):
+        if best is not None and queue[checked].lower_bound > best.cycloid_diameter:
+            break
+        if time.perf_counter() - started > budget:
+            break
+        batch = queue[checked:checked + batch_size]
+        checked += len(batch)
+        for candidate, cycloid_diameter in zip(batch, smallest_cycloid_diameters(batch, clearance,
+                                                                                  max_cycloid_diameter)):
+            if cycloid_diameter is None:
+                continue
+            cycloid_diameter = min(math.ceil(cycloid_diameter / CYCLOID_STEP) * CYCLOID_STEP, max_cycloid_diameter)
+            if best is None or (cycloid_diameter, -candidate.roller_diameter) < (best.cycloid_diameter,
+                                                                                  -best.roller_diameter):
+                # Only candidates that would win are solved for their load
+                if stress is not None and not within_stress(candidate, cycloid_diameter, bearing_outer_diameter,
+                                                            stress):
+                    continue
+                best = AutoSize(candidate.roller_number, candidate.roller_diameter, candidate.eccentricity_factor,
+                                cycloid_diameter, cycloid_diameter + RIM, 0, False)
+
+    if best is None:
+        return None
+    complete = checked == len(queue) or queue[checked].lower_bound > best.cycloid_diameter
+    return best._replace(candidates=checked, complete=complete)
+
+
+def apply(params: RollerWaveDriveParams, result: AutoSize) -> RollerWaveDriveParams:
+    return params.replace(rollers_number=result.roller_number, roller_diameter=result.roller_diameter,
+                          eccentricity_factor=result.eccentricity_factor, cycloid_diameter=result.cycloid_diameter,
+                          use_minimal_diameter=False)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Find the smallest wave drive for a ratio')
+    parser.add_argument('--ratio', type=int, default=17)
+    parser.add_argument('--ratio-tolerance', type=float, default=0.0, help='relative deviation allowed')
+    parser.add_argument('--envelope', type=float, default=80, help='millimeters, largest body diameter')
+    parser.add_argument('--bearing-outer-diameter', type=float, default=21, help='millimeters')
+    parser.add_argument('--bearing-inner-diameter', type=float, default=12, help='millimeters')
+    parser.add_argument('--shaft-diameter', type=float, default=5, help='millimeters')
+    parser.add_argument('--clearance', type=float, default=0.1, help='millimeters')
+    parser.add_argument('--min-roller-diameter', type=float, default=3, help='millimeters')
+    parser.add_argument('--torque', type=float, help='output torque of the stress limit, newton meters')
+    parser.add_argument('--max-stress', type=float, help='largest contact stress allowed, megapascals')
+    parser.add_argument('--roller-height', type=float, default=6, help='millimeters, for the stress limit')
+    parser.add_argument('--use-balls', action='store_true', help='balls for the stress limit')
+    parser.add_argument('--budget', type=float, default=BUDGET, help='seconds')
+    args = parser.parse_args(argv)
+    if (args.torque is None) != (args.max_stress is None):
+        parser.error('--torque and --max-stress go together')
+    stress = None
+    if args.torque is not None:
+        stress = StressLimit(args.torque, args.max_stress * 1e6, args.roller_height * MM, args.use_balls)
+
+    started = time.perf_counter()
+    result = auto_size(args.ratio, args.envelope * MM, args.bearing_outer_diameter * MM, args.clearance * MM,
+                       args.min_roller_diameter * MM, args.ratio_tolerance, budget=args.budget,
+                       bearing_inner_diameter=args.bearing_inner_diameter * MM,
+                       shaft_diameter=args.shaft_diameter * MM, stress=stress)
+    seconds = time.perf_counter() - started
+    if result is None:
+        print('No drive fits in {:.3f} s'.format(seconds))
+        return 1
+    print('{} rollers of {:.2f} mm, eccentricity factor {:.3f}, cycloid diameter {:.2f} mm, body diameter '
+          '{:.2f} mm'.format(result.roller_number, result.roller_diameter / MM, result.eccentricity_factor,
+                             result.cycloid_diameter / MM, result.outer_size / MM))
+    print('{} candidates in {:.3f} s{}'.format(result.candidates, seconds, '' if result.complete else ', incomplete'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+# Accuracy and speed benchmark of the wheel profile. Runs without Fusion:
+#
+#   cd commands
+#   python -m createWaveDrive.RollerWaveDriveBenchmark --output profile_benchmark.json
+#
+# For every case the sampled profile is reconstructed with a Catmull-Rom spline (knots at
+# the sampling angles) and compared with the exact curve. The deviation the geometry reports
+# for the sampling must not be less than the measured one. Adaptive cases also report the
+# points of the fewest equal segments per lobe within the same tolerance.
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+
+from . import RollerWaveDriveGeometry as geometry
+from .RollerWaveDriveParams import RollerWaveDriveParams
+
+ROLLER_NUMBERS = (5, 10, 17, 25, 40, 60, 80, 100)
+POINTS_PER_LOBE = (4, 8, 16, 32)
+TOLERANCES = (0.001, 0.0001)
+ROLLER_DIAMETER = 0.6
+
+RECONSTRUCTION_SAMPLES = 16
+EXACT_SAMPLES = 48
+TIMING_REPEATS = 5
+
+
+def make_params(roller_number: int, profile_tolerance: float = 0.0) -> RollerWaveDriveParams:
+    def create(cycloid_diameter: float) -> RollerWaveDriveParams:
+        return RollerWaveDriveParams(ROLLER_DIAMETER, roller_number, False, ROLLER_DIAMETER, True, cycloid_diameter,
+                                     0.5, 0.01, 0.0, 2.1, 1.2, 0.5, profile_tolerance=profile_tolerance)
+
+    # Same value as "Use minimal cycloid diameter" in the dialog
+    return create(create(0.0).min_cycloid_radius * 2)
+
+
+def reconstruction_deviation(params: RollerWaveDriveParams, thetas, xs, ys):
+    # Distance from every reconstructed point to a dense polyline of the exact curve over
+    # the same segment, padded by half a segment on both sides.
+    np = geometry.np
+    thetas = np.asarray(thetas, dtype=float)
+    rx, ry = geometry.catmull_rom(thetas, np.asarray(xs), np.asarray(ys), RECONSTRUCTION_SAMPLES)
+
+    ends = np.append(thetas[1:], thetas[0] + 2 * math.pi)
+    widths = ends - thetas
+    fractions = np.linspace(-0.5, 1.5, EXACT_SAMPLES + 1)
+    ex, ey = geometry.profile_at(params, (thetas[:, None] + widths[:, None] * fractions[None, :]).ravel())
+    ex = ex.reshape(len(thetas), -1)
+    ey = ey.reshape(len(thetas), -1)
+
+    ax, ay = ex[:, None, :-1], ey[:, None, :-1]
+    dx, dy = (ex[:, 1:] - ex[:, :-1])[:, None, :], (ey[:, 1:] - ey[:, :-1])[:, None, :]
+    px, py = rx[:, :, None], ry[:, :, None]
+    length2 = np.maximum(dx * dx + dy * dy, 1e-300)
+    t = np.clip(((px - ax) * dx + (py - ay) * dy) / length2, 0.0, 1.0)
+    distances = np.hypot(px - ax - t * dx, py - ay - t * dy).min(axis=-1)
+    return float(distances.max()), float(np.sqrt(np.mean(distances ** 2)))
+
+
+def run_case(params: RollerWaveDriveParams, mode: str, value, resolution: int = None) -> dict:
+    best = math.inf
+    for _ in range(TIMING_REPEATS):
+        started = time.perf_counter()
+        if resolution is None:
+            thetas, reported_deviation = geometry.adaptive_angles(params, params.profile_tolerance)
+        else:
+            thetas = geometry.sample_angles(resolution)
+        xs, ys = geometry.profile_at(params, thetas)
+        best = min(best, time.perf_counter() - started)
+
+    if resolution is not None:
+        reported_deviation = geometry.profile_deviation(params, thetas)
+    max_deviation, rms_deviation = reconstruction_deviation(params, thetas, xs, ys)
+    case = {
+        'roller_number': params.roller_number,
+        'mode': mode,
+        'value': value,
+        'points': len(thetas),
+        'compute_ms': best * 1000,
+        'max_deviation': max_deviation,
+        'rms_deviation': rms_deviation,
+        'reported_deviation': reported_deviation,
+    }
+    if resolution is None:
+        case['fixed_points'] = fixed_points(params, params.profile_tolerance)
+        case['saved_points'] = case['fixed_points'] - case['points']
+    return case
+
+
+def fixed_points(params: RollerWaveDriveParams, tolerance: float) -> int:
+    # Points of the fewest equal segments per lobe within the tolerance
+    num_dimples = params.roller_number + 1
+    per_lobe = geometry.ADAPTIVE_INITIAL_SEGMENTS
+    while geometry.uniform_deviation(params, per_lobe * num_dimples) > tolerance:
+        per_lobe += 1
+    return per_lobe * num_dimples
+
+
+def run(roller_numbers=ROLLER_NUMBERS, points_per_lobe=POINTS_PER_LOBE, tolerances=TOLERANCES) -> dict:
+    np = geometry.require_numpy('the profile benchmark')
+    cases = []
+    for roller_number in roller_numbers:
+        params = make_params(roller_number)
+        for per_lobe in points_per_lobe:
+            cases.append(run_case(params, 'fixed', per_lobe, per_lobe * (roller_number + 1)))
+        for tolerance in tolerances:
+            cases.append(run_case(make_params(roller_number, tolerance), 'adaptive', tolerance))
+
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'roller_diameter': ROLLER_DIAMETER,
+        'cases': cases,
+    }
+
+
+def understated(report: dict) -> list:
+    # Cases where the geometry reports less deviation than the reconstruction has
+    return ['{} {} {}: reported {:.3e} < measured {:.3e}'.format(case['roller_number'], case['mode'], case['value'],
+                                                                case['reported_deviation'], case['max_deviation'])
+            for case in report['cases'] if case['reported_deviation'] < case['max_deviation']]
+
+
+def compare(report: dict, baseline: dict, slack: float) -> list:
+    # Deviation and point count are deterministic, timing is only reported.
+    expected = {(case['roller_number'], case['mode'], case['value']): case for case in baseline['cases']}
+    regressions = []
+    for case in report['cases']:
+        old = expected.get((case['roller_number'], case['mode'], case['value']))
+        if old is None:
+            continue
+        for key in ('max_deviation', 'rms_deviation', 'points'):
+            if case[key] > old[key] * (1 + slack) + 1e-12:
+                regressions.append('{} {} {}: {} {} -> {}'.format(case['roller_number'], case['mode'],
+                                                                   case['value'], key, old[key], case[key]))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the wave drive wheel profile')
+    parser.add_argument('--output', default='profile_benchmark.json', help='path of the JSON report')
+    parser.add_argument('--baseline', help='report to compare the results with')
+    parser.add_argument('--slack', type=float, default=0.01, help='allowed relative growth against the baseline')
+    parser.add_argument('--rollers', type=int, nargs='+', default=ROLLER_NUMBERS)
+    parser.add_argument('--points-per-lobe', type=int, nargs='+', default=POINTS_PER_LOBE)
+    parser.add_argument('--tolerances', type=float, nargs='+', default=TOLERANCES)
+    args = parser.parse_args(argv)
+
+    report = run(args.rollers, args.points_per_lobe, args.tolerances)
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+
+    for case in report['cases']:
+        line = ('{roller_number:4d} {mode:8s} {value:<8g} {points:6d} points {compute_ms:8.3f} ms '
+                'max {max_deviation:.3e} rms {rms_deviation:.3e} reported {reported_deviation:.3e}'.format(**case))
+        if 'saved_points' in case:
+            line += ' saved {saved_points} of {fixed_points} fixed points'.format(**case)
+        print(line)
+
+    regressions = understated(report)
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions += compare(report, json.load(file), args.slack)
+    for regression in regressions:
+        print('REGRESSION ' + regression)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,49 +1,129 @@
+import json
 import math
 
 import adsk.core
 import adsk.fusion
 from adsk.fusion import Component
-from adsk.fusion import ConstructionPlane, BRepBody, BRepFace, ConstructionAxis, Feature
+from adsk.fusion import ConstructionPlane, BRepBody, BRepFace, ConstructionAxis, Feature, Profile, Sketch
 
-from .RollerWaveDriveParams import RollerWaveDriveParams
+from . import RollerWaveDriveGeometry as geometry
+from . import RollerWaveDriveOffset as offset
+from .RollerWaveDriveGeometry import DriveGeometry
+from .RollerWaveDriveInstrumentation import BuildRecorder, no_stage
+from .RollerWaveDriveParams import RollerWaveDriveParams, params_from_tuple
+
+PROFILE_RADIUS_TOLERANCE = 1e-6
+# Attribute of the component holding the params it was built with
+ATTRIBUTE_GROUP = 'RollerWaveDrive'
+ATTRIBUTE_PARAMS = 'params'
 
 
 def get_extrusion_height(params: RollerWaveDriveParams) -> float:
     return params.roller_height + 2 * params.roller_tolerance + 0.2
 
 
-def find_cylindrical_face(body: BRepBody) -> BRepFace:
+def split_radii(params: RollerWaveDriveParams) -> tuple:
+    # Outer and inner radius of the cut that splits the cam from the bearing ring
+    return params.bearing_middle_diameter / 2 + 0.1, params.bearing_middle_diameter / 2 - 0.1
+
+
+def find_cylindrical_face(body: BRepBody, radius: float = None) -> BRepFace:
     for face in body.faces:
         geom = face.geometry
-        if geom.surfaceType == adsk.core.SurfaceTypes.CylinderSurfaceType:
+        if geom.surfaceType == adsk.core.SurfaceTypes.CylinderSurfaceType and (
+                radius is None or abs(geom.radius - radius) < PROFILE_RADIUS_TOLERANCE):
             return face
 
 
-def draw_gear(params: RollerWaveDriveParams, component: Component, plane: ConstructionPlane):
-    num_dimples = params.roller_number + 1
-    ball_radius = params.roller_diameter / 2
-    eccentricity = params.eccentricity
+def find_profile_by_radii(sketch: Sketch, *radii: float) -> Profile:
+    # Profile bounded only by circles with the given radii, None if there is no such profile
+    expected = sorted(radii)
+    for profile in sketch.profiles:
+        loop_radii = []
+        for loop in profile.profileLoops:
+            for curve in loop.profileCurves:
+                if curve.geometryType != adsk.core.Curve3DTypes.Circle3DCurveType:
+                    break
+                loop_radii.append(curve.geometry.radius)
+        if len(loop_radii) == len(expected) and all(
+                abs(a - b) < PROFILE_RADIUS_TOLERANCE for a, b in zip(sorted(loop_radii), expected)):
+            return profile
+    return None
+
+
+def store_params(component: Component, params: RollerWaveDriveParams):
+    component.attributes.add(ATTRIBUTE_GROUP, ATTRIBUTE_PARAMS, json.dumps(params.key))
+
+
+def stored_params(component: Component) -> RollerWaveDriveParams:
+    # Params the component was built with, None for components not built by this add-in
+    attribute = component.attributes.itemByName(ATTRIBUTE_GROUP, ATTRIBUTE_PARAMS)
+    if attribute is None:
+        return None
+    return params_from_tuple(tuple(json.loads(attribute.value)))
+
+
+def find_outermost_profile(sketch: Sketch) -> Profile:
+    def distance(profile: Profile) -> float:
+        box = profile.boundingBox
+        return math.hypot(box.minPoint.x + box.maxPoint.x, box.minPoint.y + box.maxPoint.y)
+
+    return max(sketch.profiles, key=distance)
+
+
+def build(params: RollerWaveDriveParams, component: Component, plane: ConstructionPlane,
+          recorder: BuildRecorder = None, drive_geometry: DriveGeometry = None) -> DriveGeometry:
+    stage = recorder.stage if recorder is not None else no_stage
+
+    if drive_geometry is None:
+        with stage('geometry'):
+            drive_geometry = geometry.compute_geometry(params)
+    with stage('draw_gear'):
+        draw_gear(params, component, plane, drive_geometry)
+    if params.tool_radius:
+        with stage('draw_toolpath'):
+            toolpath = offset.offset_profile(params, params.tool_radius)
+            draw_toolpath(component, plane, toolpath)
+        drive_geometry = drive_geometry._replace(toolpath=toolpath)
+    if params.consolidate_sketches:
+        with stage('draw_separator_and_cam'):
+            draw_separator_and_cam(params, component, plane)
+    else:
+        with stage('draw_separator'):
+            draw_separator(params, component, plane)
+        with stage('draw_cam'):
+            draw_cam(params, component, plane)
+    if params.use_balls and params.pattern_balls:
+        with stage('draw_balls_patterned'):
+            draw_balls_patterned(params, component, plane, drive_geometry)
+    elif params.use_balls:
+        with stage('draw_balls'):
+            draw_balls(params, component, plane, drive_geometry)
+    else:
+        with stage('draw_rollers'):
+            draw_rollers(params, component, plane, drive_geometry)
+    store_params(component, params)
+    return drive_geometry
+
+
+def draw_gear(params: RollerWaveDriveParams, component: Component, plane: ConstructionPlane,
+              drive_geometry: DriveGeometry = None):
+    if drive_geometry is None:
+        drive_geometry = geometry.compute_geometry(params)
 
     profile_sketch = component.sketches.add(plane)
     profile_sketch.name = 'Wheel'
-    points = adsk.core.ObjectCollection.create()
+    if drive_geometry.arcs:
+        draw_profile_arcs(profile_sketch, drive_geometry.arcs)
+    else:
+        points = adsk.core.ObjectCollection.create()
 
-    for i in range(params.resolution):
-        theta = math.pi * 2.0 * i / params.resolution
-        S = math.sqrt(
-            (ball_radius + params.cam_radius) ** 2 - math.pow(eccentricity * math.sin(num_dimples * theta), 2))
-        l = eccentricity * math.cos(num_dimples * theta) + S
-        xi = math.atan2(eccentricity * num_dimples * math.sin(num_dimples * theta), S)
+        for x, y in zip(drive_geometry.profile_x.tolist(), drive_geometry.profile_y.tolist()):
+            points.add(adsk.core.Point3D.create(x, y, 0))
+        points.add(points[0])
 
-        x = l * math.sin(theta) + ball_radius * math.sin(theta + xi)
-        y = l * math.cos(theta) + ball_radius * math.cos(theta + xi)
-
-        point = adsk.core.Point3D.create(x, y, 0)
-        points.add(point)
-    points.add(points[0])
-
-    profile_spline = profile_sketch.sketchCurves.sketchFittedSplines.add(points)
-    profile_spline.isClosed = True
+        profile_spline = profile_sketch.sketchCurves.sketchFittedSplines.add(points)
+        profile_spline.isClosed = True
 
     profile_sketch.sketchCurves.sketchCircles.addByCenterRadius(adsk.core.Point3D.create(0, 0, 0),
                                                                 params.body_diameter)
@@ -52,9 +132,85 @@ def draw_gear(params: RollerWaveDriveParams, component: Component, plane: Constr
     prof = profile_sketch.profiles.item(0)
     distance = adsk.core.ValueInput.createByReal(get_extrusion_height(params))
     disk_extrude = extrudes.addSimple(prof, distance, adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+    disk_extrude.name = 'Wheel'
     disk_extrude.bodies.item(0).name = "CycloidWheel"
 
 
+def draw_profile_arcs(sketch: Sketch, arcs: list):
+    # Consecutive arcs share their sketch points, so the loop is closed and stays tangent continuous
+    sketch.isComputeDeferred = True
+    sketch_arcs = sketch.sketchCurves.sketchArcs
+    sketch_lines = sketch.sketchCurves.sketchLines
+    first = previous = None
+    for i, arc in enumerate(arcs):
+        start = previous if previous is not None else adsk.core.Point3D.create(arc.start[0], arc.start[1], 0)
+        end = first if i == len(arcs) - 1 else adsk.core.Point3D.create(arc.end[0], arc.end[1], 0)
+        if arc.center is None:
+            curve = sketch_lines.addByTwoPoints(start, end)
+        else:
+            curve = sketch_arcs.addByThreePoints(start, adsk.core.Point3D.create(arc.middle[0], arc.middle[1], 0),
+                                                 end)
+        # Fusion orients arcs counterclockwise, the end of the segment can be either sketch point
+        start_point, end_point = curve.startSketchPoint, curve.endSketchPoint
+        end_geometry = end_point.geometry
+        if math.hypot(end_geometry.x - arc.end[0], end_geometry.y - arc.end[1]) > math.hypot(
+                start_point.geometry.x - arc.end[0], start_point.geometry.y - arc.end[1]):
+            start_point, end_point = end_point, start_point
+        if first is None:
+            first = start_point
+        previous = end_point
+    sketch.isComputeDeferred = False
+
+
+def draw_toolpath(component: Component, plane: ConstructionPlane, toolpath: offset.OffsetProfile):
+    # Center path of the tool cutting the wheel, one spline between every two trimmed cusps
+    sketch = component.sketches.add(plane)
+    sketch.name = 'WheelToolpath'
+    sketch.isComputeDeferred = True
+    draw_toolpath_splines(sketch, toolpath)
+    sketch.isComputeDeferred = False
+
+
+def toolpath_pieces(toolpath: offset.OffsetProfile) -> list:
+    # (x, y) fit points of every toolpath spline. Without cusps the one piece repeats its first point, otherwise
+    # every piece runs from a cusp to the next one.
+    points = list(zip(toolpath.xs, toolpath.ys))
+    cusps = toolpath.cusps
+    if not cusps:
+        return [points + points[:1]]
+    pieces = []
+    for i, cusp in enumerate(cusps):
+        following = cusps[(i + 1) % len(cusps)]
+        piece = points[cusp + 1:following] if following > cusp else points[cusp + 1:] + points[:following]
+        pieces.append([points[cusp]] + piece + [points[following]])
+    return pieces
+
+
+def draw_toolpath_splines(sketch: Sketch, toolpath: offset.OffsetProfile):
+    splines = sketch.sketchCurves.sketchFittedSplines
+    pieces = toolpath_pieces(toolpath)
+    if not toolpath.cusps:
+        collection = adsk.core.ObjectCollection.create()
+        for x, y in pieces[0]:
+            collection.add(adsk.core.Point3D.create(x, y, 0))
+        splines.add(collection).isClosed = True
+        return
+
+    # Neighbouring splines share the sketch point of their cusp
+    first = previous = None
+    for i, piece in enumerate(pieces):
+        collection = adsk.core.ObjectCollection.create()
+        collection.add(previous if previous is not None else adsk.core.Point3D.create(*piece[0], 0))
+        for x, y in piece[1:-1]:
+            collection.add(adsk.core.Point3D.create(x, y, 0))
+        last = i == len(pieces) - 1 and first is not None
+        collection.add(first if last else adsk.core.Point3D.create(*piece[-1], 0))
+        fit_points = splines.add(collection).fitPoints
+        if first is None:
+            first = fit_points.item(0)
+        previous = fit_points.item(fit_points.count - 1)
+
+
 def draw_separator(params: RollerWaveDriveParams, component: Component, plane: ConstructionPlane):
     sketch = component.sketches.add(plane)
     sketch.name = 'Separator'
@@ -67,6 +223,7 @@ def draw_separator(params: RollerWaveDriveParams, component: Component, plane: C
     prof = sketch.profiles.item(1)
     distance = adsk.core.ValueInput.createByReal(get_extrusion_height(params))
     separator_extrude = extrudes.addSimple(prof, distance, adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+    separator_extrude.name = 'Separator'
     separator_body = separator_extrude.bodies.item(0)
     separator_body.name = "Separator"
 
@@ -96,6 +253,7 @@ def create_round_hole(params: RollerWaveDriveParams, component: Component, plane
     prof = holes_sketch.profiles.item(0)
     distance = adsk.core.ValueInput.createByReal(params.separator_thickness * 2)
     hole_extrude = extrudes.addSimple(prof, distance, adsk.fusion.FeatureOperations.CutFeatureOperation)
+    hole_extrude.name = 'RollerHole'
     return hole_extrude
 
 
@@ -115,10 +273,11 @@ def create_square_hole(params: RollerWaveDriveParams, component: Component, plan
     prof = holes_sketch.profiles.item(0)
     distance = adsk.core.ValueInput.createByReal(params.roller_height + 2 * params.roller_tolerance)
     hole_extrude = extrudes.addSimple(prof, distance, adsk.fusion.FeatureOperations.CutFeatureOperation)
+    hole_extrude.name = 'RollerHole'
     return hole_extrude
 
 
-def create_circular_pattern(axis: ConstructionAxis, feature: Feature, num_copies: int):
+def create_circular_pattern(axis: adsk.core.Base, feature: Feature, num_copies: int):
     collection = adsk.core.ObjectCollection.create()
     collection.add(feature)
     pattern_features = feature.parentComponent.features.circularPatternFeatures
@@ -126,19 +285,21 @@ def create_circular_pattern(axis: ConstructionAxis, feature: Feature, num_copies
     pattern_input.quantity = adsk.core.ValueInput.createByReal(num_copies)
     pattern_input.totalAngle = adsk.core.ValueInput.createByString('360 deg')
     pattern_input.isSymmetric = False
-    pattern_features.add(pattern_input)
+    pattern_features.add(pattern_input).name = 'RollerHoles'
 
 
 def create_axis_from_cylindrical_body(component: Component, separator_body: BRepBody) -> ConstructionAxis:
     axis_input = component.constructionAxes.createInput()
     axis_input.setByCircularFace(find_cylindrical_face(separator_body))
     axis = component.constructionAxes.add(axis_input)
+    axis.name = 'SeparatorAxis'
     return axis
 
 
-def draw_balls(params: RollerWaveDriveParams, component: Component, plane: ConstructionPlane):
-    num_dimples = params.roller_number + 1
-    ball_radius = params.roller_diameter / 2
+def draw_balls(params: RollerWaveDriveParams, component: Component, plane: ConstructionPlane,
+               drive_geometry: DriveGeometry = None):
+    if drive_geometry is None:
+        drive_geometry = geometry.compute_geometry(params)
 
     revolves = component.features.revolveFeatures
     planes = component.constructionPlanes
@@ -146,14 +307,8 @@ def draw_balls(params: RollerWaveDriveParams, component: Component, plane: Const
     plane_input.setByOffset(plane, adsk.core.ValueInput.createByReal(0.1 + params.roller_height / 2))
     plane = planes.add(plane_input)
 
-    for i in range(0, params.roller_number):
-        angle = 2 * math.pi * i / params.roller_number
-        s_sh = math.sqrt(
-            (ball_radius + params.cam_radius) ** 2 - math.pow(params.eccentricity * math.sin(num_dimples * angle), 2))
-        l_sh = params.eccentricity * math.cos(num_dimples * angle) + s_sh
-        x = l_sh * math.sin(angle)
-        y = l_sh * math.cos(angle)
-
+    centers = zip(drive_geometry.roller_x.tolist(), drive_geometry.roller_y.tolist())
+    for i, (x, y) in enumerate(centers):
         sketch = component.sketches.add(plane)
         sketch.name = "Ball-{}".format(i)
         sketch.sketchCurves.sketchCircles.addByCenterRadius(adsk.core.Point3D.create(x, y, 0),
@@ -172,9 +327,73 @@ def draw_balls(params: RollerWaveDriveParams, component: Component, plane: Const
         feat.name = sketch.name
 
 
-def draw_rollers(params: RollerWaveDriveParams, component: Component, plane: ConstructionPlane):
-    num_dimples = params.roller_number + 1
-    ball_radius = params.roller_diameter / 2
+def draw_balls_patterned(params: RollerWaveDriveParams, component: Component, plane: ConstructionPlane,
+                         drive_geometry: DriveGeometry = None):
+    # Balls lie on the wave path, not on a circle, so a circular pattern can't place them. Only the first
+    # ball is revolved, the others are translated copies of its body added in a single base feature.
+    if drive_geometry is None:
+        drive_geometry = geometry.compute_geometry(params)
+
+    revolves = component.features.revolveFeatures
+    planes = component.constructionPlanes
+    plane_input = planes.createInput()
+    plane_input.setByOffset(plane, adsk.core.ValueInput.createByReal(0.1 + params.roller_height / 2))
+    plane = planes.add(plane_input)
+
+    centers = list(zip(drive_geometry.roller_x.tolist(), drive_geometry.roller_y.tolist()))
+    x, y = centers[0]
+    sketch = component.sketches.add(plane)
+    sketch.name = "Ball-0"
+    sketch.sketchCurves.sketchCircles.addByCenterRadius(adsk.core.Point3D.create(x, y, 0),
+                                                        params.roller_diameter / 2)
+    axis = sketch.sketchCurves.sketchLines.addByTwoPoints(
+        adsk.core.Point3D.create(x, y - params.roller_diameter, 0),
+        adsk.core.Point3D.create(x, y + params.roller_diameter, 0)
+    )
+    axis.isCenterLine = True
+
+    ball_input = revolves.createInput(sketch.profiles.item(0), axis,
+                                      adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+    ball_input.setAngleExtent(False, adsk.core.ValueInput.createByReal(2 * math.pi))
+    seed = revolves.add(ball_input)
+    seed.name = sketch.name
+    seed_body = seed.bodies.item(0)
+    seed_body.name = sketch.name
+
+    if component.parentDesign.designType == adsk.fusion.DesignTypes.ParametricDesignType:
+        base_feature = component.features.baseFeatures.add()
+        base_feature.name = 'Balls'
+        add_ball_copies(component, sketch, seed_body, centers, base_feature)
+    else:
+        add_ball_copies(component, sketch, seed_body, centers)
+
+
+def add_ball_copies(component: Component, sketch: Sketch, seed_body: BRepBody, centers: list,
+                    base_feature: adsk.fusion.BaseFeature = None):
+    # Bodies of the balls at centers[1:], translated copies of the seed ball drawn at centers[0]
+    temp_brep = adsk.fusion.TemporaryBRepManager.get()
+    x, y = centers[0]
+    seed_center = sketch.sketchToModelSpace(adsk.core.Point3D.create(x, y, 0))
+    balls = []
+    for x, y in centers[1:]:
+        ball = temp_brep.copy(seed_body)
+        transform = adsk.core.Matrix3D.create()
+        transform.translation = seed_center.vectorTo(sketch.sketchToModelSpace(adsk.core.Point3D.create(x, y, 0)))
+        temp_brep.transform(ball, transform)
+        balls.append(ball)
+
+    if base_feature is not None:
+        base_feature.startEdit()
+    for i, ball in enumerate(balls, 1):
+        component.bRepBodies.add(ball, base_feature).name = "Ball-{}".format(i)
+    if base_feature is not None:
+        base_feature.finishEdit()
+
+
+def draw_rollers(params: RollerWaveDriveParams, component: Component, plane: ConstructionPlane,
+                 drive_geometry: DriveGeometry = None):
+    if drive_geometry is None:
+        drive_geometry = geometry.compute_geometry(params)
 
     planes = component.constructionPlanes
     plane_input = planes.createInput()
@@ -184,14 +403,8 @@ def draw_rollers(params: RollerWaveDriveParams, component: Component, plane: Con
     sketch = component.sketches.add(plane)
     sketch.name = 'Rollers'
 
-    for i in range(0, params.roller_number):
-        angle = 2 * math.pi * i / params.roller_number
-        s_sh = math.sqrt(
-            (ball_radius + params.cam_radius) ** 2 - math.pow(params.eccentricity * math.sin(num_dimples * angle), 2))
-        l_sh = params.eccentricity * math.cos(num_dimples * angle) + s_sh
-        x = l_sh * math.sin(angle)
-        y = l_sh * math.cos(angle)
-
+    centers = zip(drive_geometry.roller_x.tolist(), drive_geometry.roller_y.tolist())
+    for x, y in centers:
         sketch.sketchCurves.sketchCircles.addByCenterRadius(adsk.core.Point3D.create(x, y, 0),
                                                             params.roller_diameter / 2)
 
@@ -219,17 +432,17 @@ def draw_cam(params: RollerWaveDriveParams, component: Component, plane: Constru
     prof = sketch.profiles.item(1)
     distance = adsk.core.ValueInput.createByReal(get_extrusion_height(params))
     cam_extrude = extrudes.addSimple(prof, distance, adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+    cam_extrude.name = 'Cam'
     cam_extrude.bodies.item(0).name = "Cam"
 
     sketch = component.sketches.add(plane)
     sketch.name = 'CamSplit'
-    sketch.sketchCurves.sketchCircles.addByCenterRadius(adsk.core.Point3D.create(0, params.eccentricity, 0),
-                                                        params.bearing_middle_diameter / 2 + 0.1)
-    sketch.sketchCurves.sketchCircles.addByCenterRadius(adsk.core.Point3D.create(0, params.eccentricity, 0),
-                                                        params.bearing_middle_diameter / 2 - 0.1)
+    for radius in split_radii(params):
+        sketch.sketchCurves.sketchCircles.addByCenterRadius(adsk.core.Point3D.create(0, params.eccentricity, 0),
+                                                            radius)
     prof = sketch.profiles.item(0)
     distance = adsk.core.ValueInput.createByReal(get_extrusion_height(params))
-    extrudes.addSimple(prof, distance, adsk.fusion.FeatureOperations.CutFeatureOperation)
+    extrudes.addSimple(prof, distance, adsk.fusion.FeatureOperations.CutFeatureOperation).name = 'CamSplit'
 
     sketch = component.sketches.add(plane)
     sketch.name = 'Bearing'
@@ -239,4 +452,89 @@ def draw_cam(params: RollerWaveDriveParams, component: Component, plane: Constru
                                                         params.bearing_inner_diameter / 2)
     prof = sketch.profiles.item(0)
     distance = adsk.core.ValueInput.createByReal(params.bearing_height)
-    extrudes.addSimple(prof, distance, adsk.fusion.FeatureOperations.CutFeatureOperation)
+    extrudes.addSimple(prof, distance, adsk.fusion.FeatureOperations.CutFeatureOperation).name = 'Bearing'
+
+
+def draw_separator_and_cam(params: RollerWaveDriveParams, component: Component, plane: ConstructionPlane):
+    # Same bodies as draw_separator and draw_cam, but all the circles share one sketch and the hole is drawn
+    # in it at its height, so no hole plane, hole sketch or pattern axis is created and the cam
+    # needs two features instead of three.
+    cam_center = adsk.core.Point3D.create(0, params.eccentricity, 0)
+
+    sketch = component.sketches.add(plane)
+    sketch.name = 'SeparatorCam'
+    sketch.isComputeDeferred = True
+    circles = sketch.sketchCurves.sketchCircles
+    circles.addByCenterRadius(adsk.core.Point3D.create(0, 0, 0), params.separator_inner_radius)
+    circles.addByCenterRadius(adsk.core.Point3D.create(0, 0, 0), params.separator_outer_radius)
+    circles.addByCenterRadius(adsk.core.Point3D.create(0, 0, 0), params.shaft_diameter / 2)
+    cam_radii = ((params.cam_radius, params.bearing_outer_diameter / 2, params.bearing_inner_diameter / 2)
+                 + split_radii(params))
+    for radius in cam_radii:
+        circles.addByCenterRadius(cam_center, radius)
+
+    r = params.roller_diameter / 2 + params.roller_tolerance
+    if params.use_balls:
+        z = 0.1 + params.roller_height / 2
+        circles.addByThreePoints(
+            adsk.core.Point3D.create(0, params.separator_outer_radius, z - r),
+            adsk.core.Point3D.create(r, params.separator_outer_radius, z),
+            adsk.core.Point3D.create(0, params.separator_outer_radius, z + r),
+        )
+        hole_distance = params.separator_thickness * 2
+    else:
+        sketch.sketchCurves.sketchLines.addCenterPointRectangle(
+            adsk.core.Point3D.create(0, params.separator_middle_radius, 0.1),
+            adsk.core.Point3D.create(r, params.separator_middle_radius + params.separator_thickness, 0.1),
+        )
+        hole_distance = params.roller_height + 2 * params.roller_tolerance
+    sketch.isComputeDeferred = False
+
+    cam_profiles = find_cam_profiles(params, sketch)
+    if None in cam_profiles:
+        # The shaft crosses the bearing or the split circles, the profiles differ from the expected ones
+        sketch.deleteMe()
+        draw_separator(params, component, plane)
+        draw_cam(params, component, plane)
+        return
+
+    extrudes = component.features.extrudeFeatures
+    height = adsk.core.ValueInput.createByReal(get_extrusion_height(params))
+    prof = find_profile_by_radii(sketch, params.separator_outer_radius, params.separator_inner_radius)
+    separator_extrude = extrudes.addSimple(prof, height, adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+    separator_extrude.name = 'Separator'
+    separator_body = separator_extrude.bodies.item(0)
+    separator_body.name = "Separator"
+
+    distance = adsk.core.ValueInput.createByReal(hole_distance)
+    hole_feature = extrudes.addSimple(find_outermost_profile(sketch), distance,
+                                      adsk.fusion.FeatureOperations.CutFeatureOperation)
+    hole_feature.name = 'RollerHole'
+    axis = find_cylindrical_face(separator_body, params.separator_outer_radius)
+    create_circular_pattern(axis, hole_feature, params.roller_number)
+
+    collection = adsk.core.ObjectCollection.create()
+    for prof in cam_profiles:
+        collection.add(prof)
+    cam_extrude = extrudes.addSimple(collection, height, adsk.fusion.FeatureOperations.NewBodyFeatureOperation)
+    cam_extrude.name = 'Cam'
+    for i, body in enumerate(cam_extrude.bodies):
+        body.name = "Cam" if i == 0 else "Cam-{}".format(i)
+
+    collection = adsk.core.ObjectCollection.create()
+    collection.add(cam_profiles[1])
+    collection.add(cam_profiles[2])
+    distance = adsk.core.ValueInput.createByReal(params.bearing_height)
+    extrudes.addSimple(collection, distance, adsk.fusion.FeatureOperations.CutFeatureOperation).name = 'Bearing'
+
+
+def find_cam_profiles(params: RollerWaveDriveParams, sketch: Sketch) -> list:
+    # Cam, bearing ring halves and shaft ring of the SeparatorCam sketch, None where the shaft crosses the bearing
+    # or the split circles
+    outer_split, inner_split = split_radii(params)
+    return [
+        find_profile_by_radii(sketch, params.cam_radius, params.bearing_outer_diameter / 2),
+        find_profile_by_radii(sketch, params.bearing_outer_diameter / 2, outer_split),
+        find_profile_by_radii(sketch, inner_split, params.bearing_inner_diameter / 2),
+        find_profile_by_radii(sketch, params.bearing_inner_diameter / 2, params.shaft_diameter / 2),
+    ]
@@ -0,0 +1,169 @@
+# Persistent cache of computed arrays. An entry is a directory named by the sha256 of its kind,
+# the key of the params it depends on, extra arguments, CACHE_VERSION and the source of the kernel
+# modules, so editing the formulas invalidates it. Every array is a .npy file opened as a memory map; without NumPy
+# 1-d float arrays are mapped with mmap and read through a memoryview. Entries are evicted least
+# recently used first once the cache grows beyond its size limit. A cache directory that cannot be
+# written, e.g. in a read-only install, only loses the reuse: the computed arrays are returned.
+import ast
+import functools
+import hashlib
+import math
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Callable, Dict, Sequence
+
+from . import RollerWaveDriveGeometry as geometry
+from . import RollerWaveDriveParams as params_module
+from .RollerWaveDriveGeometry import Arc, DriveGeometry
+from .RollerWaveDriveParams import RollerWaveDriveParams
+
+# Bump when the stored layout changes
+CACHE_VERSION = 1
+MAX_BYTES = 256 * 1024 * 1024
+KERNEL_MODULES = (geometry, params_module)
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+# Values of an arc in the 'arcs' array: start, middle, end, center (nan for a line) and radius
+ARC_VALUES = 9
+
+
+@functools.lru_cache(maxsize=None)
+def source_hash(*modules) -> str:
+    digest = hashlib.sha256()
+    for module in modules:
+        with open(module.__file__, 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def entry_key(kind: str, key: tuple, extra: tuple = (), modules: tuple = ()) -> str:
+    # repr of the values is stable across runs, unlike hash()
+    digest = hashlib.sha256(repr((CACHE_VERSION, kind, key, extra)).encode())
+    digest.update(source_hash(*KERNEL_MODULES, *modules).encode())
+    return digest.hexdigest()
+
+
+def write_npy(path: str, values: Sequence[float]):
+    np = geometry.np
+    if np is not None:
+        np.save(path, np.asarray(values))
+        return
+    header = "{{'descr': '<f8', 'fortran_order': False, 'shape': ({},), }}".format(len(values))
+    header += ' ' * (-(len(NPY_MAGIC) + 2 + len(header) + 1) % 64) + '\n'
+    data = array('d', values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    with open(path, 'wb') as file:
+        file.write(NPY_MAGIC + struct.pack('<H', len(header)) + header.encode('latin1'))
+        file.write(data.tobytes())
+
+
+def read_npy(path: str):
+    np = geometry.np
+    if np is not None:
+        return np.load(path, mmap_mode='r')
+    with open(path, 'rb') as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:len(NPY_MAGIC)] != NPY_MAGIC:
+        raise ValueError('Not a version 1 .npy file: {}'.format(path))
+    length, = struct.unpack('<H', mapped[len(NPY_MAGIC):len(NPY_MAGIC) + 2])
+    start = len(NPY_MAGIC) + 2 + length
+    header = ast.literal_eval(mapped[len(NPY_MAGIC) + 2:start].decode('latin1'))
+    if header['descr'] != '<f8' or len(header['shape']) != 1 or sys.byteorder == 'big':
+        raise ValueError('Only little endian 1-d float arrays are read without NumPy: {}'.format(path))
+    return memoryview(mapped)[start:].cast('d')
+
+
+def load_entry(path: str) -> Dict[str, Sequence]:
+    return {name[:-len('.npy')]: read_npy(os.path.join(path, name))
+            for name in os.listdir(path) if name.endswith('.npy')}
+
+
+def store_entry(directory: str, path: str, arrays: Dict[str, Sequence]):
+    # Written aside and renamed, readers never see a partial entry
+    os.makedirs(directory, exist_ok=True)
+    temporary = tempfile.mkdtemp(prefix='.tmp-', dir=directory)
+    try:
+        for name, values in arrays.items():
+            write_npy(os.path.join(temporary, name + '.npy'), values)
+        os.replace(temporary, path)
+    except OSError:
+        # Another process stored the same entry first
+        shutil.rmtree(temporary, ignore_errors=True)
+
+
+def entry_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def evict(directory: str, max_bytes: int = MAX_BYTES, keep: str = None):
+    entries = []
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if not name.startswith('.') and os.path.isdir(path):
+            entries.append((os.path.getmtime(path), entry_size(path), path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        # An entry still mapped on Windows cannot be removed, it goes on a later eviction
+        shutil.rmtree(path, ignore_errors=True)
+        if not os.path.exists(path):
+            total -= size
+
+
+def cached(directory: str, kind: str, params: RollerWaveDriveParams, compute: Callable[[], Dict[str, Sequence]],
+           extra: tuple = (), modules: tuple = (), max_bytes: int = MAX_BYTES,
+           key: tuple = None) -> Dict[str, Sequence]:
+    # Arrays of the entry, computed and stored on a miss. modules are hashed with the kernel, pass the
+    # module computing the arrays so its changes invalidate them too. key is the part of the params the
+    # arrays depend on, all of them by default.
+    path = os.path.join(directory, entry_key(kind, params.key if key is None else key, extra, modules))
+    if os.path.isdir(path):
+        try:
+            arrays = load_entry(path)
+        except (OSError, ValueError, SyntaxError):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return arrays
+
+    arrays = compute()
+    try:
+        store_entry(directory, path, arrays)
+        evict(directory, max_bytes, path)
+    except OSError:
+        pass
+    return arrays
+
+
+def drive_geometry(params: RollerWaveDriveParams, directory: str) -> DriveGeometry:
+    def compute() -> dict:
+        result = geometry.compute_geometry(params)
+        arrays = {'profile_x': result.profile_x, 'profile_y': result.profile_y, 'roller_x': result.roller_x,
+                  'roller_y': result.roller_y, 'max_deviation': array('d', [result.max_deviation])}
+        if result.arcs:
+            arrays['arcs'] = array('d', (value for arc in result.arcs for value in (
+                arc.start + arc.middle + arc.end + (arc.center or (math.nan, math.nan)) + (arc.radius,))))
+        return arrays
+
+    # Drives differing only outside of the profile, e.g. in their bearing, shaft or heights, share the entry
+    arrays = cached(directory, 'geometry', params, compute, key=geometry.profile_key(params))
+    arcs = None
+    if 'arcs' in arrays:
+        values = arrays['arcs'].tolist()
+        arcs = []
+        for i in range(0, len(values), ARC_VALUES):
+            sx, sy, mx, my, ex, ey, cx, cy, radius = values[i:i + ARC_VALUES]
+            arcs.append(Arc((sx, sy), (mx, my), (ex, ey), None if math.isnan(cx) else (cx, cy), radius))
+    return DriveGeometry(arrays['profile_x'], arrays['profile_y'], arrays['roller_x'], arrays['roller_y'],
+                         float(arrays['max_deviation'][0]), arcs)
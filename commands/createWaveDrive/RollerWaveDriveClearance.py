@@ -0,0 +1,228 @@
+# Minimum clearance between the parts over a full input revolution, built on the kinematics.
+# A positive value is a gap, a negative one an interference. Rollers touch the wheel and the cam
+# by design, so these pairs are expected close to zero. The separator band is the margin of a roller
+# center to the inner and outer radius of the separator, outside of it the slot no longer guides the roller.
+#
+#   cd commands
+#   python -m createWaveDrive.RollerWaveDriveClearance --rollers 100 --roller-diameter 3 --steps 3600
+#
+# The wheel is a polyline of profile points. Distances to it are looked up in a polar index: the
+# points are sorted by polar angle and every query only checks the segments in a small angular
+# window around its own polar angle, the profile is star-shaped around the wheel center.
+#
+# The dialog validates every edit with a coarser check that has to stay interactive. The command line
+# check also times it and fails when it takes longer than VALIDATION_BUDGET.
+import argparse
+import math
+import sys
+import time
+from typing import NamedTuple, Sequence
+
+from . import RollerWaveDriveGeometry as geometry
+from . import RollerWaveDriveKinematics as kinematics
+from .RollerWaveDriveParams import RollerWaveDriveParams
+from .RollerWaveDriveSpec import MM, params_from_record
+
+WHEEL_POINTS_PER_LOBE = 128
+# Input steps and wheel points of the check done while validating the dialog inputs, and its time limit in
+# seconds. The chord error of 32 points per lobe stays far below INTERFERENCE_TOLERANCE.
+VALIDATION_STEPS = 360
+VALIDATION_POINTS_PER_LOBE = 32
+VALIDATION_BUDGET = 0.2
+# Half width of the polar window in roller radii around a roller center
+WINDOW_RADII = 1.5
+# Steps computed at once, bounds the (steps, rollers, window) arrays of the wheel lookup
+CHUNK_STEPS = 512
+# Clearances below minus this value are reported as interferences
+INTERFERENCE_TOLERANCE = 1e-3
+
+PAIRS = ('roller_wheel', 'roller_cam', 'roller_separator', 'roller_roller', 'separator_band')
+
+
+class PolarIndex(NamedTuple):
+    angles: Sequence[float]  # sorted polar angles of the points, measured from +y like the profile
+    xs: Sequence[float]
+    ys: Sequence[float]
+    window: float  # half width of the angular window of a query
+    span: int  # points that fit in any window
+
+
+class PairClearance(NamedTuple):
+    clearance: float
+    cam_angle: float  # input angle of the minimum
+    roller: int
+
+
+def polar_angles(xs, ys):
+    np = geometry.np
+    return np.mod(np.arctan2(xs, ys), 2 * math.pi)
+
+
+def build_polar_index(xs, ys, window: float) -> PolarIndex:
+    np = geometry.require_numpy('the clearance check')
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    angles = polar_angles(xs, ys)
+    order = np.argsort(angles)
+    angles, xs, ys = angles[order], xs[order], ys[order]
+
+    # Largest number of points in a window, counted on the periodic extension of the angles
+    extended = np.concatenate([angles, angles + 2 * math.pi])
+    span = int((np.searchsorted(extended, angles + 2 * window, side='right') - np.arange(len(angles))).max()) + 2
+    return PolarIndex(angles, xs, ys, window, min(span, len(angles)))
+
+
+def nearest_distance(index: PolarIndex, qx, qy, curved: bool = False):
+    # Distance from every query point to the closed polyline, only checking the window segments.
+    # When curved, the distance is taken to the circle through the nearest point and its neighbours,
+    # which removes the chord error of the polyline.
+    np = geometry.np
+    qx = np.asarray(qx, dtype=float)
+    qy = np.asarray(qy, dtype=float)
+    count = len(index.angles)
+    first = np.searchsorted(index.angles, np.mod(polar_angles(qx, qy) - index.window, 2 * math.pi)) - 1
+    candidates = np.mod(first[..., None] + np.arange(index.span), count)
+    following = np.mod(candidates + 1, count)
+
+    ax, ay = index.xs[candidates], index.ys[candidates]
+    dx, dy = index.xs[following] - ax, index.ys[following] - ay
+    px, py = qx[..., None] - ax, qy[..., None] - ay
+    t = np.clip((px * dx + py * dy) / np.maximum(dx * dx + dy * dy, 1e-300), 0.0, 1.0)
+    distances = np.hypot(px - t * dx, py - t * dy)
+    nearest = distances.argmin(axis=-1)[..., None]
+    distance = np.take_along_axis(distances, nearest, axis=-1)[..., 0]
+    if not curved:
+        return distance
+
+    middle = np.take_along_axis(candidates + (t >= 0.5), nearest, axis=-1)[..., 0] % count
+    bx, by = index.xs[middle], index.ys[middle]
+    ax, ay = index.xs[middle - 1] - bx, index.ys[middle - 1] - by
+    cx, cy = index.xs[(middle + 1) % count] - bx, index.ys[(middle + 1) % count] - by
+    a2, c2 = ax * ax + ay * ay, cx * cx + cy * cy
+    d = 2 * (ax * cy - ay * cx)
+    straight = np.abs(d) < 1e-12 * (a2 + c2)
+    d = np.where(straight, 1.0, d)
+    ux, uy = (cy * a2 - ay * c2) / d, (ax * c2 - cx * a2) / d
+    arc = np.abs(np.hypot(qx - bx - ux, qy - by - uy) - np.hypot(ux, uy))
+    return np.where(straight, distance, arc)
+
+
+def wheel_index(params: RollerWaveDriveParams, profile_x=None, profile_y=None,
+                points_per_lobe: int = WHEEL_POINTS_PER_LOBE) -> PolarIndex:
+    # The exact profile sampled densely unless the points are given, e.g. the ones of the built wheel
+    if profile_x is None:
+        profile_x, profile_y = geometry.profile_at(params, geometry.sample_angles(points_per_lobe
+                                                                                   * (params.roller_number + 1)))
+    # Rollers touch the wheel, the nearest point of a roller center is about a roller radius away
+    nearest_radius = params.cam_radius + params.roller_diameter / 2 - params.eccentricity
+    window = math.asin(min(1.0, WINDOW_RADII * params.roller_diameter / 2 / nearest_radius))
+    return build_polar_index(profile_x, profile_y, window)
+
+
+def slot_clearance(params: RollerWaveDriveParams, across, along):
+    # Clearance of a roller to the walls of its separator slot, from the offset of its center across the
+    # slot axis and its distance along it from the wheel center. The walls are roller_tolerance away from a
+    # centered roller, square slots and the round holes of balls alike, and end at the inner and outer
+    # radius of the separator. Beyond them the nearest point of a wall is its edge.
+    np = geometry.np
+    ball_radius = params.roller_diameter / 2
+    wall = ball_radius + params.roller_tolerance - np.abs(across)
+    beyond = np.maximum(np.maximum(params.separator_inner_radius - along, along - params.separator_outer_radius), 0.0)
+    return np.where(beyond > 0, np.hypot(np.maximum(wall, 0.0), beyond), wall) - ball_radius
+
+
+def step_clearances(params: RollerWaveDriveParams, index: PolarIndex, cam_angles, separator_angles, rollers) -> dict:
+    # (steps, rollers) clearance arrays of every pair and the radial margin of the separator band
+    np = geometry.np
+    ball_radius = params.roller_diameter / 2
+    center = rollers['center']
+    cx, cy = center[..., 0], center[..., 1]
+
+    cam_x = params.eccentricity * np.sin(cam_angles)[:, None]
+    cam_y = params.eccentricity * np.cos(cam_angles)[:, None]
+
+    # Slot i of the separator points at its angle plus i slot pitches
+    slots = separator_angles[:, None] + 2 * math.pi * np.arange(params.roller_number)[None, :] / params.roller_number
+    across = cx * np.cos(slots) - cy * np.sin(slots)
+    along = cx * np.sin(slots) + cy * np.cos(slots)
+    next_x, next_y = np.roll(cx, -1, axis=1), np.roll(cy, -1, axis=1)
+
+    return {
+        'roller_wheel': nearest_distance(index, cx, cy, True) - ball_radius,
+        'roller_cam': np.hypot(cx - cam_x, cy - cam_y) - ball_radius - params.cam_radius,
+        'roller_separator': slot_clearance(params, across, along),
+        'roller_roller': np.hypot(next_x - cx, next_y - cy) - 2 * ball_radius,
+        'separator_band': np.minimum(along - params.separator_inner_radius, params.separator_outer_radius - along),
+    }
+
+
+def check(params: RollerWaveDriveParams, steps: int, profile_x=None, profile_y=None,
+          chunk_steps: int = CHUNK_STEPS, points_per_lobe: int = WHEEL_POINTS_PER_LOBE) -> dict:
+    # Minimum of every pair over the revolution with the input angle and roller where it occurs
+    np = geometry.require_numpy('the clearance check')
+    index = wheel_index(params, profile_x, profile_y, points_per_lobe)
+    cam_angles, separator_angles = kinematics.step_angles(steps, params.roller_number)
+
+    result = {}
+    for start in range(0, steps, chunk_steps):
+        chunk_angles = cam_angles[start:start + chunk_steps]
+        rollers = kinematics.evaluate_steps(params, chunk_angles)
+        chunk_clearances = step_clearances(params, index, chunk_angles, separator_angles[start:start + chunk_steps],
+                                           rollers)
+        for name, values in chunk_clearances.items():
+            step, roller = np.unravel_index(np.argmin(values), values.shape)
+            candidate = PairClearance(float(values[step, roller]), float(chunk_angles[step]), int(roller))
+            if name not in result or candidate.clearance < result[name].clearance:
+                result[name] = candidate
+    return result
+
+
+def interferences(clearances: dict, tolerance: float = INTERFERENCE_TOLERANCE) -> list:
+    return [name for name in PAIRS if clearances[name].clearance < -tolerance]
+
+
+def validation_interferences(params: RollerWaveDriveParams) -> list:
+    # The coarser check of the dialog
+    return interferences(check(params, VALIDATION_STEPS, points_per_lobe=VALIDATION_POINTS_PER_LOBE))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Check the wave drive clearances over a full revolution')
+    parser.add_argument('--rollers', type=int, default=17)
+    parser.add_argument('--roller-diameter', type=float, default=6, help='millimeters')
+    parser.add_argument('--cycloid-diameter', type=float, help='millimeters, the minimal one by default')
+    parser.add_argument('--roller-tolerance', type=float, default=0.1, help='millimeters')
+    parser.add_argument('--steps', type=int, default=3600, help='steps of one input revolution')
+    args = parser.parse_args(argv)
+
+    record = {'rollers_number': args.rollers, 'roller_diameter': args.roller_diameter,
+              'roller_tolerance': args.roller_tolerance}
+    if args.cycloid_diameter is None:
+        record['use_minimal_diameter'] = True
+    else:
+        record['cycloid_diameter'] = args.cycloid_diameter
+    params = params_from_record(record)
+
+    started = time.perf_counter()
+    clearances = check(params, args.steps)
+    print('{} steps x {} rollers in {:.2f} s'.format(args.steps, params.roller_number, time.perf_counter() - started))
+    for name, item in clearances.items():
+        print('{:18s} {:9.4f} mm at {:7.2f} deg, roller {}'.format(name, item.clearance / MM,
+                                                                   math.degrees(item.cam_angle), item.roller))
+    failed = interferences(clearances)
+    if failed:
+        print('INTERFERENCE ' + ', '.join(failed))
+
+    started = time.perf_counter()
+    validation_failed = validation_interferences(params)
+    seconds = time.perf_counter() - started
+    print('validation in {:.3f} s'.format(seconds))
+    if seconds > VALIDATION_BUDGET:
+        print('SLOW validation, budget {:.3f} s'.format(VALIDATION_BUDGET))
+    if validation_failed != failed:
+        print('VALIDATION MISMATCH ' + ', '.join(validation_failed))
+    return 1 if failed or seconds > VALIDATION_BUDGET or validation_failed != failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,249 @@
+# Sliding velocities and friction losses of the roller contacts over a revolution, and the
+# efficiency of the drive. Velocities are per unit input speed, so losses are energies per input
+# radian and compare directly with the output work T / roller_number.
+#
+# Spins are counterclockwise, angles like the profile run clockwise from +y, so the input turns at
+# -1 and the separator at 1 / roller_number. Every roller touches the fixed wheel, the cam ring and
+# a wall of its separator slot. The cam ring turns freely on its bearing around the eccentric. A
+# roller spinning at w slides at its contacts by
+#   wheel  a_w + r w
+#   cam    a_c + r w + c w_c     (c cam radius, w_c spin of the cam ring)
+#   slot   a_s + sigma r w       (sigma the side of the wall carrying the slot force)
+# with a_* from the motion of the roller center and of the cam. Spins settle where the Coulomb
+# losses sum(mu N |slip|), with the bearing loss, are smallest. That sum is convex and piecewise
+# linear, so a roller rolls on one of its contacts and the cam ring rolls on one roller or on its
+# bearing. All these candidates are evaluated at once for every angle, the cheapest is kept. The
+# loads come from RollerWaveDriveLoad; rolling resistance adds the hysteresis loss of the wheel and
+# cam contacts, which differs between balls and cylindrical rollers.
+#
+#   cd commands
+#   python -m createWaveDrive.RollerWaveDriveEfficiency --rollers 11 17 25 --eccentricity-factors 0.15 0.2 0.3
+import argparse
+import math
+import sys
+import time
+from typing import List, NamedTuple, Sequence
+
+from . import RollerWaveDriveGeometry as geometry
+from . import RollerWaveDriveLoad as load
+from .RollerWaveDriveParams import RollerWaveDriveParams
+from .RollerWaveDriveSpec import params_from_record
+
+STEPS = 128
+# Values of the (steps, candidates, rollers) arrays of one chunk
+CHUNK_VALUES = 1 << 21
+
+
+class Friction(NamedTuple):
+    wheel: float = 0.05
+    cam: float = 0.05
+    slot: float = 0.1
+    bearing: float = 0.0015  # equivalent coefficient at the bearing middle diameter
+    hysteresis: float = 0.01  # part of the elastic energy lost in rolling
+
+
+class Efficiency(NamedTuple):
+    cam_angles: Sequence[float]
+    roller_spins: Sequence  # (steps, rollers) per unit input speed
+    cam_spins: Sequence[float]  # (steps,) spin of the cam ring
+    sliding: dict  # (steps, rollers) sliding velocity at the wheel, cam and slot contacts, meters per radian
+    losses: dict  # energy lost per input radian at each kind of contact, joules
+    output: float  # output work per input radian, joules
+    efficiency: float
+
+
+def contact_motion(params: RollerWaveDriveParams, cam_angles) -> dict:
+    # (steps, rollers) sliding of every contact at zero spins, meters per input radian, and the
+    # directions of the contacts of the roller in the plane
+    np = geometry.np
+    roller_number = params.roller_number
+    thetas = (2 * math.pi * np.arange(roller_number)[None, :] - cam_angles[:, None]) / roller_number
+    relative = thetas - cam_angles[:, None]
+    e = params.eccentricity
+    contact_radius = params.roller_diameter / 2 + params.cam_radius
+    sin, cos = np.sin(relative), np.cos(relative)
+    s = np.sqrt(contact_radius ** 2 - (e * sin) ** 2)
+    l = e * cos + s
+    xi = np.arctan2((roller_number + 1) * e * sin, s)
+
+    # Radial and tangential directions of the slot, the center moves along both
+    ux, uy = np.sin(thetas), np.cos(thetas)
+    tx, ty = uy, -ux
+    dl = -e * sin * (1 + e * cos / s) * -(1 + 1 / roller_number)
+    vx, vy = dl * ux - l / roller_number * tx, dl * uy - l / roller_number * ty
+
+    # Tangents of the contacts, the normal turned a quarter counterclockwise
+    wheel_x, wheel_y = -np.cos(thetas + xi), np.sin(thetas + xi)
+    cam_x, cam_y = e * np.sin(cam_angles)[:, None] - l * ux, e * np.cos(cam_angles)[:, None] - l * uy
+    cam_x, cam_y = cam_x / contact_radius, cam_y / contact_radius
+    cam_velocity_x, cam_velocity_y = e * np.cos(cam_angles)[:, None], -e * np.sin(cam_angles)[:, None]
+    return {
+        'wheel': (vx * wheel_x + vy * wheel_y) * load.CM,
+        'cam': ((vx - cam_velocity_x) * -cam_y + (vy - cam_velocity_y) * cam_x) * load.CM,
+        'slot': dl * load.CM,
+        'wheel_normal': (np.sin(thetas + xi), np.cos(thetas + xi)),
+        'cam_normal': (-cam_x, -cam_y),  # from the cam ring to the roller
+        'tangential': (tx, ty),
+    }
+
+
+def slips(motion: dict, sides, roller_spins, cam_spins, roller_radius: float, cam_radius: float,
+          separator_spin: float) -> tuple:
+    return (motion['wheel'] + roller_radius * roller_spins,
+            motion['cam'] + roller_radius * roller_spins + cam_radius * cam_spins,
+            motion['slot'] + sides * roller_radius * (roller_spins - separator_spin))
+
+
+def settle_spins(motion: dict, weights: tuple, bearing_weight, sides, roller_radius: float, cam_radius: float,
+                 separator_spin: float, chunk_values: int = CHUNK_VALUES) -> tuple:
+    # Roller and cam ring spins of least loss. The cam ring candidates make a cam contact roll
+    # while its roller rolls on the wheel or on the slot, or turn the ring with the input.
+    np = geometry.np
+    wheel_weight, cam_weight, slot_weight = weights
+    steps, rollers = motion['wheel'].shape
+    on_wheel = -motion['wheel'] / roller_radius
+    on_slot = separator_spin - sides * motion['slot'] / roller_radius
+    cam_candidates = np.concatenate([
+        -(motion['cam'] + roller_radius * on_wheel) / cam_radius,
+        -(motion['cam'] + roller_radius * on_slot) / cam_radius,
+        -np.ones((steps, 1)),
+    ], axis=1)
+
+    def roller_losses(part: slice, cam_spins):
+        # Spin of every roller of the steps in part for each of their cam ring spins, with its loss
+        sliced = {name: motion[name][part, None, :] for name in ('wheel', 'cam', 'slot')}
+        side = sides[part, None, :]
+        on_cam = -(sliced['cam'] + cam_radius * cam_spins[..., None]) / roller_radius
+        best_loss = best_spin = None
+        for spin in np.broadcast_arrays(on_wheel[part, None, :], on_cam, on_slot[part, None, :]):
+            wheel, cam, slot = slips(sliced, side, spin, cam_spins[..., None], roller_radius, cam_radius,
+                                     separator_spin)
+            loss = (np.abs(wheel) * wheel_weight[part, None, :] + np.abs(cam) * cam_weight[part, None, :] +
+                    np.abs(slot) * slot_weight[part, None, :])
+            if best_loss is None:
+                best_loss, best_spin = loss, spin
+            else:
+                better = loss < best_loss
+                best_loss = np.where(better, loss, best_loss)
+                best_spin = np.where(better, spin, best_spin)
+        return best_spin, best_loss
+
+    roller_spins = np.empty((steps, rollers))
+    cam_spins = np.empty(steps)
+    chunk = max(1, chunk_values // (cam_candidates.shape[1] * rollers))
+    for start in range(0, steps, chunk):
+        part = slice(start, start + chunk)
+        candidates = cam_candidates[part]
+        spins, losses = roller_losses(part, candidates)
+        total = losses.sum(axis=2) + bearing_weight[part, None] * np.abs(candidates + 1)
+        best = total.argmin(axis=1)
+        index = np.arange(len(best))
+        cam_spins[part] = candidates[index, best]
+        roller_spins[part] = spins[index, best]
+    return roller_spins, cam_spins
+
+
+def analyze(params: RollerWaveDriveParams, torque: float = load.TORQUE, steps: int = STEPS,
+            friction: Friction = Friction(), roller_material: load.Material = load.STEEL,
+            part_material: load.Material = load.STEEL) -> Efficiency:
+    np = geometry.require_numpy('the efficiency analysis')
+    loads = load.solve(params, torque, steps, roller_material=roller_material, part_material=part_material)
+    motion = contact_motion(params, loads.cam_angles)
+    roller_radius = params.roller_diameter / 2 * load.CM
+    cam_radius = params.cam_radius * load.CM
+    separator_spin = 1 / params.roller_number
+
+    # Slot force from the balance of the roller, the wall on the other side of the center carries it
+    wheel_loads, cam_loads = loads.wheel_loads, loads.cam_loads
+    tx, ty = motion['tangential']
+    slot_loads = (wheel_loads * (motion['wheel_normal'][0] * tx + motion['wheel_normal'][1] * ty) -
+                  cam_loads * (motion['cam_normal'][0] * tx + motion['cam_normal'][1] * ty))
+    sides = np.where(slot_loads > 0, -1.0, 1.0)
+    bearing_load = np.hypot((cam_loads * motion['cam_normal'][0]).sum(axis=1),
+                            (cam_loads * motion['cam_normal'][1]).sum(axis=1))
+    bearing_weight = friction.bearing * bearing_load * params.bearing_middle_diameter / 2 * load.CM
+
+    weights = (friction.wheel * wheel_loads, friction.cam * cam_loads, friction.slot * np.abs(slot_loads))
+    roller_spins, cam_spins = settle_spins(motion, weights, bearing_weight, sides, roller_radius, cam_radius,
+                                           separator_spin)
+    wheel, cam, slot = slips(motion, sides, roller_spins, cam_spins[:, None], roller_radius, cam_radius,
+                             separator_spin)
+
+    # Rolling resistance of the hysteresis in the Hertz contacts, from the contact half widths
+    terms = load.contact_terms(params, loads.cam_angles)
+    rolling = 0.0
+    for loads_, stress, radius, spin in ((wheel_loads, loads.wheel_stress, terms['wheel_radius'], roller_spins),
+                                         (cam_loads, loads.cam_stress, terms['cam_radius'],
+                                          roller_spins - cam_spins[:, None])):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if params.use_balls:
+                half_width = np.sqrt(3 * loads_ / (2 * math.pi * stress))
+                force = 3 * friction.hysteresis * half_width * loads_ / (16 * radius)
+            else:
+                half_width = 2 * loads_ / (math.pi * stress * params.roller_height * load.CM)
+                force = 2 * friction.hysteresis * half_width * loads_ / (3 * math.pi * radius)
+        rolling = rolling + np.where(loads_ > 0, force, 0.0) * np.abs(spin) * roller_radius
+
+    losses = {
+        'wheel': float((weights[0] * np.abs(wheel)).sum(axis=1).mean()),
+        'cam': float((weights[1] * np.abs(cam)).sum(axis=1).mean()),
+        'slot': float((weights[2] * np.abs(slot)).sum(axis=1).mean()),
+        'bearing': float((bearing_weight * np.abs(cam_spins + 1)).mean()),
+        'rolling': float(rolling.sum(axis=1).mean()),
+    }
+    output = torque / params.roller_number
+    return Efficiency(loads.cam_angles, roller_spins, cam_spins, {'wheel': wheel, 'cam': cam, 'slot': slot},
+                      losses, output, output / (output + sum(losses.values())))
+
+
+def rank(family: List[RollerWaveDriveParams], torque: float = load.TORQUE, steps: int = STEPS,
+         friction: Friction = Friction(), part_material: load.Material = load.STEEL) -> list:
+    # (Efficiency, params) of every drive, most efficient first
+    result = [(analyze(params, torque, steps, friction, part_material=part_material), params) for params in family]
+    result.sort(key=lambda item: -item[0].efficiency)
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Sliding losses and efficiency of a family of wave drives')
+    parser.add_argument('--rollers', type=int, nargs='+', default=[17])
+    parser.add_argument('--eccentricity-factors', type=float, nargs='+',
+                        default=[RollerWaveDriveParams.ECCENTRICITY])
+    parser.add_argument('--elements', choices=('rollers', 'balls'), nargs='+', default=['rollers', 'balls'])
+    parser.add_argument('--roller-diameter', type=float, default=6, help='millimeters')
+    parser.add_argument('--torque', type=float, default=load.TORQUE, help='output torque, newton meters')
+    parser.add_argument('--steps', type=int, default=STEPS, help='steps of one input revolution')
+    for name, value in Friction._field_defaults.items():
+        parser.add_argument('--{}-friction'.format(name), dest=name, type=float, default=value)
+    parser.add_argument('--part-modulus', type=float, default=load.STEEL.elastic_modulus / 1e9,
+                        help='elastic modulus of the wheel and the cam, gigapascals')
+    args = parser.parse_args(argv)
+
+    family = []
+    for rollers in args.rollers:
+        for eccentricity_factor in args.eccentricity_factors:
+            for element in args.elements:
+                family.append(params_from_record({'rollers_number': rollers, 'roller_diameter': args.roller_diameter,
+                                                  'eccentricity_factor': eccentricity_factor,
+                                                  'use_balls': element == 'balls', 'use_minimal_diameter': True}))
+    friction = Friction(*(getattr(args, name) for name in Friction._fields))
+    part_material = load.Material(args.part_modulus * 1e9, load.STEEL.poisson_ratio)
+
+    started = time.perf_counter()
+    ranking = rank(family, args.torque, args.steps, friction, part_material)
+    print('{} drives in {:.2f} s'.format(len(family), time.perf_counter() - started))
+    print('{:34s} {:>10s} {}  {:>9s}'.format('', 'efficiency', ' '.join('{:>7s}'.format(name) for name in
+                                                                  ranking[0][0].losses), 'sliding'))
+    for result, params in ranking:
+        # Losses as parts of the input work, the largest sliding velocity in millimeters per input radian
+        total = result.output + sum(result.losses.values())
+        sliding = max(float(abs(values).max()) for values in result.sliding.values())
+        print('{:3d} rollers, factor {:.3f}, {:7s} {:10.2%} {}  {:9.3f}'.format(
+            params.roller_number, params.eccentricity_factor, 'balls' if params.use_balls else 'rollers',
+            result.efficiency, ' '.join('{:7.2%}'.format(loss / total) for loss in result.losses.values()),
+            sliding * 1e3))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,275 @@
+# 2D export of the drive straight from the geometry kernel: wheel profile, body, separator rings and
+# slots, cam, bearing and shaft circles and the rollers, in millimeters. The format follows the file
+# extension: .dxf (R12), .svg or .csv. Profile points are computed and written in chunks, so very
+# fine profiles never live in memory at once:
+#
+#   cd commands
+#   python -m createWaveDrive.RollerWaveDriveExport wheel.dxf --rollers 17 --points-per-lobe 4096
+#   python -m createWaveDrive.RollerWaveDriveExport plates.svg --spec drives.csv
+import argparse
+import csv
+import math
+import os
+import sys
+from typing import Iterator, TextIO
+
+from . import RollerWaveDriveGeometry as geometry
+from . import RollerWaveDriveOffset as offset
+from .RollerWaveDriveGeometry import Arc
+from .RollerWaveDriveParams import RollerWaveDriveParams
+from .RollerWaveDriveSpec import MM, load_spec, params_from_record
+
+CHUNK_POINTS = 65536
+LAYERS = ('WHEEL', 'TOOLPATH', 'BODY', 'SEPARATOR', 'CAM', 'BEARING', 'SHAFT', 'ROLLERS')
+FORMATS = ('.dxf', '.svg', '.csv')
+
+
+def profile_chunks(params: RollerWaveDriveParams, resolution: int = None,
+                   chunk_points: int = CHUNK_POINTS) -> Iterator:
+    # (xs, ys) of the closed wheel profile, chunk by chunk. Without a resolution the points are the ones of
+    # compute_geometry, adaptive when the params have a profile tolerance.
+    if resolution is None:
+        thetas, _ = geometry.profile_angles(params)
+        for start in range(0, len(thetas), chunk_points):
+            yield geometry.profile_at(params, thetas[start:start + chunk_points])
+        return
+    for start in range(0, resolution, chunk_points):
+        yield geometry.profile_at(params, geometry.sample_angles(resolution, start, min(start + chunk_points,
+                                                                                          resolution)))
+
+
+def slot_outline(params: RollerWaveDriveParams, index: int) -> list:
+    # Separator slot of create_square_hole rotated to roller index, also the footprint of a ball hole
+    half_width = params.roller_diameter / 2 + params.roller_tolerance
+    inner = params.separator_middle_radius - params.separator_thickness
+    outer = params.separator_middle_radius + params.separator_thickness
+    angle = 2 * math.pi * index / params.roller_number
+    cos, sin = math.cos(angle), math.sin(angle)
+    corners = ((-half_width, inner), (half_width, inner), (half_width, outer), (-half_width, outer))
+    return [(x * cos + y * sin, y * cos - x * sin) for x, y in corners]
+
+
+def is_counterclockwise(arc: Arc) -> bool:
+    return ((arc.middle[0] - arc.start[0]) * (arc.end[1] - arc.middle[1]) -
+            (arc.middle[1] - arc.start[1]) * (arc.end[0] - arc.middle[0])) > 0
+
+
+class DxfWriter:
+    def __init__(self, file: TextIO):
+        self.file = file
+
+    def pair(self, code: int, value):
+        self.file.write('{}\n{}\n'.format(code, value))
+
+    def begin(self):
+        for code, value in ((0, 'SECTION'), (2, 'HEADER'), (9, '$ACADVER'), (1, 'AC1009'), (0, 'ENDSEC'),
+                            (0, 'SECTION'), (2, 'TABLES'), (0, 'TABLE'), (2, 'LAYER'), (70, len(LAYERS))):
+            self.pair(code, value)
+        for color, layer in enumerate(LAYERS, 1):
+            for code, value in ((0, 'LAYER'), (2, layer), (70, 0), (62, color), (6, 'CONTINUOUS')):
+                self.pair(code, value)
+        for code, value in ((0, 'ENDTAB'), (0, 'ENDSEC'), (0, 'SECTION'), (2, 'ENTITIES')):
+            self.pair(code, value)
+
+    def circle(self, layer: str, x: float, y: float, radius: float):
+        for code, value in ((0, 'CIRCLE'), (8, layer), (10, x), (20, y), (30, 0.0), (40, radius)):
+            self.pair(code, value)
+
+    def arc(self, layer: str, arc: Arc):
+        if arc.center is None:
+            for code, value in ((0, 'LINE'), (8, layer), (10, arc.start[0]), (20, arc.start[1]), (30, 0.0),
+                                (11, arc.end[0]), (21, arc.end[1]), (31, 0.0)):
+                self.pair(code, value)
+            return
+        # DXF arcs run counterclockwise from the start angle to the end angle
+        start, end = (arc.start, arc.end) if is_counterclockwise(arc) else (arc.end, arc.start)
+        cx, cy = arc.center
+        for code, value in ((0, 'ARC'), (8, layer), (10, cx), (20, cy), (30, 0.0), (40, arc.radius),
+                            (50, math.degrees(math.atan2(start[1] - cy, start[0] - cx))),
+                            (51, math.degrees(math.atan2(end[1] - cy, end[0] - cx)))):
+            self.pair(code, value)
+
+    def polyline(self, layer: str, chunks: Iterator):
+        for code, value in ((0, 'POLYLINE'), (8, layer), (66, 1), (10, 0.0), (20, 0.0), (30, 0.0), (70, 1)):
+            self.pair(code, value)
+        for xs, ys in chunks:
+            self.file.write(''.join('0\nVERTEX\n8\n{}\n10\n{}\n20\n{}\n30\n0.0\n'.format(layer, x, y)
+                                    for x, y in zip(xs, ys)))
+        self.pair(0, 'SEQEND')
+
+    def end(self):
+        self.pair(0, 'ENDSEC')
+        self.pair(0, 'EOF')
+
+
+class SvgWriter:
+    # Model coordinates inside a group flipping y, so the drawing is not mirrored
+    def __init__(self, file: TextIO, extent: float):
+        self.file = file
+        self.extent = extent
+        self.layer = None
+
+    def begin(self):
+        size = 2 * self.extent
+        self.file.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                        '<svg xmlns="http://www.w3.org/2000/svg" width="{0}mm" height="{0}mm" '
+                        'viewBox="{1} {1} {0} {0}">\n'
+                        '<g transform="scale(1,-1)" fill="none" stroke="black" stroke-width="0.1">\n'
+                        .format(size, -self.extent))
+
+    def group(self, layer: str):
+        if layer != self.layer:
+            if self.layer is not None:
+                self.file.write('</g>\n')
+            self.file.write('<g id="{}">\n'.format(layer))
+            self.layer = layer
+
+    def circle(self, layer: str, x: float, y: float, radius: float):
+        self.group(layer)
+        self.file.write('<circle cx="{}" cy="{}" r="{}"/>\n'.format(x, y, radius))
+
+    def arc(self, layer: str, arc: Arc):
+        self.group(layer)
+        if arc.center is None:
+            segment = 'L {} {}'.format(*arc.end)
+        else:
+            segment = 'A {0} {0} 0 0 {1} {2} {3}'.format(arc.radius, int(is_counterclockwise(arc)), *arc.end)
+        self.file.write('<path d="M {} {} {}"/>\n'.format(arc.start[0], arc.start[1], segment))
+
+    def polyline(self, layer: str, chunks: Iterator):
+        self.group(layer)
+        self.file.write('<path d="M')
+        for xs, ys in chunks:
+            self.file.write(''.join(' {} {}'.format(x, y) for x, y in zip(xs, ys)))
+        self.file.write(' Z"/>\n')
+
+    def end(self):
+        if self.layer is not None:
+            self.file.write('</g>\n')
+        self.file.write('</g>\n</svg>\n')
+
+
+class CsvWriter:
+    # One row per point or circle: kind, layer, x, y, radius
+    def __init__(self, file: TextIO):
+        self.writer = csv.writer(file)
+
+    def begin(self):
+        self.writer.writerow(('kind', 'layer', 'x', 'y', 'radius'))
+
+    def circle(self, layer: str, x: float, y: float, radius: float):
+        self.writer.writerow(('circle', layer, x, y, radius))
+
+    def arc(self, layer: str, arc: Arc):
+        radius = '' if arc.center is None else arc.radius
+        for kind, point in (('arc_start', arc.start), ('arc_middle', arc.middle), ('arc_end', arc.end)):
+            self.writer.writerow((kind, layer, point[0], point[1], radius))
+
+    def polyline(self, layer: str, chunks: Iterator):
+        for xs, ys in chunks:
+            self.writer.writerows(('point', layer, x, y, '') for x, y in zip(xs, ys))
+
+    def end(self):
+        pass
+
+
+WRITERS = {'.dxf': DxfWriter, '.svg': SvgWriter, '.csv': CsvWriter}
+
+
+def scaled_chunks(chunks: Iterator, scale: float) -> Iterator:
+    for xs, ys in chunks:
+        yield [x * scale for x in xs.tolist()], [y * scale for y in ys.tolist()]
+
+
+def scaled_arc(arc: Arc, scale: float) -> Arc:
+    def point(value):
+        return None if value is None else (value[0] * scale, value[1] * scale)
+
+    return Arc(point(arc.start), point(arc.middle), point(arc.end), point(arc.center), arc.radius * scale)
+
+
+def write_drive(writer, params: RollerWaveDriveParams, resolution: int = None, chunk_points: int = CHUNK_POINTS):
+    scale = 1 / MM
+    if params.use_arcs and resolution is None:
+        arcs, _ = geometry.arc_profile(params, params.profile_tolerance or geometry.ARC_TOLERANCE)
+        for arc in arcs:
+            writer.arc('WHEEL', scaled_arc(arc, scale))
+    else:
+        writer.polyline('WHEEL', scaled_chunks(profile_chunks(params, resolution, chunk_points), scale))
+    if params.tool_radius:
+        # Trimming needs the whole closed curve, the tool path is not streamed
+        toolpath = offset.offset_profile(params, params.tool_radius, resolution)
+        writer.polyline('TOOLPATH', iter([([x * scale for x in toolpath.xs], [y * scale for y in toolpath.ys])]))
+
+    # The builder draws the body circle with the body diameter as its radius
+    writer.circle('BODY', 0.0, 0.0, params.body_diameter * scale)
+    writer.circle('SEPARATOR', 0.0, 0.0, params.separator_inner_radius * scale)
+    writer.circle('SEPARATOR', 0.0, 0.0, params.separator_outer_radius * scale)
+    for i in range(params.roller_number):
+        outline = [(x * scale, y * scale) for x, y in slot_outline(params, i)]
+        writer.polyline('SEPARATOR', iter([([x for x, _ in outline], [y for _, y in outline])]))
+
+    cam_y = params.eccentricity * scale
+    writer.circle('CAM', 0.0, cam_y, params.cam_radius * scale)
+    writer.circle('BEARING', 0.0, cam_y, params.bearing_outer_diameter / 2 * scale)
+    writer.circle('BEARING', 0.0, cam_y, params.bearing_inner_diameter / 2 * scale)
+    writer.circle('SHAFT', 0.0, 0.0, params.shaft_diameter / 2 * scale)
+
+    roller_x, roller_y = geometry.roller_centers(params)
+    for x, y in zip(roller_x.tolist(), roller_y.tolist()):
+        writer.circle('ROLLERS', x * scale, y * scale, params.roller_diameter / 2 * scale)
+
+
+def export(params: RollerWaveDriveParams, path: str, resolution: int = None, chunk_points: int = CHUNK_POINTS):
+    # resolution overrides the profile points of the params, e.g. for a much finer profile than the model
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in WRITERS:
+        raise ValueError('Unknown export format {}, use one of {}'.format(extension, ', '.join(FORMATS)))
+    with open(path, 'w', newline='' if extension == '.csv' else None) as file:
+        if extension == '.svg':
+            # The view box holds the wheel and the rollers
+            extent = max(params.body_diameter, params.cycloid_diameter + params.roller_diameter) / MM * 1.05
+            writer = SvgWriter(file, extent)
+        else:
+            writer = WRITERS[extension](file)
+        writer.begin()
+        write_drive(writer, params, resolution, chunk_points)
+        writer.end()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Export the wave drive plates to DXF, SVG or CSV')
+    parser.add_argument('output', help='.dxf, .svg or .csv file, with a spec every drive gets a numbered file')
+    parser.add_argument('--spec', help='CSV or JSON drive family as used by the batch command')
+    parser.add_argument('--rollers', type=int, default=17)
+    parser.add_argument('--roller-diameter', type=float, default=6, help='millimeters')
+    parser.add_argument('--cycloid-diameter', type=float, help='millimeters, the minimal one by default')
+    parser.add_argument('--use-arcs', action='store_true', help='export the wheel as arcs')
+    parser.add_argument('--points-per-lobe', type=int,
+                        help='fixed profile points per lobe, the points of the model by default')
+    parser.add_argument('--tool-radius', type=float, default=0,
+                        help='millimeters, adds the tool path of a cutter or half the laser kerf')
+    args = parser.parse_args(argv)
+
+    if args.spec:
+        drives = load_spec(args.spec)
+    else:
+        record = {'rollers_number': args.rollers, 'roller_diameter': args.roller_diameter, 'use_arcs': args.use_arcs,
+                  'tool_radius': args.tool_radius}
+        if args.cycloid_diameter is None:
+            record['use_minimal_diameter'] = True
+        else:
+            record['cycloid_diameter'] = args.cycloid_diameter
+        drives = [params_from_record(record)]
+
+    root, extension = os.path.splitext(args.output)
+    for i, params in enumerate(drives, 1):
+        path = args.output if len(drives) == 1 else '{}-{}{}'.format(root, i, extension)
+        resolution = None if args.points_per_lobe is None else args.points_per_lobe * (params.roller_number + 1)
+        export(params, path, resolution)
+        print(path)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,479 @@
+# Geometry kernel of the wave drive. It has no dependency on adsk, so it can be used
+# (and benchmarked) outside Fusion. NumPy is used when it is available, otherwise the
+# same formulas are evaluated with plain python and returned as array('d').
+import functools
+import math
+from array import array
+from typing import NamedTuple, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .RollerWaveDriveParams import RollerWaveDriveParams
+
+
+ADAPTIVE_INITIAL_SEGMENTS = 4
+ADAPTIVE_MAX_DEPTH = 16
+# The spline deviation of a segment shrinks at least with this power of its width
+ADAPTIVE_ORDER = 3
+# Knot placements tried before the segments still above the tolerance are split in halves
+ADAPTIVE_ROUNDS = 6
+# The target of the next placement shrinks by this factor when a placement misses the tolerance
+ADAPTIVE_MARGIN = 0.9
+# Fractions of a segment where the curve is compared with its approximation
+CURVE_PROBES = tuple(i / 8 for i in range(1, 8))
+# Tolerance of the arc profile when the params have none
+ARC_TOLERANCE = 0.001
+ARC_PROBES = tuple(i / 16 for i in range(1, 16))
+# The probes can miss the peak deviation of a segment by a few percent
+ARC_TOLERANCE_MARGIN = 0.9
+# Unit profiles kept in memory, one per shape and sampling
+UNIT_PROFILE_CACHE_SIZE = 64
+
+
+class Arc(NamedTuple):
+    start: tuple
+    middle: tuple
+    end: tuple
+    center: tuple  # None for a straight segment
+    radius: float  # math.inf for a straight segment
+
+
+class UnitProfile(NamedTuple):
+    # Profile of a drive with a roller diameter of 1. Shared by every drive of the shape, not to be modified.
+    thetas: Sequence[float]
+    xs: Sequence[float]
+    ys: Sequence[float]
+    normal_x: Sequence[float]  # unit contact normals, pointing away from the rollers
+    normal_y: Sequence[float]
+    max_deviation: float
+
+
+class DriveGeometry(NamedTuple):
+    profile_x: Sequence[float]
+    profile_y: Sequence[float]
+    roller_x: Sequence[float]
+    roller_y: Sequence[float]
+    max_deviation: float = 0.0
+    arcs: Sequence[Arc] = None  # the wheel profile as tangent continuous arcs, when the params use arcs
+    toolpath: object = None  # RollerWaveDriveOffset.OffsetProfile of the wheel, when the params have a tool radius
+
+
+def require_numpy(feature: str):
+    if np is None:
+        raise ImportError('NumPy is required for {}'.format(feature))
+    return np
+
+
+def sample_angles(count: int, start: int = 0, stop: int = None) -> Sequence[float]:
+    stop = count if stop is None else stop
+    if np is not None:
+        return np.arange(start, stop, dtype=float) * (2 * math.pi / count)
+    return array('d', (2 * math.pi * i / count for i in range(start, stop)))
+
+
+def wave_terms(params: RollerWaveDriveParams, thetas: Sequence[float]):
+    # Distance from the center to the roller at the polar angle theta and the angle
+    # between the radial direction and the contact normal of the wheel.
+    num_dimples = params.roller_number + 1
+    eccentricity = params.eccentricity
+    contact_radius = params.roller_diameter / 2 + params.cam_radius
+
+    if np is not None:
+        thetas = np.asarray(thetas, dtype=float)
+        offset = eccentricity * np.sin(num_dimples * thetas)
+        s = np.sqrt(contact_radius ** 2 - offset ** 2)
+        l = eccentricity * np.cos(num_dimples * thetas) + s
+        xi = np.arctan2(num_dimples * offset, s)
+        return l, xi
+
+    ls = array('d')
+    xis = array('d')
+    for theta in thetas:
+        offset = eccentricity * math.sin(num_dimples * theta)
+        s = math.sqrt(contact_radius ** 2 - offset ** 2)
+        ls.append(eccentricity * math.cos(num_dimples * theta) + s)
+        xis.append(math.atan2(num_dimples * offset, s))
+    return ls, xis
+
+
+def profile_at(params: RollerWaveDriveParams, thetas: Sequence[float], offset: float = 0.0):
+    # The contact direction is the profile normal, offset moves the points along it towards the roller centers
+    ball_radius = params.roller_diameter / 2 - offset
+    l, xi = wave_terms(params, thetas)
+
+    if np is not None:
+        thetas = np.asarray(thetas, dtype=float)
+        xs = l * np.sin(thetas) + ball_radius * np.sin(thetas + xi)
+        ys = l * np.cos(thetas) + ball_radius * np.cos(thetas + xi)
+        return xs, ys
+
+    xs = array('d')
+    ys = array('d')
+    for theta, li, xii in zip(thetas, l, xi):
+        xs.append(li * math.sin(theta) + ball_radius * math.sin(theta + xii))
+        ys.append(li * math.cos(theta) + ball_radius * math.cos(theta + xii))
+    return xs, ys
+
+
+def profile_points(params: RollerWaveDriveParams, resolution: int = None):
+    return scaled_profile(params, params.resolution if resolution is None else resolution)
+
+
+def shape_key(params: RollerWaveDriveParams) -> tuple:
+    # The profile shape only depends on these, all lengths scale with the roller diameter. The ratio is
+    # rounded, so drives of one shape given at different sizes share their unit profile.
+    return (params.roller_number, params.eccentricity_factor,
+            float('{:.12g}'.format(params.cycloid_diameter / params.roller_diameter)))
+
+
+def profile_key(params: RollerWaveDriveParams) -> tuple:
+    # The wheel profile and the roller centers of compute_geometry only depend on these
+    return shape_key(params) + (params.roller_diameter, params.profile_tolerance, params.points_per_lobe,
+                                params.use_arcs)
+
+
+@functools.lru_cache(maxsize=UNIT_PROFILE_CACHE_SIZE)
+def unit_profile(roller_number: int, eccentricity_factor: float, cycloid_ratio: float, resolution: int = None,
+                 tolerance: float = 0.0) -> UnitProfile:
+    # Sampled at resolution angles, or adaptively within the tolerance (relative to the roller diameter)
+    params = RollerWaveDriveParams(1.0, roller_number, False, 1.0, False, cycloid_ratio, 0, 0, 0, 0, 0, 0,
+                                   eccentricity_factor=eccentricity_factor)
+    if resolution is None:
+        thetas, max_deviation = adaptive_angles(params, tolerance)
+    else:
+        thetas = sample_angles(resolution)
+        max_deviation = uniform_deviation(params, resolution)
+    l, xi = wave_terms(params, thetas)
+
+    if np is not None:
+        normal_x, normal_y = np.sin(thetas + xi), np.cos(thetas + xi)
+        xs = l * np.sin(thetas) + normal_x / 2
+        ys = l * np.cos(thetas) + normal_y / 2
+        for values in (thetas, xs, ys, normal_x, normal_y):
+            values.flags.writeable = False
+        return UnitProfile(thetas, xs, ys, normal_x, normal_y, max_deviation)
+
+    normal_x = array('d', (math.sin(theta + xii) for theta, xii in zip(thetas, xi)))
+    normal_y = array('d', (math.cos(theta + xii) for theta, xii in zip(thetas, xi)))
+    xs = array('d', (li * math.sin(theta) + nx / 2 for theta, li, nx in zip(thetas, l, normal_x)))
+    ys = array('d', (li * math.cos(theta) + ny / 2 for theta, li, ny in zip(thetas, l, normal_y)))
+    return UnitProfile(thetas, xs, ys, normal_x, normal_y, max_deviation)
+
+
+def params_unit_profile(params: RollerWaveDriveParams, resolution: int = None) -> UnitProfile:
+    # Unit profile with the sampling of the wheel of the params, adaptive when they have a tolerance
+    if resolution is None and params.profile_tolerance > 0:
+        tolerance = float('{:.12g}'.format(params.profile_tolerance / params.roller_diameter))
+        return unit_profile(*shape_key(params), tolerance=tolerance)
+    return unit_profile(*shape_key(params), params.resolution if resolution is None else resolution)
+
+
+def scaled_profile(params: RollerWaveDriveParams, resolution: int = None, offset: float = 0.0):
+    # Profile points of the params from their unit profile, offset towards the rollers like profile_at
+    unit = params_unit_profile(params, resolution)
+    scale = params.roller_diameter
+    if np is not None:
+        return unit.xs * scale - offset * unit.normal_x, unit.ys * scale - offset * unit.normal_y
+    return (array('d', (x * scale - offset * nx for x, nx in zip(unit.xs, unit.normal_x))),
+            array('d', (y * scale - offset * ny for y, ny in zip(unit.ys, unit.normal_y))))
+
+
+def spline_deviations(params: RollerWaveDriveParams, knots: Sequence[float], period: float) -> list:
+    # Largest distance of every segment between the profile and the closed Catmull-Rom spline through
+    # its points at the knots, the spline the benchmark reconstructs a fitted spline with. The knots
+    # are sorted angles that repeat after period. The distance is taken at equal angles, which is
+    # never less than the distance to the nearest point of the curve.
+    count = len(knots)
+    if np is not None:
+        knots = np.asarray(knots, dtype=float)
+        extended = np.concatenate([knots[-1:] - period, knots, knots[:2] + period])
+        t0, t1, t2, t3 = (extended[i:i + count, None] for i in range(4))
+        t = t1 + (t2 - t1) * np.array(CURVE_PROBES)[None, :]
+        xs, ys = profile_at(params, np.concatenate([extended, t.ravel()]))
+        curve = []
+        for values in (xs, ys):
+            p0, p1, p2, p3 = (values[i:i + count, None] for i in range(4))
+            a1 = ((t1 - t) * p0 + (t - t0) * p1) / (t1 - t0)
+            a2 = ((t2 - t) * p1 + (t - t1) * p2) / (t2 - t1)
+            a3 = ((t3 - t) * p2 + (t - t2) * p3) / (t3 - t2)
+            b1 = ((t2 - t) * a1 + (t - t0) * a2) / (t2 - t0)
+            b2 = ((t3 - t) * a2 + (t - t1) * a3) / (t3 - t1)
+            curve.append(((t2 - t) * b1 + (t - t1) * b2) / (t2 - t1) - values[count + 3:].reshape(count, -1))
+        return np.hypot(*curve).max(axis=1).tolist()
+
+    knots = list(knots)
+    extended = [knots[-1] - period] + knots + [knot + period for knot in knots[:2]]
+    probes = [a + (b - a) * k for a, b in zip(extended[1:count + 1], extended[2:count + 2]) for k in CURVE_PROBES]
+    xs, ys = profile_at(params, extended + probes)
+    xs, ys = xs.tolist(), ys.tolist()
+
+    deviations = []
+    for i in range(count):
+        t0, t1, t2, t3 = extended[i:i + 4]
+        deviation = 0.0
+        for k, fraction in enumerate(CURVE_PROBES):
+            t = t1 + (t2 - t1) * fraction
+            point = []
+            for p0, p1, p2, p3 in (xs[i:i + 4], ys[i:i + 4]):
+                a1 = ((t1 - t) * p0 + (t - t0) * p1) / (t1 - t0)
+                a2 = ((t2 - t) * p1 + (t - t1) * p2) / (t2 - t1)
+                a3 = ((t3 - t) * p2 + (t - t2) * p3) / (t3 - t2)
+                b1 = ((t2 - t) * a1 + (t - t0) * a2) / (t2 - t0)
+                b2 = ((t3 - t) * a2 + (t - t1) * a3) / (t3 - t1)
+                point.append(((t2 - t) * b1 + (t - t1) * b2) / (t2 - t1))
+            probe = count + 3 + i * len(CURVE_PROBES) + k
+            deviation = max(deviation, math.hypot(point[0] - xs[probe], point[1] - ys[probe]))
+        deviations.append(deviation)
+    return deviations
+
+
+def profile_deviation(params: RollerWaveDriveParams, thetas: Sequence[float]) -> float:
+    return max(spline_deviations(params, thetas, 2 * math.pi))
+
+
+def uniform_deviation(params: RollerWaveDriveParams, resolution: int) -> float:
+    # Deviation of resolution equal segments. With whole segments per lobe every lobe has the same
+    # segments, so one lobe is measured.
+    num_dimples = params.roller_number + 1
+    if resolution % num_dimples:
+        return profile_deviation(params, sample_angles(resolution))
+    per_lobe = resolution // num_dimples
+    lobe = 2 * math.pi / num_dimples
+    return max(spline_deviations(params, [lobe * i / per_lobe for i in range(per_lobe)], lobe))
+
+
+def equidistributed_angles(knots: list, deviations: list, period: float, tolerance: float) -> list:
+    # Knots with about the same deviation on every segment. The deviation of a segment is taken as
+    # c * width ** ADAPTIVE_ORDER with c constant over the measured segment, so the knots are placed at
+    # equal steps of the integral of c ** (1 / ADAPTIVE_ORDER).
+    ends = knots[1:] + [period]
+    cumulative = [0.0]
+    for deviation in deviations:
+        cumulative.append(cumulative[-1] + deviation ** (1 / ADAPTIVE_ORDER))
+    count = max(ADAPTIVE_INITIAL_SEGMENTS, math.ceil(cumulative[-1] / tolerance ** (1 / ADAPTIVE_ORDER)))
+
+    angles, segment = [], 0
+    for k in range(count):
+        target = cumulative[-1] * k / count
+        while cumulative[segment + 1] < target:
+            segment += 1
+        share = cumulative[segment + 1] - cumulative[segment]
+        fraction = (target - cumulative[segment]) / share if share > 0 else 0.0
+        angles.append(knots[segment] + (ends[segment] - knots[segment]) * fraction)
+    return angles
+
+
+def adaptive_angles(params: RollerWaveDriveParams, tolerance: float):
+    # The profile repeats for every dimple, so only one lobe is sampled. The knots are placed again from
+    # the deviations they measure, denser where the curve bends most, and the fewest knots that meet the
+    # tolerance are kept. If no placement meets it, the segments above it are split in halves. A spline
+    # segment also depends on the neighbouring points, so all of them are measured again after every change.
+    num_dimples = params.roller_number + 1
+    lobe = 2 * math.pi / num_dimples
+
+    lobe_angles = [lobe * i / ADAPTIVE_INITIAL_SEGMENTS for i in range(ADAPTIVE_INITIAL_SEGMENTS)]
+    deviations = spline_deviations(params, lobe_angles, lobe)
+    best = (lobe_angles, deviations) if max(deviations) <= tolerance else None
+    target = tolerance
+    for _ in range(ADAPTIVE_ROUNDS):
+        lobe_angles = equidistributed_angles(lobe_angles, deviations, lobe, target)
+        deviations = spline_deviations(params, lobe_angles, lobe)
+        if max(deviations) > tolerance:
+            target *= ADAPTIVE_MARGIN
+        elif best is None or len(lobe_angles) < len(best[0]):
+            best = lobe_angles, deviations
+    if best is not None:
+        lobe_angles, deviations = best
+
+    smallest = lobe / ADAPTIVE_INITIAL_SEGMENTS / 2 ** ADAPTIVE_MAX_DEPTH
+    while True:
+        refined_angles = []
+        for i, (angle, deviation) in enumerate(zip(lobe_angles, deviations)):
+            refined_angles.append(angle)
+            end = lobe_angles[i + 1] if i + 1 < len(lobe_angles) else lobe
+            if deviation > tolerance and end - angle > smallest:
+                refined_angles.append((angle + end) / 2)
+        if len(refined_angles) == len(lobe_angles):
+            break
+        lobe_angles = refined_angles
+        deviations = spline_deviations(params, lobe_angles, lobe)
+
+    thetas = [angle + lobe * i for i in range(num_dimples) for angle in lobe_angles]
+    if np is not None:
+        thetas = np.array(thetas)
+    else:
+        thetas = array('d', thetas)
+    return thetas, max(deviations)
+
+
+def catmull_rom(thetas, xs, ys, samples: int):
+    # Closed non-uniform Catmull-Rom (Barry-Goldman) evaluated at `samples` parameters
+    # of every segment. Returns arrays of shape (segments, samples).
+    require_numpy('the spline reconstruction')
+    count = len(thetas)
+    period = 2 * math.pi
+    knots = np.concatenate([thetas[-1:] - period, thetas, thetas[:2] + period])
+    points = np.stack([xs, ys], axis=-1)
+    points = np.concatenate([points[-1:], points, points[:2]])
+
+    t0, t1, t2, t3 = (knots[i:i + count, None, None] for i in range(4))
+    p0, p1, p2, p3 = (points[i:i + count, None, :] for i in range(4))
+
+    fractions = np.linspace(0.0, 1.0, samples, endpoint=False)[None, :, None]
+    t = t1 + (t2 - t1) * fractions
+
+    a1 = (t1 - t) / (t1 - t0) * p0 + (t - t0) / (t1 - t0) * p1
+    a2 = (t2 - t) / (t2 - t1) * p1 + (t - t1) / (t2 - t1) * p2
+    a3 = (t3 - t) / (t3 - t2) * p2 + (t - t2) / (t3 - t2) * p3
+    b1 = (t2 - t) / (t2 - t0) * a1 + (t - t0) / (t2 - t0) * a2
+    b2 = (t3 - t) / (t3 - t1) * a2 + (t - t1) / (t3 - t1) * a3
+    c = (t2 - t) / (t2 - t1) * b1 + (t - t1) / (t2 - t1) * b2
+    return c[..., 0], c[..., 1]
+
+
+def profile_tangents(params: RollerWaveDriveParams, thetas: Sequence[float]):
+    # Points and unit tangents of the profile at the given angles, as lists of (x, y) tuples
+    delta = 1e-6
+    thetas = list(thetas)
+    xs, ys = profile_at(params, thetas)
+    xm, ym = profile_at(params, [t - delta for t in thetas])
+    xp, yp = profile_at(params, [t + delta for t in thetas])
+    points = list(zip(xs.tolist(), ys.tolist()))
+    tangents = []
+    for x0, y0, x1, y1 in zip(xm.tolist(), ym.tolist(), xp.tolist(), yp.tolist()):
+        length = math.hypot(x1 - x0, y1 - y0)
+        tangents.append(((x1 - x0) / length, (y1 - y0) / length))
+    return points, tangents
+
+
+def arc_from_tangent(start: tuple, tangent: tuple, end: tuple) -> Arc:
+    # Arc leaving start along tangent and ending at end, shorter than a half circle
+    wx, wy = end[0] - start[0], end[1] - start[1]
+    nx, ny = -tangent[1], tangent[0]
+    chord2 = wx * wx + wy * wy
+    normal_offset = nx * wx + ny * wy
+    middle_x, middle_y = (start[0] + end[0]) / 2, (start[1] + end[1]) / 2
+    if abs(normal_offset) <= 1e-12 * chord2:
+        return Arc(start, (middle_x, middle_y), end, None, math.inf)
+
+    scale = chord2 / (2 * normal_offset)
+    center = (start[0] + nx * scale, start[1] + ny * scale)
+    radius = abs(scale)
+    dx, dy = middle_x - center[0], middle_y - center[1]
+    length = math.hypot(dx, dy)
+    return Arc(start, (center[0] + dx / length * radius, center[1] + dy / length * radius), end, center, radius)
+
+
+def biarc(start: tuple, start_tangent: tuple, end: tuple, end_tangent: tuple) -> tuple:
+    # Two arcs from start to end matching both tangents, with equal tangent lengths d. The joint
+    # is the middle of the segment between start + d * start_tangent and end - d * end_tangent.
+    vx, vy = end[0] - start[0], end[1] - start[1]
+    tx, ty = start_tangent[0] + end_tangent[0], start_tangent[1] + end_tangent[1]
+    vt = vx * tx + vy * ty
+    vv = vx * vx + vy * vy
+    k = 2 * (1 - (start_tangent[0] * end_tangent[0] + start_tangent[1] * end_tangent[1]))
+    if k < 1e-12:
+        d = vv / (2 * vt)
+    else:
+        d = (-vt + math.sqrt(vt * vt + k * vv)) / k
+    joint = ((start[0] + end[0] + d * (start_tangent[0] - end_tangent[0])) / 2,
+             (start[1] + end[1] + d * (start_tangent[1] - end_tangent[1])) / 2)
+    # The second arc is built backwards from its end
+    second = arc_from_tangent(end, (-end_tangent[0], -end_tangent[1]), joint)
+    return arc_from_tangent(start, start_tangent, joint), Arc(joint, second.middle, end, second.center, second.radius)
+
+
+def arc_distance(point: tuple, arc: Arc) -> float:
+    if arc.center is None:
+        ax, ay = arc.start
+        dx, dy = arc.end[0] - ax, arc.end[1] - ay
+        t = min(1.0, max(0.0, ((point[0] - ax) * dx + (point[1] - ay) * dy) / (dx * dx + dy * dy)))
+        return math.hypot(point[0] - ax - t * dx, point[1] - ay - t * dy)
+    return abs(math.hypot(point[0] - arc.center[0], point[1] - arc.center[1]) - arc.radius)
+
+
+def rotate_arc(arc: Arc, angle: float) -> Arc:
+    # Rotation by angle in the polar angle of the profile, measured from +y towards +x
+    cos, sin = math.cos(angle), math.sin(angle)
+
+    def rotate(point):
+        return None if point is None else (point[0] * cos + point[1] * sin, point[1] * cos - point[0] * sin)
+
+    return Arc(rotate(arc.start), rotate(arc.middle), rotate(arc.end), rotate(arc.center), arc.radius)
+
+
+def arc_profile(params: RollerWaveDriveParams, tolerance: float):
+    # Biarcs of one lobe, segments are split in halves until the exact curve stays within the
+    # tolerance at ARC_PROBES of every segment. The lobe is then rotated around the wheel.
+    num_dimples = params.roller_number + 1
+    lobe = 2 * math.pi / num_dimples
+
+    segments = [(lobe * i / ADAPTIVE_INITIAL_SEGMENTS, lobe * (i + 1) / ADAPTIVE_INITIAL_SEGMENTS)
+                for i in range(ADAPTIVE_INITIAL_SEGMENTS)]
+    lobe_arcs = []
+    max_deviation = 0.0
+    depth = 0
+    while segments:
+        count = len(segments)
+        points, tangents = profile_tangents(params, [a for a, _ in segments] + [b for _, b in segments])
+        probe_x, probe_y = profile_at(params, [a + (b - a) * k for a, b in segments for k in ARC_PROBES])
+        probes = list(zip(probe_x.tolist(), probe_y.tolist()))
+
+        refined = []
+        for i, (a, b) in enumerate(segments):
+            arcs = biarc(points[i], tangents[i], points[i + count], tangents[i + count])
+            deviation = max(min(arc_distance(probe, arc) for arc in arcs)
+                            for probe in probes[i * len(ARC_PROBES):(i + 1) * len(ARC_PROBES)])
+            if deviation > tolerance * ARC_TOLERANCE_MARGIN and depth < ADAPTIVE_MAX_DEPTH:
+                middle = (a + b) / 2
+                refined += [(a, middle), (middle, b)]
+            else:
+                lobe_arcs.append((a, arcs))
+                max_deviation = max(max_deviation, deviation)
+        segments = refined
+        depth += 1
+
+    lobe_arcs.sort(key=lambda item: item[0])
+    arcs = [rotate_arc(arc, lobe * i) if i else arc
+            for i in range(num_dimples) for _, pair in lobe_arcs for arc in pair]
+    return arcs, max_deviation
+
+
+def roller_angles(params: RollerWaveDriveParams) -> Sequence[float]:
+    return sample_angles(params.roller_number)
+
+
+def roller_centers(params: RollerWaveDriveParams):
+    thetas = roller_angles(params)
+    l, _ = wave_terms(params, thetas)
+
+    if np is not None:
+        return l * np.sin(thetas), l * np.cos(thetas)
+
+    xs = array('d', (li * math.sin(theta) for theta, li in zip(thetas, l)))
+    ys = array('d', (li * math.cos(theta) for theta, li in zip(thetas, l)))
+    return xs, ys
+
+
+def profile_angles(params: RollerWaveDriveParams, resolution: int = None):
+    # Angles of the wheel fit points and their deviation, adaptive when the params have a tolerance
+    unit = params_unit_profile(params, resolution)
+    return unit.thetas, unit.max_deviation * params.roller_diameter
+
+
+def compute_geometry(params: RollerWaveDriveParams, resolution: int = None) -> DriveGeometry:
+    roller_x, roller_y = roller_centers(params)
+    if params.use_arcs and resolution is None:
+        arcs, max_deviation = arc_profile(params, params.profile_tolerance or ARC_TOLERANCE)
+        profile_x = array('d', (arc.start[0] for arc in arcs))
+        profile_y = array('d', (arc.start[1] for arc in arcs))
+        if np is not None:
+            profile_x, profile_y = np.asarray(profile_x), np.asarray(profile_y)
+        return DriveGeometry(profile_x, profile_y, roller_x, roller_y, max_deviation, arcs)
+
+    unit = params_unit_profile(params, resolution)
+    profile_x, profile_y = scaled_profile(params, resolution)
+    return DriveGeometry(profile_x, profile_y, roller_x, roller_y, unit.max_deviation * params.roller_diameter)
@@ -0,0 +1,58 @@
+# Opt-in timing of the build. Every stage records its wall time and how many sketches, features,
+# construction planes/axes, bodies and timeline items it created. Only attributes of the Fusion API
+# objects are read, so it works the same with the real adsk module and with a recording stand-in.
+import contextlib
+import json
+import time
+from typing import Callable
+
+
+class BuildRecorder:
+    def __init__(self, design, component, log: Callable[[str], None] = print):
+        self.design = design
+        self.component = component
+        self.log = log
+        self.stages = []
+        self.depth = 0
+
+    def counts(self) -> dict:
+        component = self.component
+        return {
+            'sketches': component.sketches.count,
+            'features': component.features.count,
+            'construction_planes': component.constructionPlanes.count,
+            'construction_axes': component.constructionAxes.count,
+            'bodies': component.bRepBodies.count,
+            'timeline': self.design.timeline.count,
+        }
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        before = self.counts()
+        started = time.perf_counter()
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            seconds = time.perf_counter() - started
+            after = self.counts()
+            record = {'stage': name, 'depth': self.depth, 'seconds': seconds}
+            record.update({key: after[key] - before[key] for key in after})
+            self.stages.append(record)
+            self.log('{}{}: {:.3f} s, {} sketches, {} features, {} planes, {} axes, {} timeline items'.format(
+                '  ' * self.depth, name, seconds, record['sketches'], record['features'],
+                record['construction_planes'], record['construction_axes'], record['timeline']))
+
+    def report(self, **extra) -> dict:
+        result = dict(extra)
+        result['stages'] = self.stages
+        return result
+
+    def write(self, path: str, **extra):
+        with open(path, 'w') as file:
+            json.dump(self.report(**extra), file, indent=2)
+
+
+def no_stage(name: str):
+    return contextlib.nullcontext()
@@ -0,0 +1,123 @@
+# Kinematics of a full input revolution. The wheel is fixed, the cam turns by phi and the
+# separator by -phi / roller_number. Roller i then lies at the polar angle
+# (2 pi i - phi) / roller_number, touching the cam and the wheel profile of draw_gear.
+#
+# All steps and rollers are evaluated as one (steps, rollers) array computation. For fine sweeps
+# the steps are computed in chunks and written to a .npy file that is opened as a memmap:
+#
+#   cd commands
+#   python -m createWaveDrive.RollerWaveDriveKinematics --steps 36000 --output kinematics.npy
+import argparse
+import math
+import sys
+from typing import NamedTuple, Sequence
+
+from . import RollerWaveDriveGeometry as geometry
+from .RollerWaveDriveParams import RollerWaveDriveParams
+from .RollerWaveDriveSpec import params_from_record
+
+# Steps computed at once when writing to a file
+CHUNK_STEPS = 4096
+
+# Per step and roller: polar angle of the roller center, the center, the contact points on the
+# wheel and on the cam, and the angle between the radial direction and the wheel contact normal.
+ROLLER_FIELDS = (
+    ('theta', 'f8'),
+    ('center', 'f8', (2,)),
+    ('wheel_contact', 'f8', (2,)),
+    ('cam_contact', 'f8', (2,)),
+    ('xi', 'f8'),
+)
+
+
+class Kinematics(NamedTuple):
+    cam_angles: Sequence[float]  # (steps,)
+    separator_angles: Sequence[float]  # (steps,)
+    rollers: Sequence  # (steps, rollers) structured array with ROLLER_FIELDS, a memmap when loaded from a file
+
+
+def roller_dtype():
+    return geometry.require_numpy('the kinematics').dtype(list(ROLLER_FIELDS))
+
+
+def step_angles(steps: int, roller_number: int):
+    cam_angles = geometry.sample_angles(steps)
+    return cam_angles, -cam_angles / roller_number
+
+
+def evaluate_steps(params: RollerWaveDriveParams, cam_angles, out=None):
+    np = geometry.require_numpy('the kinematics')
+    cam_angles = np.asarray(cam_angles, dtype=float)
+    roller_number = params.roller_number
+    thetas = (2 * math.pi * np.arange(roller_number)[None, :] - cam_angles[:, None]) / roller_number
+    l, xi = geometry.wave_terms(params, thetas)
+    ball_radius = params.roller_diameter / 2
+
+    if out is None:
+        out = np.empty(thetas.shape, dtype=roller_dtype())
+    out['theta'] = thetas
+    center = out['center']
+    center[..., 0] = l * np.sin(thetas)
+    center[..., 1] = l * np.cos(thetas)
+    wheel_contact = out['wheel_contact']
+    wheel_contact[..., 0] = center[..., 0] + ball_radius * np.sin(thetas + xi)
+    wheel_contact[..., 1] = center[..., 1] + ball_radius * np.cos(thetas + xi)
+
+    # The roller touches the cam on the line between the centers
+    cam_x = params.eccentricity * np.sin(cam_angles)[:, None]
+    cam_y = params.eccentricity * np.cos(cam_angles)[:, None]
+    scale = ball_radius / (ball_radius + params.cam_radius)
+    cam_contact = out['cam_contact']
+    cam_contact[..., 0] = center[..., 0] - (center[..., 0] - cam_x) * scale
+    cam_contact[..., 1] = center[..., 1] - (center[..., 1] - cam_y) * scale
+    out['xi'] = xi
+    return out
+
+
+def simulate(params: RollerWaveDriveParams, steps: int, path: str = None,
+             chunk_steps: int = CHUNK_STEPS) -> Kinematics:
+    np = geometry.require_numpy('the kinematics')
+    cam_angles, separator_angles = step_angles(steps, params.roller_number)
+    if path is None:
+        return Kinematics(cam_angles, separator_angles, evaluate_steps(params, cam_angles))
+
+    rollers = np.lib.format.open_memmap(path, mode='w+', dtype=roller_dtype(), shape=(steps, params.roller_number))
+    for start in range(0, steps, chunk_steps):
+        stop = min(start + chunk_steps, steps)
+        evaluate_steps(params, cam_angles[start:stop], rollers[start:stop])
+    rollers.flush()
+    return Kinematics(cam_angles, separator_angles, rollers)
+
+
+def load(path: str) -> Kinematics:
+    np = geometry.require_numpy('the kinematics')
+    rollers = np.load(path, mmap_mode='r')
+    cam_angles, separator_angles = step_angles(rollers.shape[0], rollers.shape[1])
+    return Kinematics(cam_angles, separator_angles, rollers)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Simulate a full input revolution of the wave drive')
+    parser.add_argument('--rollers', type=int, default=17)
+    parser.add_argument('--roller-diameter', type=float, default=6, help='millimeters')
+    parser.add_argument('--cycloid-diameter', type=float, help='millimeters, the minimal one by default')
+    parser.add_argument('--steps', type=int, default=3600, help='steps of one input revolution')
+    parser.add_argument('--output', help='.npy file receiving the (steps, rollers) array')
+    args = parser.parse_args(argv)
+
+    record = {'rollers_number': args.rollers, 'roller_diameter': args.roller_diameter}
+    if args.cycloid_diameter is None:
+        record['use_minimal_diameter'] = True
+    else:
+        record['cycloid_diameter'] = args.cycloid_diameter
+    params = params_from_record(record)
+
+    kinematics = simulate(params, args.steps, args.output)
+    rollers = kinematics.rollers
+    print('{} steps x {} rollers, {:.1f} MB'.format(rollers.shape[0], rollers.shape[1], rollers.nbytes / 1e6))
+    print('max contact angle {:.2f} deg'.format(math.degrees(float(abs(rollers['xi']).max()))))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,249 @@
+# Load distribution of an output torque over the rollers, with the contact stresses and the
+# torsional stiffness at every input angle.
+#
+# With the input held, the separator winds up by delta under the torque. The gap of roller i to
+# the wheel then closes by a_i * delta - g_i, a_i the gap slope of the kinematics and g_i the gap at
+# no load (zero for the exact profile). The closure is taken up by the wheel and the cam contacts
+# in series. Frictionless, the cam load is lambda_i times the wheel load Q_i, with lambda_i =
+# cos(xi) R / s from the balance of the roller across its slot. Every contact follows Q = K d^n,
+# Hertz for balls (n = 3/2) and Palmgren for cylindrical rollers (n = 10/9), so
+#   T = sum a_i K_i max(a_i delta - g_i, 0)^n
+# per input angle. Without gaps it is solved in closed form. With gaps all angles are solved
+# together by Newton's method. A negative gap is an interference, the roller is preloaded whatever
+# its slope: rollers with a_i < 0 then push against the torque, and the torque is no longer convex
+# in delta. Every angle keeps a bracket of the root and bisects when a Newton step leaves it. The
+# preload can turn the separator against the torque, the rotation is reported as its magnitude.
+#
+#   cd commands
+#   python -m createWaveDrive.RollerWaveDriveLoad --rollers 17 --torque 10
+import argparse
+import math
+import sys
+import time
+from typing import NamedTuple, Sequence
+
+from . import RollerWaveDriveGeometry as geometry
+from . import RollerWaveDriveKinematics as kinematics
+from .RollerWaveDriveParams import RollerWaveDriveParams
+from .RollerWaveDriveSpec import params_from_record
+
+STEPS = 256
+# Output torque of the command line, newton meters
+TORQUE = 10.0
+# Meters per centimeter of the params
+CM = 0.01
+NEWTON_STEPS = 60
+NEWTON_TOLERANCE = 1e-10
+# Palmgren roller deflection in millimeters, 3.84e-5 Q^0.9 / l^0.8 with Q in newtons and l in
+# millimeters, measured on steel
+PALMGREN = 3.84e-5
+BALL_EXPONENT = 1.5
+ROLLER_EXPONENT = 1 / 0.9
+
+
+class Material(NamedTuple):
+    elastic_modulus: float  # pascals
+    poisson_ratio: float
+
+
+STEEL = Material(210e9, 0.3)
+
+
+class LoadResult(NamedTuple):
+    cam_angles: Sequence[float]
+    windup: Sequence[float]  # (steps,) separator rotation under the torque, radians, negative against a preload
+    stiffness: Sequence[float]  # (steps,) torsional stiffness, newton meters per radian
+    wheel_loads: Sequence  # (steps, rollers) normal loads, newtons
+    cam_loads: Sequence
+    wheel_stress: Sequence  # (steps, rollers) largest Hertz pressure, pascals
+    cam_stress: Sequence
+    contacts: Sequence[int]  # (steps,) rollers carrying load
+
+
+def contact_modulus(first: Material, second: Material) -> float:
+    return 1 / ((1 - first.poisson_ratio ** 2) / first.elastic_modulus +
+                (1 - second.poisson_ratio ** 2) / second.elastic_modulus)
+
+
+def contact_terms(params: RollerWaveDriveParams, cam_angles) -> dict:
+    # (steps, rollers) arrays in meters: gap slope, cam to wheel load ratio and the relative
+    # curvature radii of the wheel and cam contacts in the plane
+    np = geometry.require_numpy('the load analysis')
+    roller_number = params.roller_number
+    num_dimples = roller_number + 1
+    slot_angles = (2 * math.pi * np.arange(roller_number)[None, :] - cam_angles[:, None]) / roller_number
+    relative = slot_angles - cam_angles[:, None]
+
+    e = params.eccentricity
+    contact_radius = params.roller_diameter / 2 + params.cam_radius
+    ball_radius = params.roller_diameter / 2
+    sin, cos = np.sin(relative), np.cos(relative)
+    s = np.sqrt(contact_radius ** 2 - (e * sin) ** 2)
+    l = e * cos + s
+    cos_xi = np.cos(np.arctan2(num_dimples * e * sin, s))
+
+    # Derivatives of the roller distance along the wheel, relative advances num_dimples times faster
+    dl = -e * sin * (1 + e * cos / s)
+    d2l = -e * cos - e ** 2 * (cos ** 2 - sin ** 2) / s - e ** 4 * sin ** 2 * cos ** 2 / s ** 3
+    dl_theta, d2l_theta = num_dimples * dl, num_dimples ** 2 * d2l
+    # Curvature of the path of the roller center, positive where it bends around the center, and of
+    # the wheel profile a roller radius outside it, positive where the wheel wraps around the roller
+    path = (l ** 2 + 2 * dl_theta ** 2 - l * d2l_theta) / (l ** 2 + dl_theta ** 2) ** 1.5
+    wheel = path / (1 + ball_radius * path)
+    return {
+        'lever': -roller_number * dl * cos_xi * CM,
+        'load_ratio': cos_xi * contact_radius / s,
+        'wheel_radius': 1 / (1 / ball_radius - wheel) * CM,
+        'cam_radius': np.full(relative.shape, 1 / (1 / ball_radius + 1 / params.cam_radius) * CM),
+    }
+
+
+def contact_law(params: RollerWaveDriveParams, radius, modulus: float):
+    # Stiffness K and exponent n of Q = K d^n and the largest pressure of a load, per contact
+    np = geometry.np
+    ball_radius = params.roller_diameter / 2 * CM
+    if params.use_balls:
+        # Elliptical contact against the straight wheel and cam walls, taken as circular with the
+        # mean radius of curvature
+        radius = np.sqrt(radius * ball_radius)
+        return (4 / 3 * modulus * np.sqrt(radius), BALL_EXPONENT,
+                lambda loads: (6 * loads * modulus ** 2 / (math.pi ** 3 * radius ** 2)) ** (1 / 3))
+
+    length = params.roller_height * CM
+    steel = contact_modulus(STEEL, STEEL)
+    # Deflection in meters, softer materials deflect more in the ratio of the moduli
+    scale = PALMGREN * 1e-3 / (length * 1e3) ** 0.8 * (steel / modulus) ** 0.9
+    stiffness = np.full(np.shape(radius), scale ** -ROLLER_EXPONENT)
+    return stiffness, ROLLER_EXPONENT, lambda loads: np.sqrt(loads * modulus / (math.pi * length * radius))
+
+
+def solve(params: RollerWaveDriveParams, torque: float, steps: int = STEPS, gaps=None,
+          roller_material: Material = STEEL, part_material: Material = STEEL) -> LoadResult:
+    # torque in newton meters against the separator, gaps (steps, rollers) in the units of the params
+    np = geometry.require_numpy('the load analysis')
+    cam_angles, _ = kinematics.step_angles(steps, params.roller_number)
+    terms = contact_terms(params, cam_angles)
+    modulus = contact_modulus(roller_material, part_material)
+    wheel_stiffness, exponent, wheel_pressure = contact_law(params, terms['wheel_radius'], modulus)
+    cam_stiffness, _, cam_pressure = contact_law(params, terms['cam_radius'], modulus)
+
+    # Wheel and cam contact in series, both in terms of the wheel load
+    lever, load_ratio = terms['lever'], terms['load_ratio']
+    loaded = lever > 0
+    stiffness = (wheel_stiffness ** (-1 / exponent) +
+                 load_ratio ** (1 + 1 / exponent) * cam_stiffness ** (-1 / exponent)) ** -exponent
+    weight = stiffness * lever
+
+    if gaps is None:
+        windup = (torque / (weight * np.maximum(lever, 0.0) ** exponent).sum(axis=1)) ** (1 / exponent)
+        gaps = np.zeros(lever.shape)
+    else:
+        gaps = np.asarray(gaps, dtype=float) * CM
+        windup = solve_windup(torque, lever, weight, gaps, exponent)
+
+    closure = np.maximum(lever * windup[:, None] - gaps, 0.0)
+    wheel_loads = stiffness * closure ** exponent
+    cam_loads = load_ratio * wheel_loads
+    torsional = (exponent * weight * lever * closure ** (exponent - 1)).sum(axis=1)
+    return LoadResult(cam_angles, windup, torsional, wheel_loads, cam_loads, wheel_pressure(wheel_loads),
+                      cam_pressure(cam_loads), np.count_nonzero(wheel_loads > 0, axis=1))
+
+
+def solve_windup(torque: float, lever, weight, gaps, exponent: float):
+    # Separator rotation of every step where the roller torques sum up to the torque, gaps in meters
+    np = geometry.np
+    loaded = lever > 0
+
+    def torques(windup):
+        closure = np.maximum(lever * windup[:, None] - gaps, 0.0)
+        return ((weight * closure ** exponent).sum(axis=1) - torque,
+                (exponent * weight * lever * closure ** (exponent - 1)).sum(axis=1))
+
+    # Below the rotation closing the first gap of the rollers with a positive slope only the others push, the
+    # torque is at most zero there. Above it the bracket grows until the torque is reached.
+    low = np.where(loaded, gaps / np.where(loaded, lever, 1.0), np.inf).min(axis=1)
+    single = (gaps + (torque / np.where(loaded, weight, 1.0)) ** (1 / exponent)) / np.where(loaded, lever, 1.0)
+    high = np.where(loaded, single, np.inf).min(axis=1)
+    for _ in range(NEWTON_STEPS):
+        short = torques(high)[0] < 0
+        if not short.any():
+            break
+        high = np.where(short, high + 2 * (high - low), high)
+
+    windup = high
+    for _ in range(NEWTON_STEPS):
+        excess, slope = torques(windup)
+        if np.abs(excess).max() <= NEWTON_TOLERANCE * torque:
+            break
+        low = np.where(excess < 0, windup, low)
+        high = np.where(excess > 0, windup, high)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = windup - excess / slope
+        windup = np.where((step > low) & (step < high), step, (low + high) / 2)
+    return windup
+
+
+def summary(result: LoadResult) -> dict:
+    return {
+        'peak_stress': float(max(result.wheel_stress.max(), result.cam_stress.max())),
+        'peak_wheel_load': float(result.wheel_loads.max()),
+        'peak_cam_load': float(result.cam_loads.max()),
+        'stiffness_min': float(result.stiffness.min()),
+        'stiffness_max': float(result.stiffness.max()),
+        'windup_max': float(abs(result.windup).max()),
+        'contacts_min': int(result.contacts.min()),
+        'contacts_max': int(result.contacts.max()),
+    }
+
+
+def peak_stress(params: RollerWaveDriveParams, torque: float, steps: int = STEPS,
+                roller_material: Material = STEEL, part_material: Material = STEEL) -> float:
+    result = solve(params, torque, steps, roller_material=roller_material, part_material=part_material)
+    return summary(result)['peak_stress']
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Roller loads, contact stress and stiffness of the wave drive')
+    parser.add_argument('--rollers', type=int, default=17)
+    parser.add_argument('--roller-diameter', type=float, default=6, help='millimeters')
+    parser.add_argument('--roller-height', type=float, default=6, help='millimeters')
+    parser.add_argument('--cycloid-diameter', type=float, help='millimeters, the minimal one by default')
+    parser.add_argument('--use-balls', action='store_true')
+    parser.add_argument('--torque', type=float, default=TORQUE, help='output torque, newton meters')
+    parser.add_argument('--part-modulus', type=float, default=STEEL.elastic_modulus / 1e9,
+                        help='elastic modulus of the wheel and the cam, gigapascals')
+    parser.add_argument('--part-poisson-ratio', type=float, default=STEEL.poisson_ratio)
+    parser.add_argument('--steps', type=int, default=STEPS, help='steps of one input revolution')
+    parser.add_argument('--built-wheel', action='store_true',
+                        help='take the gaps to the spline of the built wheel, which shares the load unevenly')
+    args = parser.parse_args(argv)
+
+    record = {'rollers_number': args.rollers, 'roller_diameter': args.roller_diameter,
+              'roller_height': args.roller_height, 'use_balls': args.use_balls}
+    if args.cycloid_diameter is None:
+        record['use_minimal_diameter'] = True
+    else:
+        record['cycloid_diameter'] = args.cycloid_diameter
+    params = params_from_record(record)
+    part_material = Material(args.part_modulus * 1e9, args.part_poisson_ratio)
+
+    started = time.perf_counter()
+    gaps = None
+    if args.built_wheel:
+        from . import RollerWaveDriveTransmission as transmission
+        np = geometry.require_numpy('the load analysis')
+        cam_angles, separator_angles = kinematics.step_angles(args.steps, params.roller_number)
+        slot_angles = separator_angles[:, None] + 2 * math.pi * np.arange(params.roller_number) / params.roller_number
+        gaps = transmission.roller_gaps(params, transmission.built_wheel_index(params), cam_angles, slot_angles)
+    result = summary(solve(params, args.torque, args.steps, gaps, part_material=part_material))
+    print('{} steps x {} rollers in {:.3f} s'.format(args.steps, params.roller_number, time.perf_counter() - started))
+    print('peak contact stress {:.0f} MPa, peak load {:.1f} N on the wheel, {:.1f} N on the cam'.format(
+        result['peak_stress'] / 1e6, result['peak_wheel_load'], result['peak_cam_load']))
+    print('torsional stiffness {:.4g} .. {:.4g} N m/rad, separator rotation up to {:.2f} arcmin'.format(
+        result['stiffness_min'], result['stiffness_max'], math.degrees(result['windup_max']) * 60))
+    print('{contacts_min} .. {contacts_max} rollers carry the load'.format(**result))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
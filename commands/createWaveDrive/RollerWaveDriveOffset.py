@@ -0,0 +1,212 @@
+# Wheel profile offset by a tool radius or half the laser kerf, for cutting and milling.
+# Every profile point is a roller contact point and the contact direction is its normal, so the
+# exact offset by d towards the rollers is the profile of a roller with radius r - d. Where d
+# exceeds the curvature radius of the profile the offset curve runs backwards and forms a loop.
+# Loops are trimmed at their self-intersection and reported as gouges: parts of the profile the
+# tool cannot follow.
+#
+#   cd commands
+#   python -m createWaveDrive.RollerWaveDriveOffset --rollers 17 --tool-radius 3
+import argparse
+import math
+import sys
+from typing import List, NamedTuple
+
+from . import RollerWaveDriveGeometry as geometry
+from .RollerWaveDriveParams import RollerWaveDriveParams
+from .RollerWaveDriveSpec import MM, params_from_record
+
+# Minimal points per lobe of the offset curve, loops within a few segments are not resolved
+POINTS_PER_LOBE = 32
+# Preceding segments tested at once in the crossing search
+CROSSING_BLOCK = 256
+
+
+class Gouge(NamedTuple):
+    start_angle: float  # profile angles of the region the tool cannot follow
+    end_angle: float
+    error: float  # largest distance between the cut and the profile in the region
+
+
+class OffsetProfile(NamedTuple):
+    xs: List[float]  # closed polyline of the trimmed offset curve
+    ys: List[float]
+    thetas: List[float]  # profile angle of every point
+    cusps: List[int]  # indices of the trim points
+    gouges: List[Gouge]
+
+
+def reversed_segments(xs, ys, offset_x, offset_y) -> list:
+    # Segments of the closed offset curve running against the profile, segment k joins points k and k + 1
+    np = geometry.np
+    if np is not None:
+        dot = ((np.roll(xs, -1) - xs) * (np.roll(offset_x, -1) - offset_x) +
+               (np.roll(ys, -1) - ys) * (np.roll(offset_y, -1) - offset_y))
+        return np.flatnonzero(dot < 0).tolist()
+
+    count = len(xs)
+    return [k for k in range(count) if (xs[(k + 1) % count] - xs[k]) * (offset_x[(k + 1) % count] - offset_x[k]) +
+            (ys[(k + 1) % count] - ys[k]) * (offset_y[(k + 1) % count] - offset_y[k]) < 0]
+
+
+def reversed_runs(segments: list) -> list:
+    # (first, last) of consecutive reversed segments, the seam of the closed curve is not joined
+    runs = []
+    for k in segments:
+        if runs and runs[-1][1] == k - 1:
+            runs[-1][1] = k
+        else:
+            runs.append([k, k])
+    return runs
+
+
+def segment_crossing(xs: list, ys: list, i: int, j: int):
+    # Parameters of the intersection along segments i and j, None if they do not cross
+    bx, by = xs[i + 1] - xs[i], ys[i + 1] - ys[i]
+    dx, dy = xs[j + 1] - xs[j], ys[j + 1] - ys[j]
+    det = bx * dy - by * dx
+    if det == 0:
+        return None
+    ex, ey = xs[j] - xs[i], ys[j] - ys[i]
+    s = (ex * dy - ey * dx) / det
+    t = (ex * by - ey * bx) / det
+    if 0 <= s <= 1 and 0 <= t <= 1:
+        return s, t
+    return None
+
+
+def window_crossing(xs, ys, first: int, last: int, lower: int, upper: int):
+    # Crossing of segments lower .. first - 1 with last + 1 .. upper closest to the run between them
+    np = geometry.np
+    if np is None:
+        for score in range(first - lower + upper - last - 1):
+            for before in range(score + 1):
+                i, j = first - 1 - before, last + 1 + score - before
+                if i < lower or j > upper:
+                    continue
+                crossing = segment_crossing(xs, ys, i, j)
+                if crossing is not None:
+                    return i, j, crossing[0], crossing[1]
+        return None
+
+    xs, ys = np.asarray(xs), np.asarray(ys)
+    js = np.arange(last + 1, upper + 1)
+    dx, dy = xs[js + 1] - xs[js], ys[js + 1] - ys[js]
+    best = None
+    # Blocks of preceding segments bound the (block, window) arrays
+    for block in range(first - 1, lower - 1, -CROSSING_BLOCK):
+        i = np.arange(block, max(block - CROSSING_BLOCK, lower - 1), -1)[:, None]
+        bx, by = xs[i + 1] - xs[i], ys[i + 1] - ys[i]
+        ex, ey = xs[js] - xs[i], ys[js] - ys[i]
+        det = bx * dy - by * dx
+        with np.errstate(divide='ignore', invalid='ignore'):
+            s = (ex * dy - ey * dx) / det
+            t = (ex * by - ey * bx) / det
+        crossing = (det != 0) & (s >= 0) & (s <= 1) & (t >= 0) & (t <= 1)
+        if not crossing.any():
+            continue
+        score = np.where(crossing, (first - 1 - i) + (js - last - 1), np.iinfo(int).max)
+        row, column = np.unravel_index(np.argmin(score), score.shape)
+        candidate = (int(score[row, column]), int(i[row, 0]), int(js[column]), float(s[row, column]),
+                     float(t[row, column]))
+        if best is None or candidate < best:
+            best = candidate
+        if first - 1 - block > best[0]:
+            break  # later blocks only hold farther pairs
+    return None if best is None else best[1:]
+
+
+def loop_crossing(xs, ys, first: int, last: int):
+    # Crossing of the curve before and after a reversed run closest to the run, the windows grow
+    # until they hold the whole loop
+    width = last - first + 2
+    while True:
+        lower, upper = max(first - width, 0), min(last + width, len(xs) - 2)
+        crossing = window_crossing(xs, ys, first, last, lower, upper)
+        if crossing is not None or (lower == 0 and upper == len(xs) - 2):
+            return crossing
+        width *= 2
+
+
+def offset_profile(params: RollerWaveDriveParams, offset: float, resolution: int = None) -> OffsetProfile:
+    # Positive offsets move towards the rollers, the path of a tool cutting the wheel
+    if resolution is None:
+        resolution = max(params.resolution, POINTS_PER_LOBE * (params.roller_number + 1))
+    thetas = geometry.sample_angles(resolution)
+    profile_x, profile_y = geometry.scaled_profile(params, resolution)
+    offset_x, offset_y = geometry.scaled_profile(params, resolution, offset)
+    segments = reversed_segments(profile_x, profile_y, offset_x, offset_y)
+    if not segments:
+        return OffsetProfile(offset_x.tolist(), offset_y.tolist(), thetas.tolist(), [], [])
+    if len(segments) * 2 > resolution:
+        raise ValueError('Offset {:.4g} is too large for the wheel profile'.format(offset))
+
+    # Start the curve in the middle of the longest forward stretch, so no loop spans the seam
+    gaps = [((segments[(k + 1) % len(segments)] - segments[k]) % resolution or resolution, segments[k])
+            for k in range(len(segments))]
+    gap, after = max(gaps)
+    start = (after + gap // 2) % resolution
+    order = [(start + k) % resolution for k in range(resolution)]
+    xs, ys = [offset_x[k] for k in order], [offset_y[k] for k in order]
+    px, py = [profile_x[k] for k in order], [profile_y[k] for k in order]
+
+    def angle(position: float) -> float:
+        return math.fmod(2 * math.pi * (start + position) / resolution, 2 * math.pi)
+
+    trims = []
+    for first, last in reversed_runs(sorted((k - start) % resolution for k in segments)):
+        if trims and first <= trims[-1][1]:
+            continue  # part of a loop that is already trimmed
+        crossing = loop_crossing(xs, ys, first, last)
+        if crossing is None:
+            raise ValueError('Offset {:.4g} is too large for the wheel profile'.format(offset))
+        trims.append(crossing)
+
+    result_x, result_y, result_thetas, cusps, gouges = [], [], [], [], []
+    k = 0
+    for i, j, s, t in trims:
+        result_x += xs[k:i + 1]
+        result_y += ys[k:i + 1]
+        result_thetas += [angle(position) for position in range(k, i + 1)]
+        cx, cy = xs[i] + s * (xs[i + 1] - xs[i]), ys[i] + s * (ys[i + 1] - ys[i])
+        cusps.append(len(result_x))
+        result_x.append(cx)
+        result_y.append(cy)
+        result_thetas.append(angle(i + s))
+        # The cut near the cusp is the tool circle around it
+        error = max(abs(math.hypot(px[m] - cx, py[m] - cy) - abs(offset)) for m in range(i, j + 2))
+        gouges.append(Gouge(angle(i + s), angle(j + t), error))
+        k = j + 1
+    result_x += xs[k:]
+    result_y += ys[k:]
+    result_thetas += [angle(position) for position in range(k, resolution)]
+    return OffsetProfile(result_x, result_y, result_thetas, cusps, gouges)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Offset the wave drive wheel profile by a tool radius')
+    parser.add_argument('--rollers', type=int, default=17)
+    parser.add_argument('--roller-diameter', type=float, default=6, help='millimeters')
+    parser.add_argument('--cycloid-diameter', type=float, help='millimeters, the minimal one by default')
+    parser.add_argument('--tool-radius', type=float, required=True,
+                        help='millimeters, tool radius or half the kerf, negative to offset away from the rollers')
+    parser.add_argument('--points-per-lobe', type=int, default=POINTS_PER_LOBE)
+    args = parser.parse_args(argv)
+
+    record = {'rollers_number': args.rollers, 'roller_diameter': args.roller_diameter}
+    if args.cycloid_diameter is None:
+        record['use_minimal_diameter'] = True
+    else:
+        record['cycloid_diameter'] = args.cycloid_diameter
+    params = params_from_record(record)
+
+    toolpath = offset_profile(params, args.tool_radius * MM, args.points_per_lobe * (params.roller_number + 1))
+    print('{} points, {} gouges'.format(len(toolpath.xs), len(toolpath.gouges)))
+    for gouge in toolpath.gouges:
+        print('{:8.3f} .. {:8.3f} deg, error {:.4f} mm'.format(math.degrees(gouge.start_angle),
+                                                               math.degrees(gouge.end_angle), gouge.error / MM))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,72 +1,105 @@
+import functools
 import math
 
 
 class RollerWaveDriveParams:
+    # Defaults of points_per_lobe and eccentricity_factor
     RESOLUTION = 8
     ECCENTRICITY = 0.2
 
+    # Constructor arguments in order. Their values identify the parameters, derived values are computed once.
+    ARGUMENTS = ('roller_diameter', 'rollers_number', 'use_balls', 'roller_height', 'use_minimal_diameter',
+                 'cycloid_diameter', 'shaft_diameter', 'roller_tolerance', 'body_diameter', 'bearing_outer_diameter',
+                 'bearing_inner_diameter', 'bearing_height', 'profile_tolerance', 'pattern_balls',
+                 'consolidate_sketches', 'points_per_lobe', 'eccentricity_factor', 'use_arcs', 'tool_radius')
+
+    __slots__ = ('key', 'roller_diameter', 'roller_number', 'use_balls', 'roller_height', 'use_minimal_diameter',
+                 'cycloid_diameter', 'shaft_diameter', 'roller_tolerance', 'body_diameter', 'bearing_outer_diameter',
+                 'bearing_inner_diameter', 'bearing_height', 'profile_tolerance', 'pattern_balls',
+                 'consolidate_sketches', 'points_per_lobe', 'eccentricity_factor', 'use_arcs', 'tool_radius',
+                 'min_cycloid_radius', 'eccentricity', 'internal_radius', 'cam_radius', 'separator_thickness',
+                 'separator_middle_radius', 'separator_inner_radius', 'separator_outer_radius', 'resolution',
+                 'bearing_middle_diameter')
+
     def __init__(self, roller_diameter: float, rollers_number: int, use_balls: bool, roller_height: float,
                  use_minimal_diameter: bool, cycloid_diameter: float, shaft_diameter: float, roller_tolerance: float,
                  body_diameter: float, bearing_outer_diameter: float, bearing_inner_diameter: float,
-                 bearing_height: float):
-        self.roller_diameter = roller_diameter
-        self.roller_number = rollers_number
-        self.use_balls = use_balls
-        self._roller_height = roller_height
-        self.use_minimal_diameter = use_minimal_diameter
-        self.cycloid_diameter = cycloid_diameter
-        self.shaft_diameter = shaft_diameter
-        self.roller_tolerance = roller_tolerance
-        self._body_diameter = body_diameter
-        self.bearing_outer_diameter = bearing_outer_diameter
-        self.bearing_inner_diameter = bearing_inner_diameter
-        self.bearing_height = bearing_height
-
-    @property
-    def roller_height(self) -> float:
-        return self.roller_diameter if self.use_balls else self._roller_height
-
-    @property
-    def min_cycloid_radius(self) -> float:
-        num_dimples = self.roller_number + 1
-        return (1.03 * self.roller_diameter) / math.sin(math.pi / num_dimples)
-
-    @property
-    def eccentricity(self) -> float:
-        return self.ECCENTRICITY * self.roller_diameter
-
-    @property
-    def internal_radius(self) -> float:
-        return self.cycloid_diameter - 2 * self.eccentricity
-
-    @property
-    def cam_radius(self) -> float:
-        return self.internal_radius + self.eccentricity - self.roller_diameter
-
-    @property
-    def separator_thickness(self) -> float:
-        return 2.2 * self.eccentricity
-
-    @property
-    def separator_middle_radius(self) -> float:
-        return self.cam_radius + self.roller_diameter / 2
-
-    @property
-    def separator_inner_radius(self) -> float:
-        return self.separator_middle_radius - self.separator_thickness / 2
-
-    @property
-    def separator_outer_radius(self) -> float:
-        return self.separator_middle_radius + self.separator_thickness / 2
-
-    @property
-    def resolution(self) -> int:
-        return self.RESOLUTION * (self.roller_number + 1)
-
-    @property
-    def body_diameter(self) -> float:
-        return max(self.cycloid_diameter + 0.2, self._body_diameter)
-
-    @property
-    def bearing_middle_diameter(self) -> float:
-        return (self.bearing_outer_diameter + self.bearing_inner_diameter) / 2
+                 bearing_height: float, profile_tolerance: float = 0.0, pattern_balls: bool = False,
+                 consolidate_sketches: bool = False, points_per_lobe: int = RESOLUTION,
+                 eccentricity_factor: float = ECCENTRICITY, use_arcs: bool = False, tool_radius: float = 0.0):
+        init = functools.partial(object.__setattr__, self)
+        init('key', (roller_diameter, rollers_number, use_balls, roller_height, use_minimal_diameter,
+                     cycloid_diameter, shaft_diameter, roller_tolerance, body_diameter, bearing_outer_diameter,
+                     bearing_inner_diameter, bearing_height, profile_tolerance, pattern_balls, consolidate_sketches,
+                     points_per_lobe, eccentricity_factor, use_arcs, tool_radius))
+
+        init('roller_diameter', roller_diameter)
+        init('roller_number', rollers_number)
+        init('use_balls', use_balls)
+        init('roller_height', roller_diameter if use_balls else roller_height)
+        init('use_minimal_diameter', use_minimal_diameter)
+        init('cycloid_diameter', cycloid_diameter)
+        init('shaft_diameter', shaft_diameter)
+        init('roller_tolerance', roller_tolerance)
+        init('body_diameter', max(cycloid_diameter + 0.2, body_diameter))
+        init('bearing_outer_diameter', bearing_outer_diameter)
+        init('bearing_inner_diameter', bearing_inner_diameter)
+        init('bearing_height', bearing_height)
+        init('profile_tolerance', profile_tolerance)
+        init('pattern_balls', pattern_balls)
+        init('consolidate_sketches', consolidate_sketches)
+        init('points_per_lobe', points_per_lobe)
+        init('eccentricity_factor', eccentricity_factor)
+        init('use_arcs', use_arcs)
+        init('tool_radius', tool_radius)
+
+        num_dimples = rollers_number + 1
+        eccentricity = eccentricity_factor * roller_diameter
+        internal_radius = cycloid_diameter - 2 * eccentricity
+        cam_radius = internal_radius + eccentricity - roller_diameter
+        separator_thickness = 2.2 * eccentricity
+        separator_middle_radius = cam_radius + roller_diameter / 2
+
+        init('min_cycloid_radius', (1.03 * roller_diameter) / math.sin(math.pi / num_dimples))
+        init('eccentricity', eccentricity)
+        init('internal_radius', internal_radius)
+        init('cam_radius', cam_radius)
+        init('separator_thickness', separator_thickness)
+        init('separator_middle_radius', separator_middle_radius)
+        init('separator_inner_radius', separator_middle_radius - separator_thickness / 2)
+        init('separator_outer_radius', separator_middle_radius + separator_thickness / 2)
+        init('resolution', points_per_lobe * num_dimples)
+        init('bearing_middle_diameter', (bearing_outer_diameter + bearing_inner_diameter) / 2)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('{} is immutable, use replace()'.format(type(self).__name__))
+
+    def __delattr__(self, name):
+        raise AttributeError('{} is immutable'.format(type(self).__name__))
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.key == self.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __reduce__(self):
+        return type(self), self.key
+
+    def __repr__(self):
+        arguments = ', '.join('{}={!r}'.format(name, value) for name, value in zip(self.ARGUMENTS, self.key))
+        return '{}({})'.format(type(self).__name__, arguments)
+
+    def replace(self, **changes) -> 'RollerWaveDriveParams':
+        unknown = set(changes) - set(self.ARGUMENTS)
+        if unknown:
+            raise TypeError('Unknown arguments: {}'.format(', '.join(sorted(unknown))))
+        values = dict(zip(self.ARGUMENTS, self.key))
+        values.update(changes)
+        return params_from_tuple(tuple(values[name] for name in self.ARGUMENTS))
+
+
+@functools.lru_cache(maxsize=256)
+def params_from_tuple(values: tuple) -> RollerWaveDriveParams:
+    # Values in the order of RollerWaveDriveParams.ARGUMENTS, dialog events with unchanged inputs become a lookup
+    return RollerWaveDriveParams(*values)
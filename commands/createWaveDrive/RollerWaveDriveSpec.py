@@ -0,0 +1,105 @@
+# Reads a family of drives from a CSV or JSON file. Every row (or JSON object) holds the
+# RollerWaveDriveParams arguments by name, lengths are in millimeters like in the dialog.
+# Missing fields take the dialog defaults.
+import csv
+import json
+import os
+from typing import List
+
+from .RollerWaveDriveParams import RollerWaveDriveParams
+
+MM = 0.1
+
+# name, kind, default; kind is 'length', 'float', 'int' or 'bool'
+FIELDS = (
+    ('roller_diameter', 'length', 6),
+    ('rollers_number', 'int', 17),
+    ('use_balls', 'bool', False),
+    ('roller_height', 'length', 6),
+    ('use_minimal_diameter', 'bool', False),
+    ('cycloid_diameter', 'length', 75),
+    ('shaft_diameter', 'length', 5),
+    ('roller_tolerance', 'length', 0.1),
+    ('body_diameter', 'length', 80),
+    ('bearing_outer_diameter', 'length', 21),
+    ('bearing_inner_diameter', 'length', 12),
+    ('bearing_height', 'length', 5),
+    ('profile_tolerance', 'length', 0),
+    ('pattern_balls', 'bool', False),
+    ('consolidate_sketches', 'bool', False),
+    ('points_per_lobe', 'int', RollerWaveDriveParams.RESOLUTION),
+    ('eccentricity_factor', 'float', RollerWaveDriveParams.ECCENTRICITY),
+    ('use_arcs', 'bool', False),
+    ('tool_radius', 'length', 0),
+)
+
+
+def parse_bool(value) -> bool:
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in ('1', 'true', 'yes', 'y'):
+            return True
+        if value in ('', '0', 'false', 'no', 'n'):
+            return False
+        raise ValueError('Not a boolean: {}'.format(value))
+    return bool(value)
+
+
+def params_from_record(record: dict) -> RollerWaveDriveParams:
+    unknown = set(record) - {name for name, _, _ in FIELDS}
+    if unknown:
+        raise ValueError('Unknown fields: {}'.format(', '.join(sorted(unknown))))
+
+    values = {}
+    for name, kind, default in FIELDS:
+        value = record.get(name, '')
+        if value == '' or value is None:
+            value = default
+        if kind == 'length':
+            values[name] = float(value) * MM
+        elif kind == 'float':
+            values[name] = float(value)
+        elif kind == 'int':
+            values[name] = int(value)
+        else:
+            values[name] = parse_bool(value)
+
+    params = RollerWaveDriveParams(**values)
+    if params.use_minimal_diameter:
+        params = params.replace(cycloid_diameter=params.min_cycloid_radius * 2)
+    if params.internal_radius < params.min_cycloid_radius:
+        raise ValueError('Cycloid diameter is too small for {} rollers'.format(params.roller_number))
+    return params
+
+
+def load_spec(path: str) -> List[RollerWaveDriveParams]:
+    # Every problem of the file is raised as a ValueError naming it, the callers show the message
+    name = os.path.basename(path)
+    with open(path, newline='') as file:
+        if os.path.splitext(path)[1].lower() == '.json':
+            try:
+                records = json.load(file)
+            except ValueError as e:
+                raise ValueError('{}: {}'.format(name, e))
+            if isinstance(records, dict):
+                if 'drives' not in records:
+                    raise ValueError('{}: the object has no "drives" list'.format(name))
+                records = records['drives']
+            if not isinstance(records, list):
+                raise ValueError('{}: expected a list of drives'.format(name))
+        else:
+            records = list(csv.DictReader(file))
+    if not records:
+        raise ValueError('{}: the file has no drives'.format(name))
+
+    result = []
+    for i, record in enumerate(records):
+        try:
+            if not isinstance(record, dict):
+                raise ValueError('expected an object of drive fields')
+            if None in record:
+                raise ValueError('more values than columns')
+            result.append(params_from_record(record))
+        except (ValueError, TypeError) as e:
+            raise ValueError('{}: drive {}: {}'.format(name, i + 1, e))
+    return result
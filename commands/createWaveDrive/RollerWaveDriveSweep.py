@@ -0,0 +1,200 @@
+# Design space sweep over roller number, roller diameter and cycloid diameter. The derived values
+# of RollerWaveDriveParams are evaluated for the whole grid with NumPy broadcasting, large grids
+# are split into chunks spread over a process pool and streamed into a .npy file:
+#
+#   cd commands
+#   python -m createWaveDrive.RollerWaveDriveSweep --rollers 5 100 --roller-diameters 2 10 81 \
+#       --cycloid-diameters 10 100 901 --output sweep.npy --front front.csv
+#
+# With --torque the designs on the front also get the peak contact stress of RollerWaveDriveLoad. Only
+# the front is solved, the rest of the grid has no stress: the load solve is a (steps, rollers) array per
+# design whose shape changes with the roller number, so the front designs are solved one at a time.
+#
+# Lengths on the command line are in millimeters, the arrays hold centimeters like the params.
+import argparse
+import concurrent.futures
+import csv
+import math
+import os
+import sys
+import time
+from typing import NamedTuple, Sequence
+
+from . import RollerWaveDriveGeometry as geometry
+from . import RollerWaveDriveLoad as load
+from .RollerWaveDriveParams import RollerWaveDriveParams
+from .RollerWaveDriveSpec import MM, params_from_record
+
+CHUNK_SIZE = 1 << 20
+# Smaller grids are evaluated in the calling process
+PARALLEL_THRESHOLD = 4 * CHUNK_SIZE
+
+FIELDS = (
+    ('roller_number', 'i4'),
+    ('roller_diameter', 'f8'),
+    ('cycloid_diameter', 'f8'),
+    ('feasible', '?'),
+    ('ratio', 'f8'),
+    ('outer_size', 'f8'),
+    ('cam_radius', 'f8'),
+    ('separator_thickness', 'f8'),
+)
+
+
+class SweepResult(NamedTuple):
+    results: Sequence  # structured array with FIELDS, a memmap when written to a file
+    front: Sequence  # feasible rows not dominated in (outer_size down, ratio up), sorted by outer_size
+    count: int
+    feasible: int
+
+
+def evaluate(base: RollerWaveDriveParams, roller_numbers, roller_diameters, cycloid_diameters) -> dict:
+    # Same formulas as RollerWaveDriveParams, arguments broadcast against each other
+    np = geometry.require_numpy('the design sweep')
+    roller_numbers = np.asarray(roller_numbers)
+    roller_diameters = np.asarray(roller_diameters, dtype=float)
+    cycloid_diameters = np.asarray(cycloid_diameters, dtype=float)
+
+    num_dimples = roller_numbers + 1
+    eccentricity = base.eccentricity_factor * roller_diameters
+    internal_radius = cycloid_diameters - 2 * eccentricity
+    cam_radius = internal_radius + eccentricity - roller_diameters
+    min_cycloid_radius = 1.03 * roller_diameters / np.sin(math.pi / num_dimples)
+    # The given body diameter, base.body_diameter already has the base cycloid diameter applied
+    body_diameter = base.key[base.ARGUMENTS.index('body_diameter')]
+
+    # The dialog check, and the cam must still hold its bearing
+    feasible = (internal_radius >= min_cycloid_radius) & (cam_radius > base.bearing_outer_diameter / 2)
+    return {
+        'roller_number': roller_numbers,
+        'roller_diameter': roller_diameters,
+        'cycloid_diameter': cycloid_diameters,
+        'feasible': feasible,
+        # The cam turns roller_number times per turn of the separator
+        'ratio': roller_numbers.astype(float),
+        'outer_size': np.maximum(cycloid_diameters + 0.2, body_diameter),
+        'cam_radius': cam_radius,
+        'separator_thickness': 2.2 * eccentricity,
+    }
+
+
+def pareto_front(rows):
+    # Rows are kept when no other feasible row is at most as large with at least the same ratio
+    np = geometry.np
+    rows = rows[rows['feasible']]
+    if not len(rows):
+        return rows
+    rows = rows[np.lexsort((-rows['ratio'], rows['outer_size']))]
+    best = np.maximum.accumulate(rows['ratio'])
+    keep = np.ones(len(rows), dtype=bool)
+    keep[1:] = rows['ratio'][1:] > best[:-1]
+    return rows[keep]
+
+
+def evaluate_chunk(base: RollerWaveDriveParams, axes: tuple, start: int, stop: int, path: str = None, out=None):
+    # Rows start..stop of the flattened grid, written to `out` or to the rows of the .npy file at `path`
+    np = geometry.np
+    indices = np.unravel_index(np.arange(start, stop), tuple(len(axis) for axis in axes))
+    columns = evaluate(base, *(axis[index] for axis, index in zip(axes, indices)))
+
+    if out is None:
+        out = np.load(path, mmap_mode='r+')
+    rows = out[start:stop]
+    for name, _ in FIELDS:
+        rows[name] = columns[name]
+    if isinstance(out, np.memmap):
+        out.flush()
+    return pareto_front(rows), int(np.count_nonzero(rows['feasible']))
+
+
+def sweep(base: RollerWaveDriveParams, roller_numbers, roller_diameters, cycloid_diameters, path: str = None,
+          chunk_size: int = CHUNK_SIZE, workers: int = None) -> SweepResult:
+    np = geometry.require_numpy('the design sweep')
+    axes = (np.asarray(roller_numbers, dtype='i4'), np.asarray(roller_diameters, dtype=float),
+            np.asarray(cycloid_diameters, dtype=float))
+    count = int(np.prod([len(axis) for axis in axes]))
+    dtype = np.dtype(list(FIELDS))
+    if path is None:
+        results = np.empty(count, dtype=dtype)
+    else:
+        results = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(count,))
+
+    chunks = [(start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if path is None or workers <= 1 or count < PARALLEL_THRESHOLD:
+        parts = [evaluate_chunk(base, axes, start, stop, out=results) for start, stop in chunks]
+    else:
+        # Workers write their rows to the file themselves, only the chunk fronts come back
+        results.flush()
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            futures = [executor.submit(evaluate_chunk, base, axes, start, stop, path) for start, stop in chunks]
+            parts = [future.result() for future in futures]
+
+    front = pareto_front(np.concatenate([part[0] for part in parts])) if parts else results[:0]
+    return SweepResult(results, front, count, sum(part[1] for part in parts))
+
+
+def front_peak_stresses(base: RollerWaveDriveParams, front, torque: float) -> list:
+    # Peak contact stress of every front design under the output torque, pascals, a few milliseconds each
+    return [load.peak_stress(base.replace(rollers_number=int(row['roller_number']),
+                                          roller_diameter=float(row['roller_diameter']),
+                                          cycloid_diameter=float(row['cycloid_diameter'])), torque)
+            for row in front]
+
+
+def write_front(path: str, front, peak_stresses: list = None):
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow([name for name, _ in FIELDS] + (['peak_stress_mpa'] if peak_stresses is not None else []))
+        for i, row in enumerate(front.tolist()):
+            writer.writerow(row + ((peak_stresses[i] / 1e6,) if peak_stresses is not None else ()))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Sweep the wave drive design space')
+    parser.add_argument('--rollers', type=int, nargs=2, default=(5, 100), metavar=('MIN', 'MAX'))
+    parser.add_argument('--roller-diameters', type=float, nargs=3, default=(2, 10, 81),
+                        metavar=('START', 'STOP', 'COUNT'), help='millimeters')
+    parser.add_argument('--cycloid-diameters', type=float, nargs=3, default=(10, 100, 901),
+                        metavar=('START', 'STOP', 'COUNT'), help='millimeters')
+    parser.add_argument('--output', help='.npy file receiving every evaluated combination')
+    parser.add_argument('--front', help='CSV file receiving the Pareto front')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, help='processes, all cores by default')
+    parser.add_argument('--torque', type=float, help='output torque in newton meters, adds the peak contact stress '
+                                                     'of the front designs')
+    args = parser.parse_args(argv)
+
+    np = geometry.require_numpy('the design sweep')
+    # Only the wheel sets the outer size, the dialog minimum body diameter is left out
+    base = params_from_record({'body_diameter': 0})
+    roller_numbers = np.arange(args.rollers[0], args.rollers[1] + 1)
+    roller_diameters = np.linspace(args.roller_diameters[0], args.roller_diameters[1],
+                                   int(args.roller_diameters[2])) * MM
+    cycloid_diameters = np.linspace(args.cycloid_diameters[0], args.cycloid_diameters[1],
+                                    int(args.cycloid_diameters[2])) * MM
+
+    started = time.perf_counter()
+    result = sweep(base, roller_numbers, roller_diameters, cycloid_diameters, args.output, args.chunk_size,
+                   args.workers)
+    print('{} combinations, {} feasible, {} on the front in {:.2f} s'.format(
+        result.count, result.feasible, len(result.front), time.perf_counter() - started))
+
+    peak_stresses = None
+    if args.torque is not None:
+        started = time.perf_counter()
+        peak_stresses = front_peak_stresses(base, result.front, args.torque)
+        print('peak stresses of the front in {:.2f} s'.format(time.perf_counter() - started))
+
+    for i, row in enumerate(result.front):
+        print('{:4d} rollers  roller {:6.2f} mm  cycloid {:7.2f} mm  outer {:7.2f} mm{}'.format(
+            int(row['roller_number']), row['roller_diameter'] / MM, row['cycloid_diameter'] / MM,
+            row['outer_size'] / MM, '' if peak_stresses is None else '  {:6.0f} MPa'.format(peak_stresses[i] / 1e6)))
+    if args.front:
+        write_front(args.front, result.front, peak_stresses)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
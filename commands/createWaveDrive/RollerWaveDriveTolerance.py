@@ -0,0 +1,266 @@
+# Monte Carlo tolerance analysis of the made parts. Every sample draws the deviations of the roller
+# diameters (one per roller), the cam diameter, the eccentricity, the wheel profile (a normal offset,
+# positive when more material is removed), the separator slot width and the fit of the bearing in
+# the cam, normal with the tolerance as three standard deviations.
+#
+# The deviations are tiny against the drive, so the gap of every roller to the wheel is linear in
+# them: with the roller held on the cam in its slot, a change dl of its distance to the center
+# changes the gap by -dl cos(xi). The coefficients are computed once per step and roller, a sample
+# is then a few multiply-adds over its (steps, rollers) array. A negative gap is an interference.
+# Backlash is the output play with the input held: turning the separator changes the gaps by the
+# slopes of the nominal kinematics until a roller closes its gap, in both directions, plus the play
+# of the rollers in the slots and of the cam on the bearing. Samples are processed in chunks, only
+# running sums are kept.
+#
+# The minimum gap is not linear in the deviations, a parameter moving the gaps of opposite rollers
+# both ways barely correlates with it. The sensitivity of a parameter is therefore its effect on the
+# samples: the yield gained when it is held at nominal, and the interferences and the backlash
+# scatter when it is the only one deviating. These take two more evaluations per parameter, so they
+# use the first ATTRIBUTION_SAMPLES samples. The exact profile touches the rollers, its nominal
+# minimum gap is zero and about half of the samples interfere by construction.
+#
+#   cd commands
+#   python -m createWaveDrive.RollerWaveDriveTolerance --rollers 17 --samples 200000 --max-backlash 30
+import argparse
+import math
+import sys
+import time
+from typing import List, NamedTuple
+
+from . import RollerWaveDriveClearance as clearance
+from . import RollerWaveDriveGeometry as geometry
+from . import RollerWaveDriveKinematics as kinematics
+from .RollerWaveDriveParams import RollerWaveDriveParams
+from .RollerWaveDriveSpec import MM, params_from_record
+
+SAMPLES = 100000
+# Samples evaluated again for every parameter held at nominal and deviating alone
+ATTRIBUTION_SAMPLES = 20000
+STEPS = 64
+# Values of the (samples, steps, rollers) arrays of one chunk
+CHUNK_VALUES = 1 << 22
+ARCMIN = math.pi / 180 / 60
+
+
+class Tolerances(NamedTuple):
+    # Symmetric tolerances of the made dimensions, three standard deviations
+    roller_diameter: float = 0.01 * MM
+    cam_diameter: float = 0.05 * MM
+    eccentricity: float = 0.02 * MM
+    wheel_profile: float = 0.05 * MM
+    slot_width: float = 0.05 * MM
+    bearing_fit: float = 0.02 * MM  # cam bore diameter minus bearing outer diameter, a press fit at nominal
+
+
+class NominalTerms(NamedTuple):
+    # (rollers, steps) arrays of the nominal kinematics, gap changes per deviation of the eccentricity and of the radii
+    radius: object  # distance of the roller center to the center
+    eccentricity: object
+    cam: object
+    roller: object
+    forward: object  # separator rotation per gap when the rollers close turning forward, inf for the others
+    backward: object
+
+
+class Sensitivity(NamedTuple):
+    name: str
+    yield_gain: float  # yield with the parameter held at nominal minus the yield of the same samples
+    interference_alone: float  # fraction of the samples interfering when only the parameter deviates
+    backlash_std_alone: float  # backlash standard deviation when only the parameter deviates, radians
+
+
+class ToleranceResult(NamedTuple):
+    samples: int
+    passed: float  # yield, fraction of the samples without interference within the backlash limit
+    interference: float  # fraction of the samples with an interference
+    backlash_exceeded: float
+    min_gap_mean: float
+    min_gap_std: float
+    min_gap_min: float
+    backlash_mean: float
+    backlash_std: float
+    backlash_max: float
+    nominal_min_gap: float  # minimum gap of the drive as designed, zero for the exact profile
+    sensitivities: List[Sensitivity]
+
+
+def nominal_terms(params: RollerWaveDriveParams, steps: int) -> NominalTerms:
+    np = geometry.require_numpy('the tolerance analysis')
+    roller_number = params.roller_number
+    cam_angles, separator_angles = kinematics.step_angles(steps, roller_number)
+    slot_angles = separator_angles[None, :] + 2 * math.pi * np.arange(roller_number)[:, None] / roller_number
+    relative = slot_angles - cam_angles[None, :]
+
+    eccentricity = params.eccentricity
+    contact_radius = params.roller_diameter / 2 + params.cam_radius
+    sin, cos = np.sin(relative), np.cos(relative)
+    s = np.sqrt(contact_radius ** 2 - (eccentricity * sin) ** 2)
+    cos_xi = np.cos(np.arctan2((roller_number + 1) * eccentricity * sin, s))
+    radial = -cos_xi * contact_radius / s
+    # Turning the separator moves the slot over the wheel roller_number + 1 times faster than over the cam
+    slope = -roller_number * eccentricity * sin * (1 + eccentricity * cos / s) * cos_xi
+    with np.errstate(divide='ignore'):
+        forward = np.where(slope < 0, -1 / slope, np.inf)
+        backward = np.where(slope > 0, 1 / slope, np.inf)
+    return NominalTerms(eccentricity * cos + s, -cos_xi * (cos - eccentricity * sin ** 2 / s), radial,
+                        radial - 1, forward, backward)
+
+
+def parameter_columns(index: int, columns: int) -> slice:
+    # Columns of the normal draws of Tolerances field index, the roller diameters take the last ones
+    if index == 0:
+        return slice(len(Tolerances._fields) - 1, columns)
+    return slice(index - 1, index)
+
+
+def evaluate(params: RollerWaveDriveParams, terms: NominalTerms, tolerances: Tolerances, normals):
+    # Minimum gap and backlash of every sample, normals holds the standard normal draws of the
+    # parameters after roller_diameter and then one per roller
+    np = geometry.np
+    sigma = Tolerances(*(value / 3 for value in tolerances))
+    cam, eccentricity, wheel, slot, fit = (normals[:, i] * value for i, value in enumerate(sigma[1:]))
+    roller = normals[:, len(Tolerances._fields) - 1:] * sigma.roller_diameter
+
+    # Radii change by half the diameter deviations. The arrays are (rollers, steps, samples), so the
+    # minimum over the rollers and the maximum over the steps run over whole rows. The parameters
+    # shared by all rollers are one product with the terms.
+    rollers, steps = terms.radius.shape
+    shared = np.stack([np.ones(rollers * steps), terms.eccentricity.ravel(), terms.cam.ravel()], axis=1) @ np.stack(
+        [wheel, eccentricity, cam / 2])
+    gaps = shared.reshape(rollers, steps, len(normals))
+    work = np.multiply(terms.roller[:, :, None], roller.T[:, None, :] / 2)
+    gaps += work
+    slot_play = 2 * params.roller_tolerance + slot - roller.T
+    min_gap = np.minimum(gaps.min(axis=(0, 1)), slot_play.min(axis=0))
+
+    # Play of the cam on the bearing opens every gap. Interfering rollers have no play, it is kept
+    # above zero so rollers closing in the other direction stay at an infinite rotation.
+    gaps += np.maximum(fit, 0.0) / 2
+    np.maximum(gaps, sys.float_info.min, out=gaps)
+    backlash = np.multiply(gaps, terms.forward[:, :, None], out=work).min(axis=0)
+    backlash += np.multiply(gaps, terms.backward[:, :, None], out=work).min(axis=0)
+    backlash += np.divide(np.maximum(slot_play, 0.0)[:, None, :], terms.radius[:, :, None], out=work).min(axis=0)
+    return min_gap, backlash.max(axis=0)
+
+
+def analyze(params: RollerWaveDriveParams, tolerances: Tolerances = Tolerances(), samples: int = SAMPLES,
+            steps: int = STEPS, max_backlash: float = None, seed: int = 0,
+            chunk_values: int = CHUNK_VALUES) -> ToleranceResult:
+    # max_backlash in radians, None to only count interferences
+    np = geometry.require_numpy('the tolerance analysis')
+    terms = nominal_terms(params, steps)
+    random = np.random.default_rng(seed)
+    columns = len(Tolerances._fields) - 1 + params.roller_number
+    chunk = max(1, chunk_values // (steps * params.roller_number))
+
+    def outcome(normals):
+        min_gap, backlash = evaluate(params, terms, tolerances, normals)
+        interference = min_gap < -clearance.INTERFERENCE_TOLERANCE
+        too_loose = backlash > max_backlash if max_backlash is not None else np.zeros(len(backlash), dtype=bool)
+        return min_gap, backlash, interference, too_loose
+
+    # Running sums: counts and moments, and per parameter the passes when held at nominal, the interferences
+    # and the backlash moments when deviating alone
+    passed = interfering = exceeded = attributed_passed = 0
+    sums = np.zeros(2)
+    squares = np.zeros(2)
+    worst = np.array([np.inf, -np.inf])
+    held_passed = np.zeros(len(Tolerances._fields))
+    alone_interfering = np.zeros(len(Tolerances._fields))
+    alone_sums = np.zeros(len(Tolerances._fields))
+    alone_squares = np.zeros(len(Tolerances._fields))
+    attribution_samples = min(samples, ATTRIBUTION_SAMPLES)
+    for start in range(0, samples, chunk):
+        # Rows are drawn in order, the samples do not depend on the chunk size
+        normals = random.standard_normal((min(chunk, samples - start), columns))
+        min_gap, backlash, interference, too_loose = outcome(normals)
+        interfering += int(interference.sum())
+        exceeded += int(too_loose.sum())
+        passed += int((~interference & ~too_loose).sum())
+
+        outputs = np.stack([min_gap, backlash], axis=1)
+        sums += outputs.sum(axis=0)
+        squares += (outputs ** 2).sum(axis=0)
+        worst = np.array([min(worst[0], min_gap.min()), max(worst[1], backlash.max())])
+
+        # The same draws with one parameter held or alone, so the differences carry little sampling noise
+        attributed = normals[:max(0, attribution_samples - start)]
+        if not len(attributed):
+            continue
+        attributed_passed += int((~interference & ~too_loose)[:len(attributed)].sum())
+        for i in range(len(Tolerances._fields)):
+            selected = parameter_columns(i, columns)
+            held = attributed.copy()
+            held[:, selected] = 0.0
+            _, _, held_interference, held_too_loose = outcome(held)
+            held_passed[i] += int((~held_interference & ~held_too_loose).sum())
+            alone = np.zeros_like(attributed)
+            alone[:, selected] = attributed[:, selected]
+            _, alone_backlash, alone_interference, _ = outcome(alone)
+            alone_interfering[i] += int(alone_interference.sum())
+            alone_sums[i] += alone_backlash.sum()
+            alone_squares[i] += (alone_backlash ** 2).sum()
+
+    means = sums / samples
+    deviations = np.sqrt(np.maximum(squares / samples - means ** 2, 0.0))
+    alone_means = alone_sums / attribution_samples
+    alone_deviations = np.sqrt(np.maximum(alone_squares / attribution_samples - alone_means ** 2, 0.0))
+    sensitivities = [Sensitivity(name, (held_passed[i] - attributed_passed) / attribution_samples,
+                                 alone_interfering[i] / attribution_samples, float(alone_deviations[i]))
+                     for i, name in enumerate(Tolerances._fields)]
+    sensitivities.sort(key=lambda item: (-item.yield_gain, -item.interference_alone))
+    nominal_min_gap, _ = evaluate(params, terms, tolerances, np.zeros((1, columns)))
+    return ToleranceResult(samples, passed / samples, interfering / samples, exceeded / samples, float(means[0]),
+                           float(deviations[0]), float(worst[0]), float(means[1]), float(deviations[1]),
+                           float(worst[1]), float(nominal_min_gap[0]), sensitivities)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Monte Carlo tolerance analysis of the wave drive parts')
+    parser.add_argument('--rollers', type=int, default=17)
+    parser.add_argument('--roller-diameter', type=float, default=6, help='millimeters')
+    parser.add_argument('--cycloid-diameter', type=float, help='millimeters, the minimal one by default')
+    parser.add_argument('--roller-tolerance', type=float, default=0.1, help='millimeters')
+    parser.add_argument('--samples', type=int, default=SAMPLES)
+    parser.add_argument('--steps', type=int, default=STEPS, help='steps of one input revolution')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-backlash', type=float, help='arc minutes, samples above it fail')
+    for name, value in Tolerances._field_defaults.items():
+        parser.add_argument('--{}-tolerance'.format(name.replace('_', '-')), dest=name + '_tolerance', type=float,
+                            default=value / MM, help='millimeters, three standard deviations')
+    args = parser.parse_args(argv)
+
+    record = {'rollers_number': args.rollers, 'roller_diameter': args.roller_diameter,
+              'roller_tolerance': args.roller_tolerance}
+    if args.cycloid_diameter is None:
+        record['use_minimal_diameter'] = True
+    else:
+        record['cycloid_diameter'] = args.cycloid_diameter
+    params = params_from_record(record)
+    tolerances = Tolerances(*(getattr(args, name + '_tolerance') * MM for name in Tolerances._fields))
+    max_backlash = None if args.max_backlash is None else args.max_backlash * ARCMIN
+
+    started = time.perf_counter()
+    result = analyze(params, tolerances, args.samples, args.steps, max_backlash, args.seed)
+    print('{} samples x {} steps x {} rollers in {:.2f} s'.format(result.samples, args.steps, params.roller_number,
+                                                                 time.perf_counter() - started))
+    print('yield {:.2%}, interference {:.2%}, backlash exceeded {:.2%}'.format(result.passed, result.interference,
+                                                                              result.backlash_exceeded))
+    print('min gap  {:8.4f} mm mean, {:.4f} mm std, {:.4f} mm worst'.format(
+        result.min_gap_mean / MM, result.min_gap_std / MM, result.min_gap_min / MM))
+    print('backlash {:8.2f} arcmin mean, {:.2f} arcmin std, {:.2f} arcmin worst'.format(
+        result.backlash_mean / ARCMIN, result.backlash_std / ARCMIN, result.backlash_max / ARCMIN))
+    if result.nominal_min_gap <= clearance.INTERFERENCE_TOLERANCE:
+        print('nominal min gap {:.4f} mm: the exact profile touches the rollers, about half of the samples '
+              'interfere by construction'.format(result.nominal_min_gap / MM))
+    print('per parameter on the first {} samples'.format(min(result.samples, ATTRIBUTION_SAMPLES)))
+    print('{:16s} {:>15s} {:>19s} {:>22s}'.format('parameter', 'yield if exact', 'interference alone',
+                                                  'backlash std alone'))
+    for item in result.sensitivities:
+        print('{:16s} {:+15.2%} {:19.2%} {:15.2f} arcmin'.format(item.name, item.yield_gain, item.interference_alone,
+                                                                 item.backlash_std_alone / ARCMIN))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
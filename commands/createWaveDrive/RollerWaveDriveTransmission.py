@@ -0,0 +1,176 @@
+# Transmission error of the built wheel. The exact profile moves the separator by exactly
+# -phi / roller_number, the wheel in the model is a fitted spline through points_per_lobe points
+# per lobe, so the output departs from the ideal ratio by an amount depending on the resolution
+# and the eccentricity factor.
+#
+# At every input angle each roller is held on the cam in its separator slot and its gap to the
+# built wheel is measured. The spline dips into the exact curve as often as it stays outside, so
+# some gaps are interferences that preload their rollers. The separator rotation is solved with
+# the contacts of RollerWaveDriveLoad under a light torque, with the gaps and without them. The
+# difference is the transmission error, and it weights every roller by its stiffness and lever
+# instead of letting the roller with the smallest gap slope decide. The built wheel is sampled
+# as densely as the exact one of the clearance check, whatever its points per lobe.
+#
+# With a constant input torque and no friction the output torque follows the instantaneous ratio,
+# its peak to peak over the mean is the torque ripple.
+#
+#   cd commands
+#   python -m createWaveDrive.RollerWaveDriveTransmission --rollers 17 --points-per-lobe 8 --output-dir te
+import argparse
+import csv
+import math
+import os
+import sys
+import time
+from typing import NamedTuple, Sequence
+
+from . import RollerWaveDriveCache as cache
+from . import RollerWaveDriveClearance as clearance
+from . import RollerWaveDriveGeometry as geometry
+from . import RollerWaveDriveKinematics as kinematics
+from . import RollerWaveDriveLoad as load
+from .RollerWaveDriveParams import RollerWaveDriveParams
+from .RollerWaveDriveSpec import params_from_record
+
+STEPS = 1024
+# Fewest samples of the spline between two fit points
+SPLINE_SAMPLES = 8
+# Output torque of the solve, newton meters, light enough to leave only the gaps in the error
+TORQUE = 0.01
+ARCSEC = math.pi / 180 / 3600
+
+
+class Transmission(NamedTuple):
+    cam_angles: Sequence[float]
+    transmission_error: Sequence[float]  # output angle minus the ideal one, radians
+    ratio: Sequence[float]  # instantaneous input / output speed
+    contacts: Sequence[int]  # rollers in load carrying contact
+
+
+def built_wheel_index(params: RollerWaveDriveParams) -> clearance.PolarIndex:
+    # Dense polyline of the spline through the fit points of draw_gear, at least as dense as the exact wheel
+    np = geometry.require_numpy('the transmission analysis')
+    thetas, _ = geometry.profile_angles(params)
+    thetas = np.asarray(thetas, dtype=float)
+    xs, ys = geometry.scaled_profile(params)
+    samples = max(SPLINE_SAMPLES, math.ceil(clearance.WHEEL_POINTS_PER_LOBE * (params.roller_number + 1) / len(thetas)))
+    spline_x, spline_y = geometry.catmull_rom(thetas, xs, ys, samples)
+    return clearance.wheel_index(params, spline_x.ravel(), spline_y.ravel())
+
+
+def roller_gaps(params: RollerWaveDriveParams, index: clearance.PolarIndex, cam_angles, slot_angles):
+    # Gap to the wheel of rollers held on the cam in slots at the given angles, (steps, rollers)
+    np = geometry.np
+    relative = slot_angles - cam_angles[:, None]
+    offset = params.eccentricity * np.sin(relative)
+    contact_radius = params.roller_diameter / 2 + params.cam_radius
+    l = params.eccentricity * np.cos(relative) + np.sqrt(contact_radius ** 2 - offset ** 2)
+    distance = clearance.nearest_distance(index, l * np.sin(slot_angles), l * np.cos(slot_angles), True)
+    return distance - params.roller_diameter / 2
+
+
+def analyze(params: RollerWaveDriveParams, steps: int = STEPS, index: clearance.PolarIndex = None) -> Transmission:
+    np = geometry.require_numpy('the transmission analysis')
+    if index is None:
+        index = built_wheel_index(params)
+    roller_number = params.roller_number
+    cam_angles, separator_angles = kinematics.step_angles(steps, roller_number)
+    slot_angles = separator_angles[:, None] + 2 * math.pi * np.arange(roller_number)[None, :] / roller_number
+
+    gaps = roller_gaps(params, index, cam_angles, slot_angles)
+    built = load.solve(params, TORQUE, steps, gaps)
+    error = built.windup - load.solve(params, TORQUE, steps).windup
+
+    # Output angle is -phi / roller_number + error, the derivative is taken on the periodic error
+    step = 2 * math.pi / steps
+    error_rate = (np.roll(error, -1) - np.roll(error, 1)) / (2 * step)
+    ratio = 1 / (1 / roller_number - error_rate)
+    return Transmission(cam_angles, error, ratio, built.contacts)
+
+
+def cached_analyze(params: RollerWaveDriveParams, steps: int, directory: str) -> Transmission:
+    # analyze() through the persistent cache, the analysis modules are part of the key
+    modules = (sys.modules[__name__], clearance, kinematics, load)
+    arrays = cache.cached(directory, 'transmission', params, lambda: analyze(params, steps)._asdict(), (steps,),
+                          modules)
+    return Transmission(**arrays)
+
+
+def spectrum(transmission: Transmission):
+    # Amplitude of every harmonic of the error, orders are per input revolution
+    np = geometry.np
+    error = transmission.transmission_error
+    amplitudes = np.abs(np.fft.rfft(error)) * 2 / len(error)
+    amplitudes[0] /= 2
+    return np.arange(len(amplitudes)), amplitudes
+
+
+def summary(transmission: Transmission) -> dict:
+    error = transmission.transmission_error
+    return {
+        'error_peak_to_peak': float(error.max() - error.min()),
+        'ratio_min': float(transmission.ratio.min()),
+        'ratio_max': float(transmission.ratio.max()),
+        'torque_ripple': float((transmission.ratio.max() - transmission.ratio.min()) / transmission.ratio.mean()),
+        'contacts_min': int(transmission.contacts.min()),
+        'contacts_max': int(transmission.contacts.max()),
+    }
+
+
+def write_csv(directory: str, transmission: Transmission):
+    # transmission.csv per input angle and spectrum.csv per harmonic, errors in arc seconds
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, 'transmission.csv'), 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(('input_angle_deg', 'transmission_error_arcsec', 'ratio', 'contacts'))
+        for angle, error, ratio, contacts in zip(transmission.cam_angles.tolist(),
+                                                 transmission.transmission_error.tolist(),
+                                                 transmission.ratio.tolist(), transmission.contacts.tolist()):
+            writer.writerow((math.degrees(angle), error / ARCSEC, ratio, contacts))
+
+    orders, amplitudes = spectrum(transmission)
+    with open(os.path.join(directory, 'spectrum.csv'), 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(('order', 'amplitude_arcsec'))
+        for order, amplitude in zip(orders.tolist(), amplitudes.tolist()):
+            writer.writerow((order, amplitude / ARCSEC))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Transmission error of the wave drive over one input revolution')
+    parser.add_argument('--rollers', type=int, default=17)
+    parser.add_argument('--roller-diameter', type=float, default=6, help='millimeters')
+    parser.add_argument('--cycloid-diameter', type=float, help='millimeters, the minimal one by default')
+    parser.add_argument('--points-per-lobe', type=int, default=RollerWaveDriveParams.RESOLUTION)
+    parser.add_argument('--eccentricity-factor', type=float, default=RollerWaveDriveParams.ECCENTRICITY)
+    parser.add_argument('--profile-tolerance', type=float, default=0, help='millimeters, 0 for a fixed resolution')
+    parser.add_argument('--steps', type=int, default=STEPS, help='steps of one input revolution')
+    parser.add_argument('--output-dir', help='directory receiving transmission.csv and spectrum.csv')
+    parser.add_argument('--cache', help='directory of the persistent cache, results are reused from there')
+    args = parser.parse_args(argv)
+
+    record = {'rollers_number': args.rollers, 'roller_diameter': args.roller_diameter,
+              'points_per_lobe': args.points_per_lobe, 'eccentricity_factor': args.eccentricity_factor,
+              'profile_tolerance': args.profile_tolerance}
+    if args.cycloid_diameter is None:
+        record['use_minimal_diameter'] = True
+    else:
+        record['cycloid_diameter'] = args.cycloid_diameter
+    params = params_from_record(record)
+
+    started = time.perf_counter()
+    transmission = cached_analyze(params, args.steps, args.cache) if args.cache else analyze(params, args.steps)
+    seconds = time.perf_counter() - started
+    result = summary(transmission)
+    print('{} steps in {:.3f} s'.format(args.steps, seconds))
+    print('transmission error {:.2f} arcsec peak to peak'.format(result['error_peak_to_peak'] / ARCSEC))
+    print('ratio {ratio_min:.4f} .. {ratio_max:.4f}, {contacts_min} .. {contacts_max} rollers in contact'.format(
+        **result))
+    print('torque ripple {:.2%} peak to peak at a constant input torque'.format(result['torque_ripple']))
+    if args.output_dir:
+        write_csv(args.output_dir, transmission)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,313 @@
+# In place update of a drive built by RollerWaveDriveBuilder. build() stores the params on the
+# component; updating the component to new params moves the sketch points and sets the circle radii,
+# plane offsets and extrude distances of the existing sketches and features. Features and references
+# the user added to the drive survive, and Fusion only recomputes what depends on the changed entities.
+#
+# A change of the topology deletes the drive sketches and features and builds them again in the same
+# component: another roller count, balls instead of rollers, patterned balls, the sketch layout, a wheel
+# from arcs with another profile, a spline wheel with another number of fit points or a new plane.
+import math
+from typing import Dict, List, NamedTuple, Tuple
+
+import adsk.core
+import adsk.fusion
+from adsk.fusion import Component, ConstructionPlane, Sketch
+
+from . import RollerWaveDriveBuilder as builder
+from . import RollerWaveDriveGeometry as geometry
+from . import RollerWaveDriveOffset as offset
+from .RollerWaveDriveGeometry import DriveGeometry
+from .RollerWaveDriveInstrumentation import BuildRecorder, no_stage
+from .RollerWaveDriveParams import RollerWaveDriveParams
+
+# Sketch positions and lengths closer than this are the same, centimeters
+POINT_TOLERANCE = 1e-6
+DRIVE_SKETCHES = ('Wheel', 'WheelToolpath', 'Separator', 'RollerHole', 'Cam', 'CamSplit', 'Bearing', 'SeparatorCam',
+                  'Rollers')
+DRIVE_FEATURES = ('Wheel', 'Separator', 'RollerHole', 'RollerHoles', 'Cam', 'CamSplit', 'Bearing', 'Roller-', 'Balls')
+# Sketches drawn on a construction plane of their own
+OFFSET_SKETCHES = ('RollerHole', 'Rollers')
+BALL_PREFIX = 'Ball-'
+
+
+class SketchLayout(NamedTuple):
+    circles: List[tuple]  # (x, y, z, radius) in sketch space
+    points: List[tuple]  # (x, y, z) of the line ends
+
+
+def topology(params: RollerWaveDriveParams) -> tuple:
+    # Params that change which sketches, features and bodies the builder creates
+    return (params.roller_number, params.use_balls, params.use_balls and params.pattern_balls,
+            params.consolidate_sketches, params.use_arcs, params.tool_radius > 0)
+
+
+def is_drive_sketch(name: str) -> bool:
+    return name in DRIVE_SKETCHES or name.startswith(BALL_PREFIX)
+
+
+def sketch_layouts(params: RollerWaveDriveParams) -> Dict[str, SketchLayout]:
+    # Circles and line ends of every sketch as the builder draws them, by sketch name
+    e = params.eccentricity
+    r = params.roller_diameter / 2 + params.roller_tolerance
+    split_radii = builder.split_radii(params)
+    bearing = [(0, e, 0, params.bearing_outer_diameter / 2), (0, e, 0, params.bearing_inner_diameter / 2)]
+    separator = [(0, 0, 0, params.separator_inner_radius), (0, 0, 0, params.separator_outer_radius)]
+    shaft = (0, 0, 0, params.shaft_diameter / 2)
+    layouts = {
+        'Wheel': SketchLayout([(0, 0, 0, params.body_diameter)], []),
+        'Separator': SketchLayout(separator, []),
+        'Cam': SketchLayout([shaft, (0, e, 0, params.cam_radius)], []),
+        'CamSplit': SketchLayout([(0, e, 0, radius) for radius in split_radii], []),
+        'Bearing': SketchLayout(bearing, []),
+    }
+    separator_cam = separator + [shaft, (0, e, 0, params.cam_radius)] + bearing
+    separator_cam += [(0, e, 0, radius) for radius in split_radii]
+
+    xs, ys = geometry.roller_centers(params)
+    centers = list(zip(xs.tolist(), ys.tolist()))
+    if params.use_balls:
+        layouts['RollerHole'] = SketchLayout([(0, params.separator_outer_radius, 0, r)], [])
+        separator_cam.append((0, params.separator_outer_radius, 0.1 + params.roller_height / 2, r))
+        layouts['SeparatorCam'] = SketchLayout(separator_cam, [])
+        for i, (x, y) in enumerate(centers):
+            layouts[BALL_PREFIX + str(i)] = SketchLayout(
+                [(x, y, 0, params.roller_diameter / 2)],
+                [(x, y - params.roller_diameter, 0), (x, y + params.roller_diameter, 0)])
+    else:
+        corners = [(sx * r, params.separator_middle_radius + sy * params.separator_thickness)
+                   for sx in (-1, 1) for sy in (-1, 1)]
+        layouts['RollerHole'] = SketchLayout([], [(x, y, 0) for x, y in corners])
+        layouts['SeparatorCam'] = SketchLayout(separator_cam, [(x, y, 0.1) for x, y in corners])
+        layouts['Rollers'] = SketchLayout([(x, y, 0, params.roller_diameter / 2) for x, y in centers], [])
+    return layouts
+
+
+def plane_offsets(params: RollerWaveDriveParams) -> Dict[str, float]:
+    # Offsets of the construction planes of the sketches drawn on one
+    middle = 0.1 + params.roller_height / 2
+    offsets = {'RollerHole': middle if params.use_balls else 0.1, 'Rollers': 0.1 + params.roller_tolerance}
+    if params.use_balls:
+        # All the balls share one plane
+        offsets[BALL_PREFIX + '0'] = middle
+    return offsets
+
+
+def feature_distances(params: RollerWaveDriveParams) -> Dict[str, float]:
+    # Extrude distances of the features, by feature name
+    height = builder.get_extrusion_height(params)
+    return {
+        'Wheel': height,
+        'Separator': height,
+        'RollerHole': (params.separator_thickness * 2 if params.use_balls else
+                       params.roller_height + 2 * params.roller_tolerance),
+        'Cam': height,
+        'CamSplit': height,
+        'Bearing': params.bearing_height,
+        'Roller-': params.roller_height,
+    }
+
+
+def find_position(positions: list, position: tuple) -> int:
+    for i, other in enumerate(positions):
+        if all(abs(a - b) < POINT_TOLERANCE for a, b in zip(other, position)):
+            return i
+    return None
+
+
+def move_points(moves: list):
+    # Points are matched before any is moved, constraints may drag the other points along
+    for point, (x, y, z) in moves:
+        current = point.geometry
+        if math.hypot(x - current.x, y - current.y, z - current.z) > POINT_TOLERANCE:
+            point.move(adsk.core.Vector3D.create(x - current.x, y - current.y, z - current.z))
+
+
+def update_sketch(sketch: Sketch, old: SketchLayout, new: SketchLayout):
+    # Circles and line ends are found at their old position, curves added by the user are left alone
+    moves = []
+    radii = []
+    for circle in sketch.sketchCurves.sketchCircles:
+        center = circle.centerSketchPoint.geometry
+        i = find_position(old.circles, (center.x, center.y, center.z, circle.radius))
+        if i is not None:
+            moves.append((circle.centerSketchPoint, new.circles[i][:3]))
+            radii.append((circle, new.circles[i][3]))
+    for line in sketch.sketchCurves.sketchLines:
+        for point in (line.startSketchPoint, line.endSketchPoint):
+            if any(point == other for other, _ in moves):
+                continue
+            geometry_point = point.geometry
+            i = find_position(old.points, (geometry_point.x, geometry_point.y, geometry_point.z))
+            if i is not None:
+                moves.append((point, new.points[i]))
+
+    sketch.isComputeDeferred = True
+    move_points(moves)
+    for circle, radius in radii:
+        if abs(circle.radius - radius) > POINT_TOLERANCE:
+            circle.radius = radius
+    sketch.isComputeDeferred = False
+
+
+def wheel_spline(sketch: Sketch):
+    splines = sketch.sketchCurves.sketchFittedSplines
+    return splines.item(0) if splines.count == 1 else None
+
+
+def update_wheel(sketch: Sketch, drive_geometry: DriveGeometry):
+    # The closing fit point of the spline may repeat the first one
+    xs, ys = drive_geometry.profile_x.tolist(), drive_geometry.profile_y.tolist()
+    fit_points = wheel_spline(sketch).fitPoints
+    moves = [(fit_points.item(i), (xs[i % len(xs)], ys[i % len(xs)], 0)) for i in range(fit_points.count)]
+    sketch.isComputeDeferred = True
+    move_points(moves)
+    sketch.isComputeDeferred = False
+
+
+def update_toolpath(sketch: Sketch, toolpath: offset.OffsetProfile):
+    # The fit points are moved when the path has as many pieces and points as the splines, otherwise the
+    # splines are drawn again. Either way the sketch keeps its place in the timeline and in the drive group.
+    pieces = builder.toolpath_pieces(toolpath)
+    splines = list(sketch.sketchCurves.sketchFittedSplines)
+    sketch.isComputeDeferred = True
+    if len(splines) == len(pieces) and all(spline.fitPoints.count == len(piece)
+                                           for spline, piece in zip(splines, pieces)):
+        move_points([(spline.fitPoints.item(i), (x, y, 0))
+                     for spline, piece in zip(splines, pieces) for i, (x, y) in enumerate(piece)])
+    else:
+        for spline in splines:
+            spline.deleteMe()
+        builder.draw_toolpath_splines(sketch, toolpath)
+    sketch.isComputeDeferred = False
+
+
+def can_update(previous: RollerWaveDriveParams, params: RollerWaveDriveParams, component: Component,
+               plane: ConstructionPlane, drive_geometry: DriveGeometry) -> bool:
+    wheel = component.sketches.itemByName('Wheel')
+    if previous is None or wheel is None or plane != wheel.referencePlane:
+        return False
+    if component.parentDesign.designType != adsk.fusion.DesignTypes.ParametricDesignType:
+        return False
+    if topology(previous) != topology(params):
+        return False
+    if geometry.profile_key(previous) == geometry.profile_key(params):
+        return True
+    if params.use_arcs:
+        # Arcs are drawn through three points each, they are not moved into another profile
+        return False
+    spline = wheel_spline(wheel)
+    return spline is not None and spline.fitPoints.count - len(drive_geometry.profile_x) in (0, 1)
+
+
+def clear(component: Component):
+    # Deletes the sketches, features and construction geometry of the drive, the last created first
+    features = component.features
+    for i in reversed(range(features.count)):
+        feature = features.item(i)
+        if feature.name in DRIVE_FEATURES or feature.name.startswith(BALL_PREFIX):
+            feature.deleteMe()
+
+    planes = []
+    sketches = component.sketches
+    for i in reversed(range(sketches.count)):
+        sketch = sketches.item(i)
+        if not is_drive_sketch(sketch.name):
+            continue
+        if sketch.name in OFFSET_SKETCHES or sketch.name.startswith(BALL_PREFIX):
+            plane = sketch.referencePlane
+            if not any(plane == other for other in planes):
+                planes.append(plane)
+        sketch.deleteMe()
+    for plane in planes:
+        plane.deleteMe()
+
+    axis = component.constructionAxes.itemByName('SeparatorAxis')
+    if axis is not None:
+        axis.deleteMe()
+
+
+def rebuild(params: RollerWaveDriveParams, component: Component, plane: ConstructionPlane,
+            recorder: BuildRecorder = None, drive_geometry: DriveGeometry = None) -> Tuple[DriveGeometry, int]:
+    # The geometry and the timeline index of the first item built, clear() shortens the timeline
+    stage = recorder.stage if recorder is not None else no_stage
+    with stage('clear'):
+        clear(component)
+    start_index = component.parentDesign.timeline.count
+    return builder.build(params, component, plane, recorder, drive_geometry), start_index
+
+
+def update(params: RollerWaveDriveParams, component: Component, plane: ConstructionPlane = None,
+           recorder: BuildRecorder = None, drive_geometry: DriveGeometry = None) -> Tuple[DriveGeometry, int]:
+    # Brings the drive in the component to the params. Along with the geometry comes the timeline index of the
+    # first rebuilt item, None when the drive was updated in place. Without a plane the drive stays on the plane
+    # it was built on.
+    stage = recorder.stage if recorder is not None else no_stage
+    previous = builder.stored_params(component)
+    wheel = component.sketches.itemByName('Wheel')
+    if plane is None:
+        plane = wheel.referencePlane
+    if drive_geometry is None:
+        with stage('geometry'):
+            drive_geometry = geometry.compute_geometry(params)
+
+    if not can_update(previous, params, component, plane, drive_geometry):
+        return rebuild(params, component, plane, recorder, drive_geometry)
+
+    sketches = component.sketches
+    if geometry.profile_key(previous) != geometry.profile_key(params):
+        with stage('update_wheel'):
+            update_wheel(wheel, drive_geometry)
+
+    with stage('update_sketches'):
+        old_layouts, new_layouts = sketch_layouts(previous), sketch_layouts(params)
+        for name, layout in new_layouts.items():
+            sketch = sketches.itemByName(name)
+            if sketch is not None and layout != old_layouts[name]:
+                update_sketch(sketch, old_layouts[name], layout)
+
+        for name, value in plane_offsets(params).items():
+            sketch = sketches.itemByName(name)
+            if sketch is None:
+                continue
+            distance = sketch.referencePlane.definition.offset
+            if abs(distance.value - value) > POINT_TOLERANCE:
+                distance.value = value
+
+    with stage('update_features'):
+        extrudes = component.features.extrudeFeatures
+        for name, value in feature_distances(params).items():
+            feature = extrudes.itemByName(name)
+            if feature is None:
+                continue
+            distance = feature.extentOne.distance
+            if abs(distance.value - value) > POINT_TOLERANCE:
+                distance.value = value
+
+    separator_cam = sketches.itemByName('SeparatorCam')
+    if separator_cam is not None and None in builder.find_cam_profiles(params, separator_cam):
+        # The shaft now crosses the bearing, the builder draws the separator and the cam apart
+        return rebuild(params, component, plane, recorder, drive_geometry)
+
+    if params.tool_radius and ((geometry.profile_key(previous), previous.tool_radius)
+                               != (geometry.profile_key(params), params.tool_radius)):
+        with stage('update_toolpath'):
+            toolpath = offset.offset_profile(params, params.tool_radius)
+            update_toolpath(sketches.itemByName('WheelToolpath'), toolpath)
+        drive_geometry = drive_geometry._replace(toolpath=toolpath)
+
+    if params.use_balls and params.pattern_balls:
+        ball_names = [name for name in old_layouts if name.startswith(BALL_PREFIX)]
+        if any(old_layouts[name] != new_layouts[name] for name in ball_names):
+            with stage('update_balls'):
+                base_feature = component.features.baseFeatures.itemByName('Balls')
+                base_feature.startEdit()
+                for body in list(base_feature.bodies):
+                    body.deleteMe()
+                base_feature.finishEdit()
+                seed_body = component.features.revolveFeatures.itemByName(BALL_PREFIX + '0').bodies.item(0)
+                centers = [new_layouts[name].circles[0][:2] for name in ball_names]
+                builder.add_ball_copies(component, sketches.itemByName(BALL_PREFIX + '0'), seed_body, centers,
+                                        base_feature)
+
+    builder.store_params(component, params)
+    return drive_geometry, None
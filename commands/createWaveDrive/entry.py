@@ -1,17 +1,21 @@
+import functools
+import math
 import os
+import time
 
 import adsk.core
 import adsk.fusion
 from adsk.fusion import ConstructionPlane
 
-from . import RollerWaveDriveBuilder as builder
-from .RollerWaveDriveParams import RollerWaveDriveParams
+# The builder, the geometry kernel and the analyses pull in NumPy. They are imported by the event
+# handlers on first use, so loading the add-in only registers the button.
+from .RollerWaveDriveInstrumentation import BuildRecorder, no_stage
+from .RollerWaveDriveParams import RollerWaveDriveParams, params_from_tuple
 from ... import config
 from ...lib import fusionAddInUtils as futil
 
 app = adsk.core.Application.get()
 ui = app.userInterface
-design = adsk.fusion.Design.cast(app.activeProduct)
 
 CMD_ID = f'{config.COMPANY_NAME}_{config.ADDIN_NAME}_waveDriveDialog'
 CMD_NAME = 'Wave Drive Creation Dialog'
@@ -31,9 +35,16 @@ ICON_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resource
 
 local_handlers = []
 
+# Low resolution profile used in the command preview
+PREVIEW_POINTS_PER_LOBE = 4
+PREVIEW_CIRCLE_SEGMENTS = 24
+
+preview_graphics: adsk.fusion.CustomGraphicsGroup = None
+
 ID_ROLLER_DIAMETER = 'roller_diameter'
 ID_ROLLERS_NUMBER = 'rollers_number'
 ID_USE_BALLS = 'use_balls'
+ID_PATTERN_BALLS = 'pattern_balls'
 ID_ROLLER_HEIGHT = 'roller_height'
 ID_USE_MINIMAL_DIAMETER = 'use_minimal_diameter'
 ID_CYCLOID_DIAMETER = 'cycloid_diameter'
@@ -44,12 +55,43 @@ ID_BODY_DIAMETER = 'body_diameter'
 ID_BEARING_OUTER_DIAMETER = 'bearing_outer_diameter'
 ID_BEARING_INNER_DIAMETER = 'bearing_inner_diameter'
 ID_BEARING_HEIGHT = 'bearing_height'
+ID_PROFILE_TOLERANCE = 'profile_tolerance'
+ID_CONSOLIDATE_SKETCHES = 'consolidate_sketches'
+ID_USE_ARCS = 'use_arcs'
+ID_TOOL_RADIUS = 'tool_radius'
+ID_ECCENTRICITY_FACTOR = 'eccentricity_factor'
+ID_AUTO_SIZE = 'auto_size'
+ID_EXPORT_DRAWING = 'export_drawing'
+
+# Dialog input of every params argument, points_per_lobe has none
+ARGUMENT_INPUTS = {
+    'roller_diameter': ID_ROLLER_DIAMETER,
+    'rollers_number': ID_ROLLERS_NUMBER,
+    'use_balls': ID_USE_BALLS,
+    'roller_height': ID_ROLLER_HEIGHT,
+    'use_minimal_diameter': ID_USE_MINIMAL_DIAMETER,
+    'cycloid_diameter': ID_CYCLOID_DIAMETER,
+    'shaft_diameter': ID_INPUT_SHAFT_DIAMETER,
+    'roller_tolerance': ID_ROLLER_TOLERANCE,
+    'body_diameter': ID_BODY_DIAMETER,
+    'bearing_outer_diameter': ID_BEARING_OUTER_DIAMETER,
+    'bearing_inner_diameter': ID_BEARING_INNER_DIAMETER,
+    'bearing_height': ID_BEARING_HEIGHT,
+    'profile_tolerance': ID_PROFILE_TOLERANCE,
+    'pattern_balls': ID_PATTERN_BALLS,
+    'consolidate_sketches': ID_CONSOLIDATE_SKETCHES,
+    'eccentricity_factor': ID_ECCENTRICITY_FACTOR,
+    'use_arcs': ID_USE_ARCS,
+    'tool_radius': ID_TOOL_RADIUS,
+}
 
 
 # Executed when add-in is run.
 def start():
-    # Create a command Definition.
-    cmd_def = ui.commandDefinitions.addButtonDefinition(CMD_ID, CMD_NAME, CMD_Description, ICON_FOLDER)
+    # Create a command Definition, or reuse the one left by a run that did not stop.
+    cmd_def = ui.commandDefinitions.itemById(CMD_ID)
+    if not cmd_def:
+        cmd_def = ui.commandDefinitions.addButtonDefinition(CMD_ID, CMD_NAME, CMD_Description, ICON_FOLDER)
 
     # Define an event handler for the command created event. It will be called when the button is clicked.
     futil.add_handler(cmd_def.commandCreated, command_created)
@@ -58,15 +100,16 @@ def start():
     # Get the target workspace the button will be created in.
     workspace = ui.workspaces.itemById(WORKSPACE_ID)
 
-    # Get the panel the button will be created in.
+    # Get the panel the button will be created in, it is shared with the batch command.
     panels = workspace.toolbarPanels
     panel = panels.itemById(PANEL_ID)
-    if panel:
-        panel.deleteMe()
-    panel = panels.add(PANEL_ID, 'ROLLER WAVE DRIVE', 'SelectPanel', False)
+    if not panel:
+        panel = panels.add(PANEL_ID, 'ROLLER WAVE DRIVE', 'SelectPanel', False)
 
     # Create the button command control in the UI after the specified existing command.
-    control = panel.controls.addCommand(cmd_def)
+    control = panel.controls.itemById(CMD_ID)
+    if not control:
+        control = panel.controls.addCommand(cmd_def)
 
     # Specify if the command is promoted to the main toolbar. 
     control.isPromoted = IS_PROMOTED
@@ -77,7 +120,7 @@ def stop():
     # Get the various UI elements for this command
     workspace = ui.workspaces.itemById(WORKSPACE_ID)
     panel = workspace.toolbarPanels.itemById(PANEL_ID)
-    command_control = panel.controls.itemById(CMD_ID)
+    command_control = panel.controls.itemById(CMD_ID) if panel else None
     command_definition = ui.commandDefinitions.itemById(CMD_ID)
 
     # Delete the button command control
@@ -88,12 +131,14 @@ def stop():
     if command_definition:
         command_definition.deleteMe()
 
-    if panel:
+    # The last command to stop removes the shared panel
+    if panel and panel.controls.count == 0:
         panel.deleteMe()
 
 
 # Function that is called when a user clicks the corresponding button in the UI.
 def command_created(args: adsk.core.CommandCreatedEventArgs):
+    from . import RollerWaveDriveBuilder as builder
     futil.log(f'{CMD_NAME} Command Created Event')
 
     len_units = app.activeProduct.unitsManager.defaultLengthUnits
@@ -104,10 +149,14 @@ def command_created(args: adsk.core.CommandCreatedEventArgs):
     inputs.addValueInput(ID_ROLLER_DIAMETER, 'Roller diameter', len_units, adsk.core.ValueInput.createByString('6'))
     inputs.addIntegerSpinnerCommandInput(ID_ROLLERS_NUMBER, 'Rollers number', 5, 100, 1, 17)
     inputs.addBoolValueInput(ID_USE_BALLS, 'Use balls', True, '', False)
+    pattern_balls_input = inputs.addBoolValueInput(ID_PATTERN_BALLS, 'Copy balls from one seed', True, '', False)
+    pattern_balls_input.isEnabled = False
     inputs.addValueInput(ID_ROLLER_HEIGHT, 'Roller height', len_units, adsk.core.ValueInput.createByString('6'))
     inputs.addBoolValueInput(ID_USE_MINIMAL_DIAMETER, 'Use minimal cycloid diameter', True, '', False)
     inputs.addValueInput(ID_CYCLOID_DIAMETER, 'Cycloid outer diameter', len_units,
                          adsk.core.ValueInput.createByString('75'))
+    inputs.addFloatSpinnerCommandInput(ID_ECCENTRICITY_FACTOR, 'Eccentricity factor', '', 0.05, 0.5, 0.01,
+                                       RollerWaveDriveParams.ECCENTRICITY)
     inputs.addValueInput(ID_BODY_DIAMETER, 'Body diameter', len_units,
                          adsk.core.ValueInput.createByString('80'))
     inputs.addValueInput(ID_INPUT_SHAFT_DIAMETER, 'Input shaft diameter', len_units,
@@ -120,14 +169,29 @@ def command_created(args: adsk.core.CommandCreatedEventArgs):
                          adsk.core.ValueInput.createByString('12'))
     inputs.addValueInput(ID_BEARING_HEIGHT, 'Bearing height', len_units,
                          adsk.core.ValueInput.createByString('5'))
+    inputs.addValueInput(ID_PROFILE_TOLERANCE, 'Profile tolerance', len_units,
+                         adsk.core.ValueInput.createByString('0'))
+    inputs.addBoolValueInput(ID_USE_ARCS, 'Wheel from arcs', True, '', False)
+    inputs.addValueInput(ID_TOOL_RADIUS, 'Tool radius', len_units, adsk.core.ValueInput.createByString('0'))
+    inputs.addBoolValueInput(ID_CONSOLIDATE_SKETCHES, 'Consolidate sketches', True, '', False)
+    inputs.addBoolValueInput(ID_EXPORT_DRAWING, 'Export 2D drawing', True, '', False)
+    inputs.addBoolValueInput(ID_AUTO_SIZE, 'Auto size', False, '', False)
 
     plane_select = inputs.addSelectionInput(ID_INPUT_PLANE, 'Input plane', 'select a plane')
     plane_select.addSelectionFilter(adsk.core.SelectionCommandInput.PlanarFaces)
     plane_select.addSelectionFilter(adsk.core.SelectionCommandInput.ConstructionPlanes)
     plane_select.setSelectionLimits(1, 1)
 
+    # With a drive as the active component the dialog edits it, without a plane it stays on its plane
+    component = edited_component()
+    if component is not None:
+        futil.log(f'{CMD_NAME} Editing {component.name}')
+        fill_inputs(inputs, builder.stored_params(component))
+        plane_select.setSelectionLimits(0, 1)
+
     # Connect to the events
     futil.add_handler(args.command.execute, command_execute, local_handlers=local_handlers)
+    futil.add_handler(args.command.executePreview, command_preview, local_handlers=local_handlers)
     futil.add_handler(args.command.inputChanged, command_input_changed, local_handlers=local_handlers)
     futil.add_handler(args.command.validateInputs, command_validate_input, local_handlers=local_handlers)
     futil.add_handler(args.command.destroy, command_destroy, local_handlers=local_handlers)
@@ -136,30 +200,168 @@ def command_created(args: adsk.core.CommandCreatedEventArgs):
 # This event handler is called when the user clicks the OK button in the command dialog or 
 # is immediately called after the created event not command inputs were created for the dialog.
 def command_execute(args: adsk.core.CommandEventArgs):
+    from . import RollerWaveDriveBuilder as builder
+    from . import RollerWaveDriveCache as cache
+    from . import RollerWaveDriveUpdate as update
+
     # General logging for debug.
     futil.log(f'{CMD_NAME} Command Execute Event')
+    clear_preview()
 
     inputs = args.command.commandInputs
     params = get_params_from_inputs(inputs)
     plane_input: adsk.core.SelectionCommandInput = inputs.itemById(ID_INPUT_PLANE)
 
+    design = active_design()
     root = design.rootComponent
-    plane: ConstructionPlane = plane_input.selection(0).entity
+    plane: ConstructionPlane = plane_input.selection(0).entity if plane_input.selectionCount else None
 
-    component = root.occurrences.addNewComponent(adsk.core.Matrix3D.create()).component
+    component = edited_component()
+    editing = component is not None
+    if not editing:
+        component = root.occurrences.addNewComponent(adsk.core.Matrix3D.create()).component
+        start_index = design.timeline.count - 1
     component.name = 'RollerWaveDrive-1-to-{}'.format(params.roller_number)
 
-    start_index = design.timeline.count - 1
-
-    builder.draw_gear(params, component, plane)
-    builder.draw_separator(params, component, plane)
-    builder.draw_cam(params, component, plane)
-    if params.use_balls:
-        builder.draw_balls(params, component, plane)
+    recorder = BuildRecorder(design, component, futil.log) if config.PROFILE_BUILD else None
+    stage = recorder.stage if recorder is not None else no_stage
+
+    started = time.perf_counter()
+    with stage('command_execute'):
+        drive_geometry = cache.drive_geometry(params, config.CACHE_PATH) if config.GEOMETRY_CACHE else None
+        if editing:
+            # A rebuild first deletes the old drive from the timeline, the group starts where the new one does
+            drive_geometry, start_index = update.update(params, component, plane, recorder, drive_geometry)
+        else:
+            drive_geometry = builder.build(params, component, plane, recorder, drive_geometry)
+        rebuilt = start_index is not None
+        if rebuilt:
+            design.timeline.timelineGroups.add(start_index, design.timeline.count - 1)
+
+    units = design.unitsManager
+    segments = f'{len(drive_geometry.arcs)} arcs' if drive_geometry.arcs else f'{len(drive_geometry.profile_x)} points'
+    futil.log(f'{CMD_NAME} Wheel profile: {segments}, '
+              f'max deviation {units.formatInternalValue(drive_geometry.max_deviation)}')
+    if drive_geometry.toolpath is not None:
+        for gouge in drive_geometry.toolpath.gouges:
+            futil.log(f'{CMD_NAME} Tool cannot follow the wheel from {math.degrees(gouge.start_angle):.2f} to '
+                      f'{math.degrees(gouge.end_angle):.2f} deg, error {units.formatInternalValue(gouge.error)}')
+    if rebuilt:
+        futil.log(f'{CMD_NAME} Built {design.timeline.count - start_index} timeline items '
+                  f'in {time.perf_counter() - started:.2f} s')
     else:
-        builder.draw_rollers(params, component, plane)
+        futil.log(f'{CMD_NAME} Updated {component.name} in place in {time.perf_counter() - started:.2f} s')
+    if recorder is not None:
+        recorder.write(config.BUILD_PROFILE_PATH, component=component.name,
+                       params=dict(zip(RollerWaveDriveParams.ARGUMENTS, params.key)))
+
+    export_drawing_input: adsk.core.BoolValueCommandInput = inputs.itemById(ID_EXPORT_DRAWING)
+    if export_drawing_input.value:
+        export_drawing(params, component.name)
+
+
+def active_design() -> adsk.fusion.Design:
+    # Looked up on every use, the active document changes while the add-in runs
+    return adsk.fusion.Design.cast(app.activeProduct)
+
+
+def edited_component() -> adsk.fusion.Component:
+    # The active component when it holds a drive of this command, None when a new drive is created
+    from . import RollerWaveDriveBuilder as builder
+    design = active_design()
+    component = design.activeComponent
+    if design.designType != adsk.fusion.DesignTypes.ParametricDesignType or component == design.rootComponent:
+        return None
+    return component if builder.stored_params(component) is not None else None
+
+
+def fill_inputs(inputs: adsk.core.CommandInputs, params: RollerWaveDriveParams):
+    for name, value in zip(RollerWaveDriveParams.ARGUMENTS, params.key):
+        if name in ARGUMENT_INPUTS:
+            inputs.itemById(ARGUMENT_INPUTS[name]).value = value
+    inputs.itemById(ID_ROLLER_HEIGHT).isEnabled = not params.use_balls
+    inputs.itemById(ID_PATTERN_BALLS).isEnabled = params.use_balls
+    inputs.itemById(ID_CYCLOID_DIAMETER).isEnabled = not params.use_minimal_diameter
+
+
+def export_drawing(params: RollerWaveDriveParams, name: str):
+    # Plates for laser cutting or CAM, the format follows the chosen file type
+    from . import RollerWaveDriveExport as export
+    dialog = ui.createFileDialog()
+    dialog.title = 'Export 2D drawing'
+    dialog.filter = 'DXF (*.dxf);;SVG (*.svg);;CSV (*.csv)'
+    dialog.initialFilename = name
+    if dialog.showSave() != adsk.core.DialogResults.DialogOK:
+        return
+    started = time.perf_counter()
+    export.export(params, dialog.filename)
+    futil.log(f'{CMD_NAME} Exported {dialog.filename} in {time.perf_counter() - started:.2f} s')
 
-    design.timeline.timelineGroups.add(start_index, design.timeline.count - 1)
+
+# This event handler is called when inputs change and are valid. It draws the profile, rollers, cam,
+# bearing and separator as lines in one custom graphics entity, the full build is done on OK only.
+def command_preview(args: adsk.core.CommandEventArgs):
+    clear_preview()
+
+    inputs = args.command.commandInputs
+    plane_input: adsk.core.SelectionCommandInput = inputs.itemById(ID_INPUT_PLANE)
+    if plane_input.selectionCount == 0:
+        return
+    params = get_params_from_inputs(inputs)
+
+    # The sketch is only needed for its transform, it is discarded with the rest of the preview
+    design = active_design()
+    sketch = design.rootComponent.sketches.add(plane_input.selection(0).entity)
+    transform = sketch.transform
+
+    strips = list(preview_wave_strips(params.roller_diameter, params.roller_number, params.cycloid_diameter,
+                                      params.eccentricity_factor))
+    for radius in (params.separator_inner_radius, params.separator_outer_radius, params.shaft_diameter / 2):
+        strips.append(circle_strip(0, 0, radius))
+    for radius in (params.cam_radius, params.bearing_outer_diameter / 2, params.bearing_inner_diameter / 2):
+        strips.append(circle_strip(0, params.eccentricity, radius))
+
+    global preview_graphics
+    preview_graphics = design.rootComponent.customGraphicsGroups.add()
+    coordinates = adsk.core.CustomGraphicsCoordinates.create([value for strip in strips for value in strip])
+    lines = preview_graphics.addLines(coordinates, [], True, [len(strip) // 3 for strip in strips])
+    lines.transform = transform
+
+
+def clear_preview():
+    global preview_graphics
+    if preview_graphics is not None and preview_graphics.isValid:
+        preview_graphics.deleteMe()
+    preview_graphics = None
+
+
+def circle_strip(x: float, y: float, radius: float) -> list:
+    strip = []
+    for i in range(PREVIEW_CIRCLE_SEGMENTS + 1):
+        angle = 2 * math.pi * i / PREVIEW_CIRCLE_SEGMENTS
+        strip += [x + radius * math.cos(angle), y + radius * math.sin(angle), 0]
+    return strip
+
+
+@functools.lru_cache(maxsize=32)
+def preview_wave_strips(roller_diameter: float, roller_number: int, cycloid_diameter: float,
+                        eccentricity_factor: float) -> tuple:
+    # The profile and rollers depend only on these inputs, so they are not recomputed while the user
+    # edits the bearing, shaft or any non-geometric input
+    from . import RollerWaveDriveGeometry as geometry
+    params = RollerWaveDriveParams(roller_diameter, roller_number, False, roller_diameter, False, cycloid_diameter,
+                                   0, 0, 0, 0, 0, 0, eccentricity_factor=eccentricity_factor)
+    drive_geometry = geometry.compute_geometry(params, PREVIEW_POINTS_PER_LOBE * (roller_number + 1))
+
+    profile = []
+    for x, y in zip(drive_geometry.profile_x.tolist(), drive_geometry.profile_y.tolist()):
+        profile += [x, y, 0]
+    profile += profile[:3]
+
+    strips = [profile]
+    for x, y in zip(drive_geometry.roller_x.tolist(), drive_geometry.roller_y.tolist()):
+        strips.append(circle_strip(x, y, roller_diameter / 2))
+    return tuple(strips)
 
 
 # This event handler is called when the user changes anything in the command dialog
@@ -171,6 +373,8 @@ def command_input_changed(args: adsk.core.InputChangedEventArgs):
         use_balls_input: adsk.core.BoolValueCommandInput = inputs.itemById(ID_USE_BALLS)
         roller_height_input: adsk.core.ValueCommandInput = inputs.itemById(ID_ROLLER_HEIGHT)
         roller_height_input.isEnabled = not use_balls_input.value
+        pattern_balls_input: adsk.core.BoolValueCommandInput = inputs.itemById(ID_PATTERN_BALLS)
+        pattern_balls_input.isEnabled = use_balls_input.value
 
     if changed_input.id in [ID_USE_MINIMAL_DIAMETER, ID_ROLLERS_NUMBER, ID_ROLLER_DIAMETER]:
         use_minimal_diameter_input: adsk.core.BoolValueCommandInput = inputs.itemById(ID_USE_MINIMAL_DIAMETER)
@@ -180,10 +384,43 @@ def command_input_changed(args: adsk.core.InputChangedEventArgs):
         if use_minimal_diameter:
             cycloid_diameter_input.value = get_params_from_inputs(inputs).min_cycloid_radius * 2
 
+    if changed_input.id == ID_AUTO_SIZE:
+        fill_auto_size(inputs)
+
     # General logging for debug.
     futil.log(f'{CMD_NAME} Input Changed Event fired from a change to {changed_input.id}')
 
 
+def fill_auto_size(inputs: adsk.core.CommandInputs):
+    # Smallest drive for the rollers number as ratio within the body diameter, around the bearing and the shaft and
+    # with the rollers tolerance as clearance. The roller diameter input is the smallest roller diameter searched.
+    # Nothing in the dialog limits the load, so the result has that roller diameter and the smallest eccentricity.
+    from . import RollerWaveDriveAutoSize as auto_size
+    params = get_params_from_inputs(inputs)
+    # The body diameter as entered, the params raise it to fit the current cycloid diameter
+    body_diameter = inputs.itemById(ID_BODY_DIAMETER).value
+    started = time.perf_counter()
+    result = auto_size.auto_size(params.roller_number, body_diameter, params.bearing_outer_diameter,
+                                 params.roller_tolerance, params.roller_diameter,
+                                 bearing_inner_diameter=params.bearing_inner_diameter,
+                                 shaft_diameter=params.shaft_diameter)
+    seconds = time.perf_counter() - started
+    if result is None:
+        futil.log(f'{CMD_NAME} Auto size: no drive fits in the body diameter ({seconds:.3f} s)')
+        ui.messageBox('No drive with these rollers fits in the body diameter')
+        return
+
+    inputs.itemById(ID_USE_MINIMAL_DIAMETER).value = False
+    cycloid_diameter_input: adsk.core.ValueCommandInput = inputs.itemById(ID_CYCLOID_DIAMETER)
+    cycloid_diameter_input.isEnabled = True
+    cycloid_diameter_input.value = result.cycloid_diameter
+    inputs.itemById(ID_ROLLERS_NUMBER).value = result.roller_number
+    inputs.itemById(ID_ROLLER_DIAMETER).value = result.roller_diameter
+    inputs.itemById(ID_ECCENTRICITY_FACTOR).value = result.eccentricity_factor
+    futil.log(f'{CMD_NAME} Auto size: {result.candidates} candidates in {seconds:.3f} s'
+              f'{"" if result.complete else ", budget exhausted"}')
+
+
 # This event handler is called when the user interacts with any of the inputs in the dialog
 # which allows you to verify that all of the inputs are valid and enables the OK button.
 def command_validate_input(args: adsk.core.ValidateInputsEventArgs):
@@ -193,12 +430,28 @@ def command_validate_input(args: adsk.core.ValidateInputsEventArgs):
     if params.internal_radius < params.min_cycloid_radius:
         args.areInputsValid = False
         return
+    failed = validation_interferences(params)
+    if failed:
+        futil.log(f'{CMD_NAME} Interference: {", ".join(failed)}')
+        args.areInputsValid = False
+        return
     args.areInputsValid = True
 
 
+@functools.lru_cache(maxsize=32)
+def validation_interferences(params: RollerWaveDriveParams) -> tuple:
+    # The check needs NumPy, without it only the diameter check above is done
+    from . import RollerWaveDriveClearance as clearance
+    from . import RollerWaveDriveGeometry as geometry
+    if geometry.np is None:
+        return ()
+    return tuple(clearance.validation_interferences(params))
+
+
 # This event handler is called when the command terminates.
 def command_destroy(args: adsk.core.CommandEventArgs):
     futil.log(f'{CMD_NAME} Command Destroy Event')
+    clear_preview()
     global local_handlers
     local_handlers = []
 
@@ -207,6 +460,7 @@ def get_params_from_inputs(inputs: adsk.core.CommandInputs) -> RollerWaveDrivePa
     roller_diameter_input: adsk.core.ValueCommandInput = inputs.itemById(ID_ROLLER_DIAMETER)
     rollers_number_input: adsk.core.IntegerSpinnerCommandInput = inputs.itemById(ID_ROLLERS_NUMBER)
     use_balls_input: adsk.core.BoolValueCommandInput = inputs.itemById(ID_USE_BALLS)
+    pattern_balls_input: adsk.core.BoolValueCommandInput = inputs.itemById(ID_PATTERN_BALLS)
     roller_height_input: adsk.core.ValueCommandInput = inputs.itemById(ID_ROLLER_HEIGHT)
     use_minimal_diameter_input: adsk.core.BoolValueCommandInput = inputs.itemById(ID_USE_MINIMAL_DIAMETER)
     cycloid_diameter_input: adsk.core.ValueCommandInput = inputs.itemById(ID_CYCLOID_DIAMETER)
@@ -216,8 +470,13 @@ def get_params_from_inputs(inputs: adsk.core.CommandInputs) -> RollerWaveDrivePa
     bearing_inner_diameter_input: adsk.core.ValueCommandInput = inputs.itemById(ID_BEARING_INNER_DIAMETER)
     bearing_height_input: adsk.core.ValueCommandInput = inputs.itemById(ID_BEARING_HEIGHT)
     body_diameter_input: adsk.core.ValueCommandInput = inputs.itemById(ID_BODY_DIAMETER)
+    profile_tolerance_input: adsk.core.ValueCommandInput = inputs.itemById(ID_PROFILE_TOLERANCE)
+    consolidate_sketches_input: adsk.core.BoolValueCommandInput = inputs.itemById(ID_CONSOLIDATE_SKETCHES)
+    use_arcs_input: adsk.core.BoolValueCommandInput = inputs.itemById(ID_USE_ARCS)
+    eccentricity_factor_input: adsk.core.FloatSpinnerCommandInput = inputs.itemById(ID_ECCENTRICITY_FACTOR)
+    tool_radius_input: adsk.core.ValueCommandInput = inputs.itemById(ID_TOOL_RADIUS)
 
-    return RollerWaveDriveParams(
+    return params_from_tuple((
         roller_diameter_input.value,
         rollers_number_input.value,
         use_balls_input.value,
@@ -229,5 +488,12 @@ def get_params_from_inputs(inputs: adsk.core.CommandInputs) -> RollerWaveDrivePa
         body_diameter_input.value,
         bearing_outer_diameter_input.value,
         bearing_inner_diameter_input.value,
-        bearing_height_input.value
-    )
+        bearing_height_input.value,
+        profile_tolerance_input.value,
+        pattern_balls_input.value,
+        consolidate_sketches_input.value,
+        RollerWaveDriveParams.RESOLUTION,
+        eccentricity_factor_input.value,
+        use_arcs_input.value,
+        tool_radius_input.value,
+    ))
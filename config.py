@@ -17,5 +17,15 @@ DEBUG = True
 ADDIN_NAME = os.path.basename(os.path.dirname(__file__))
 COMPANY_NAME = 'ACME'
 
+# Flag that enables timing of the build stages. Time and the number of created sketches, features,
+# construction planes and timeline items of every stage are logged and written to BUILD_PROFILE_PATH.
+PROFILE_BUILD = False
+BUILD_PROFILE_PATH = os.path.join(os.path.dirname(__file__), 'build_profile.json')
+
+# Flag that enables the persistent cache of the wheel profile and roller positions in CACHE_PATH.
+# Entries are keyed by the parameters and the source of the geometry kernel.
+GEOMETRY_CACHE = True
+CACHE_PATH = os.path.join(os.path.dirname(__file__), 'cache')
+
 # Palettes
 sample_palette_id = f'{COMPANY_NAME}_{ADDIN_NAME}_palette_id'
@@ -0,0 +1,51 @@
+# Recording stand-in for the part of the Fusion API used by RollerWaveDriveBuilder. Put lib/fakeAdsk
+# on sys.path before importing the builder to run it without Fusion. Every public method call and
+# attribute assignment on an API object is appended to `calls` as (name, args, kwargs).
+#
+# Geometry is only modelled as far as the builder reads it back: profiles are regions between
+# nested closed curves of a sketch, bodies know their cylindrical faces. Profile order is not
+# the order of Fusion. The bodies of a feature are computed results, reading them while the compute
+# of the design is deferred raises like a stale body would fail in Fusion.
+import functools
+import inspect
+
+calls = []
+
+
+def record(name: str, args: tuple = (), kwargs: dict = None):
+    calls.append((name, args, kwargs or {}))
+
+
+def reset():
+    del calls[:]
+
+
+def _recorded(name: str, function, is_method: bool):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        record(name, args[1:] if is_method else args, kwargs)
+        return function(*args, **kwargs)
+
+    return wrapper
+
+
+class Recorded:
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith('_'):
+                continue
+            name = '{}.{}'.format(cls.__name__, attr)
+            if isinstance(value, staticmethod):
+                setattr(cls, attr, staticmethod(_recorded(name, value.__func__, False)))
+            elif inspect.isfunction(value):
+                setattr(cls, attr, _recorded(name, value, True))
+
+    def __setattr__(self, name, value):
+        if not name.startswith('_'):
+            record('{}.{}='.format(type(self).__name__, name), (value,))
+        object.__setattr__(self, name, value)
+
+    def _init(self, **values):
+        # Sets attributes without recording them
+        self.__dict__.update(values)
@@ -0,0 +1,282 @@
+import math
+
+from . import Recorded
+
+
+class Base(Recorded):
+    @property
+    def isValid(self) -> bool:
+        return not self.__dict__.get('_deleted', False)
+
+    @property
+    def objectType(self) -> str:
+        return 'adsk::core::' + type(self).__name__
+
+
+class Collection(Base):
+    def _init_items(self, items=None):
+        self._init(_items=list(items or []))
+
+    def item(self, index: int):
+        return self._items[index]
+
+    @property
+    def count(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index: int):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(list(self._items))
+
+    def __len__(self):
+        return len(self._items)
+
+
+class LogLevels:
+    InfoLogLevel = 0
+    WarningLogLevel = 1
+    ErrorLogLevel = 2
+
+
+class LogTypes:
+    ConsoleLogType = 0
+    FileLogType = 1
+
+
+class SurfaceTypes:
+    PlaneSurfaceType = 0
+    CylinderSurfaceType = 1
+    ConeSurfaceType = 2
+    SphereSurfaceType = 3
+    TorusSurfaceType = 4
+    EllipticalCylinderSurfaceType = 5
+    EllipticalConeSurfaceType = 6
+    NurbsSurfaceType = 7
+
+
+class Curve3DTypes:
+    Line3DCurveType = 0
+    Arc3DCurveType = 1
+    Circle3DCurveType = 2
+    Ellipse3DCurveType = 3
+    EllipticalArc3DCurveType = 4
+    InfiniteLine3DCurveType = 5
+    NurbsCurve3DCurveType = 6
+
+
+class DialogResults:
+    DialogError = -1
+    DialogOK = 0
+    DialogCancel = 1
+    DialogYes = 2
+    DialogNo = 3
+
+
+class Point3D(Base):
+    def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0):
+        self._init(x=x, y=y, z=z)
+
+    @staticmethod
+    def create(x: float = 0.0, y: float = 0.0, z: float = 0.0) -> 'Point3D':
+        return Point3D(x, y, z)
+
+    def copy(self) -> 'Point3D':
+        return self._copy()
+
+    def _copy(self) -> 'Point3D':
+        # Used by the stand-in itself, so it is not recorded
+        return Point3D(self.x, self.y, self.z)
+
+    def vectorTo(self, point: 'Point3D') -> 'Vector3D':
+        return Vector3D(point.x - self.x, point.y - self.y, point.z - self.z)
+
+    def distanceTo(self, point: 'Point3D') -> float:
+        return self._distance(point)
+
+    def _distance(self, point: 'Point3D') -> float:
+        return math.sqrt((point.x - self.x) ** 2 + (point.y - self.y) ** 2 + (point.z - self.z) ** 2)
+
+    def translateBy(self, vector: 'Vector3D') -> bool:
+        self._init(x=self.x + vector.x, y=self.y + vector.y, z=self.z + vector.z)
+        return True
+
+    def transformBy(self, matrix: 'Matrix3D') -> bool:
+        self._init(**dict(zip('xyz', matrix._apply(self.x, self.y, self.z))))
+        return True
+
+
+class Vector3D(Base):
+    def __init__(self, x: float = 0.0, y: float = 0.0, z: float = 0.0):
+        self._init(x=x, y=y, z=z)
+
+    @staticmethod
+    def create(x: float = 0.0, y: float = 0.0, z: float = 0.0) -> 'Vector3D':
+        return Vector3D(x, y, z)
+
+    @property
+    def length(self) -> float:
+        return math.sqrt(self.x ** 2 + self.y ** 2 + self.z ** 2)
+
+
+class Matrix3D(Base):
+    def __init__(self):
+        self._init(_cells=[1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0])
+
+    @staticmethod
+    def create() -> 'Matrix3D':
+        return Matrix3D()
+
+    @property
+    def translation(self) -> Vector3D:
+        return Vector3D(self._cells[3], self._cells[7], self._cells[11])
+
+    @translation.setter
+    def translation(self, vector: Vector3D):
+        self._cells[3], self._cells[7], self._cells[11] = vector.x, vector.y, vector.z
+
+    def asArray(self) -> list:
+        return list(self._cells)
+
+    def _apply(self, x: float, y: float, z: float) -> tuple:
+        c = self._cells
+        return (c[0] * x + c[1] * y + c[2] * z + c[3],
+                c[4] * x + c[5] * y + c[6] * z + c[7],
+                c[8] * x + c[9] * y + c[10] * z + c[11])
+
+
+class BoundingBox3D(Base):
+    def __init__(self, min_point: Point3D, max_point: Point3D):
+        self._init(minPoint=min_point, maxPoint=max_point)
+
+
+class Circle3D(Base):
+    def __init__(self, center: Point3D, normal: Vector3D, radius: float):
+        self._init(center=center, normal=normal, radius=radius)
+
+    @staticmethod
+    def createByCenter(center: Point3D, normal: Vector3D, radius: float) -> 'Circle3D':
+        return Circle3D(center, normal, radius)
+
+    @property
+    def curveType(self) -> int:
+        return Curve3DTypes.Circle3DCurveType
+
+
+class Arc3D(Base):
+    def __init__(self, center: Point3D, radius: float, start_angle: float, end_angle: float):
+        self._init(center=center, radius=radius, startAngle=start_angle, endAngle=end_angle)
+
+    @property
+    def curveType(self) -> int:
+        return Curve3DTypes.Arc3DCurveType
+
+
+class Line3D(Base):
+    def __init__(self, start: Point3D, end: Point3D):
+        self._init(startPoint=start, endPoint=end)
+
+    @property
+    def curveType(self) -> int:
+        return Curve3DTypes.Line3DCurveType
+
+
+class NurbsCurve3D(Base):
+    def __init__(self, points: list):
+        self._init(_points=points)
+
+    @property
+    def curveType(self) -> int:
+        return Curve3DTypes.NurbsCurve3DCurveType
+
+
+class Plane(Base):
+    def __init__(self, origin: Point3D, normal: Vector3D):
+        self._init(origin=origin, normal=normal)
+
+    @property
+    def surfaceType(self) -> int:
+        return SurfaceTypes.PlaneSurfaceType
+
+
+class Cylinder(Base):
+    def __init__(self, origin: Point3D, axis: Vector3D, radius: float):
+        self._init(origin=origin, axis=axis, radius=radius)
+
+    @property
+    def surfaceType(self) -> int:
+        return SurfaceTypes.CylinderSurfaceType
+
+
+class Sphere(Base):
+    def __init__(self, origin: Point3D, radius: float):
+        self._init(origin=origin, radius=radius)
+
+    @property
+    def surfaceType(self) -> int:
+        return SurfaceTypes.SphereSurfaceType
+
+
+class NurbsSurface(Base):
+    @property
+    def surfaceType(self) -> int:
+        return SurfaceTypes.NurbsSurfaceType
+
+
+class ObjectCollection(Collection):
+    def __init__(self):
+        self._init_items()
+
+    @staticmethod
+    def create() -> 'ObjectCollection':
+        return ObjectCollection()
+
+    def add(self, item) -> bool:
+        self._items.append(item)
+        return True
+
+    def clear(self) -> bool:
+        del self._items[:]
+        return True
+
+
+class ValueInput(Base):
+    def __init__(self, real_value: float = None, string_value: str = None):
+        self._init(realValue=real_value, stringValue=string_value)
+
+    @staticmethod
+    def createByReal(value: float) -> 'ValueInput':
+        return ValueInput(real_value=value)
+
+    @staticmethod
+    def createByString(value: str) -> 'ValueInput':
+        return ValueInput(string_value=value)
+
+
+class UserInterface(Base):
+    def messageBox(self, text: str, title: str = '', *args) -> int:
+        return DialogResults.DialogOK
+
+
+class Application(Base):
+    _instance = None
+
+    def __init__(self):
+        self._init(userInterface=UserInterface(), _product=None)
+
+    @staticmethod
+    def get() -> 'Application':
+        if Application._instance is None:
+            Application._instance = Application()
+        return Application._instance
+
+    @property
+    def activeProduct(self):
+        if self._product is None:
+            from . import fusion
+            self._init(_product=fusion.Design())
+        return self._product
+
+    def log(self, message: str, level: int = LogLevels.InfoLogLevel, log_type: int = LogTypes.ConsoleLogType):
+        pass
@@ -0,0 +1,952 @@
+import math
+
+from .core import (Base, Collection, ObjectCollection, Point3D, Vector3D, Matrix3D, BoundingBox3D, Circle3D, Arc3D,
+                   Line3D, NurbsCurve3D, Plane, Cylinder, Sphere, NurbsSurface, Curve3DTypes)
+
+# Points closer than this are considered the same when sketch curves are chained into loops
+POINT_TOLERANCE = 1e-7
+CIRCLE_SEGMENTS = 64
+
+
+class FeatureOperations:
+    JoinFeatureOperation = 0
+    CutFeatureOperation = 1
+    IntersectFeatureOperation = 2
+    NewBodyFeatureOperation = 3
+    NewComponentFeatureOperation = 4
+
+
+class ExtentDirections:
+    PositiveExtentDirection = 0
+    NegativeExtentDirection = 1
+    SymmetricExtentDirection = 2
+
+
+class DesignTypes:
+    DirectDesignType = 0
+    ParametricDesignType = 1
+
+
+def _polygon_area(points: list) -> float:
+    return 0.5 * sum(a[0] * b[1] - b[0] * a[1] for a, b in zip(points, points[1:] + points[:1]))
+
+
+def _inside(point: tuple, polygon: list) -> bool:
+    x, y = point
+    result = False
+    for (x0, y0), (x1, y1) in zip(polygon, polygon[1:] + polygon[:1]):
+        if (y0 > y) != (y1 > y) and x < x0 + (y - y0) * (x1 - x0) / (y1 - y0):
+            result = not result
+    return result
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Timeline
+
+class TimelineObject(Base):
+    def __init__(self, timeline: 'Timeline', entity):
+        self._init(_timeline=timeline, entity=entity)
+
+    @property
+    def index(self) -> int:
+        return self._timeline._items.index(self)
+
+
+class TimelineGroup(Base):
+    def __init__(self, start_index: int, end_index: int):
+        self._init(startIndex=start_index, endIndex=end_index, name='')
+
+
+class TimelineGroups(Collection):
+    def __init__(self):
+        self._init_items()
+
+    def add(self, start_index: int, end_index: int) -> TimelineGroup:
+        group = TimelineGroup(start_index, end_index)
+        self._items.append(group)
+        return group
+
+
+class Timeline(Collection):
+    def __init__(self):
+        self._init_items()
+        self._init(timelineGroups=TimelineGroups())
+
+    def _add(self, entity):
+        self._items.append(TimelineObject(self, entity))
+
+    def _remove(self, entity):
+        self._init(_items=[item for item in self._items if item.entity is not entity])
+
+
+class UnitsManager(Base):
+    def formatInternalValue(self, value: float, units: str = 'cm', show_units: bool = True) -> str:
+        return '{:g} {}'.format(value, units) if show_units else '{:g}'.format(value)
+
+
+class Design(Base):
+    def __init__(self):
+        self._init(timeline=Timeline(), unitsManager=UnitsManager(), designType=DesignTypes.ParametricDesignType,
+                   isComputeDeferred=False)
+        self._init(rootComponent=Component(self, 'root'))
+
+    @staticmethod
+    def cast(product) -> 'Design':
+        return product if isinstance(product, Design) else None
+
+
+class TimelineEntity(Base):
+    # Sketches, features, construction geometry and occurrences have a timeline item
+    def _register(self, design: Design, name: str):
+        self._init(name=name, _design=design)
+        design.timeline._add(self)
+
+    @property
+    def timelineObject(self) -> TimelineObject:
+        return next(item for item in self._design.timeline._items if item.entity is self)
+
+    def deleteMe(self) -> bool:
+        self._design.timeline._remove(self)
+        self._init(_deleted=True)
+        return True
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Components
+
+class Occurrence(TimelineEntity):
+    def __init__(self, component: 'Component', transform: Matrix3D):
+        self._init(component=component, transform=transform)
+
+
+class Occurrences(Collection):
+    def __init__(self, component: 'Component'):
+        self._init_items()
+        self._init(_component=component)
+
+    def addNewComponent(self, transform: Matrix3D) -> Occurrence:
+        design = self._component.parentDesign
+        occurrence = Occurrence(Component(design, 'Component{}'.format(len(self._items) + 1)), transform)
+        occurrence._register(design, occurrence.component.name)
+        self._items.append(occurrence)
+        return occurrence
+
+
+class Attribute(Base):
+    def __init__(self, group_name: str, name: str, value: str):
+        self._init(groupName=group_name, name=name, value=value)
+
+
+class Attributes(Collection):
+    def __init__(self):
+        self._init_items()
+
+    def add(self, group_name: str, name: str, value: str) -> Attribute:
+        attribute = self.itemByName(group_name, name)
+        if attribute is not None:
+            attribute.value = value
+            return attribute
+        attribute = Attribute(group_name, name, value)
+        self._items.append(attribute)
+        return attribute
+
+    def itemByName(self, group_name: str, name: str) -> Attribute:
+        return next((a for a in self._items if a.groupName == group_name and a.name == name), None)
+
+
+class Component(Base):
+    def __init__(self, design: Design, name: str):
+        self._init(parentDesign=design, name=name, attributes=Attributes())
+        self._init(occurrences=Occurrences(self), sketches=Sketches(self), features=Features(self),
+                   constructionPlanes=ConstructionPlanes(self), constructionAxes=ConstructionAxes(self),
+                   bRepBodies=BRepBodies(self), xYConstructionPlane=ConstructionPlane(self, 0.0))
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Construction geometry
+
+class ConstructionPlaneInput(Base):
+    def __init__(self):
+        self._init(_plane=None, _offset=None)
+
+    def setByOffset(self, plane, offset) -> bool:
+        self._init(_plane=plane, _offset=offset)
+        return True
+
+
+class ConstructionPlaneOffsetDefinition(Base):
+    def __init__(self, plane, offset: float):
+        self._init(planarEntity=plane, offset=ModelParameter(offset))
+
+
+class ConstructionPlane(TimelineEntity):
+    def __init__(self, component: Component, z: float, base=None, offset=None):
+        definition = ConstructionPlaneOffsetDefinition(base, offset) if base is not None else None
+        self._init(parentComponent=component, _origin_z=z, definition=definition, name='')
+
+    @property
+    def _z(self) -> float:
+        # Offset planes follow edits of their offset parameter
+        if self.definition is None:
+            return self._origin_z
+        return self.definition.planarEntity._z + self.definition.offset.value
+
+    @property
+    def geometry(self) -> Plane:
+        return Plane(Point3D(0, 0, self._z), Vector3D(0, 0, 1))
+
+    def deleteMe(self) -> bool:
+        self.parentComponent.constructionPlanes._items.remove(self)
+        return super().deleteMe()
+
+
+class ConstructionPlanes(Collection):
+    def __init__(self, component: Component):
+        self._init_items()
+        self._init(_component=component)
+
+    def createInput(self, occurrence=None) -> ConstructionPlaneInput:
+        return ConstructionPlaneInput()
+
+    def add(self, plane_input: ConstructionPlaneInput) -> ConstructionPlane:
+        offset = plane_input._offset.realValue
+        plane = ConstructionPlane(self._component, None, plane_input._plane, offset)
+        plane._register(self._component.parentDesign, 'Plane{}'.format(len(self._items) + 1))
+        self._items.append(plane)
+        return plane
+
+
+class ConstructionAxisInput(Base):
+    def __init__(self):
+        self._init(_face=None)
+
+    def setByCircularFace(self, face) -> bool:
+        self._init(_face=face)
+        return True
+
+
+class ConstructionAxis(TimelineEntity):
+    def __init__(self, component: Component, face):
+        self._init(parentComponent=component, _face=face)
+
+    def deleteMe(self) -> bool:
+        self.parentComponent.constructionAxes._items.remove(self)
+        return super().deleteMe()
+
+
+class ConstructionAxes(Collection):
+    def __init__(self, component: Component):
+        self._init_items()
+        self._init(_component=component)
+
+    def createInput(self, occurrence=None) -> ConstructionAxisInput:
+        return ConstructionAxisInput()
+
+    def add(self, axis_input: ConstructionAxisInput) -> ConstructionAxis:
+        axis = ConstructionAxis(self._component, axis_input._face)
+        axis._register(self._component.parentDesign, 'Axis{}'.format(len(self._items) + 1))
+        self._items.append(axis)
+        return axis
+
+    def itemByName(self, name: str) -> ConstructionAxis:
+        return next((axis for axis in self._items if axis.name == name), None)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Sketches
+
+class SketchPoint(Base):
+    def __init__(self, sketch: 'Sketch', point: Point3D):
+        self._init(parentSketch=sketch, geometry=point._copy())
+
+    @property
+    def worldGeometry(self) -> Point3D:
+        return self.parentSketch.sketchToModelSpace(self.geometry)
+
+    def move(self, translation: Vector3D) -> bool:
+        self.geometry.translateBy(translation)
+        self.parentSketch._changed()
+        return True
+
+
+def _sketch_point(sketch: 'Sketch', point) -> SketchPoint:
+    return point if isinstance(point, SketchPoint) else SketchPoint(sketch, point)
+
+
+class SketchCurve(Base):
+    isConstruction = False
+
+    def _closed_polygon(self):
+        return None
+
+    def _ends(self):
+        return None
+
+    def deleteMe(self) -> bool:
+        self.parentSketch._curves.remove(self)
+        self._collection._items.remove(self)
+        self.parentSketch._changed()
+        self._init(_deleted=True)
+        return True
+
+
+class SketchCircle(SketchCurve):
+    def __init__(self, sketch: 'Sketch', center: Point3D, radius: float, normal: Vector3D = None):
+        self._init(parentSketch=sketch, centerSketchPoint=_sketch_point(sketch, center), _radius=radius,
+                   _normal=normal or Vector3D(0, 0, 1))
+
+    @property
+    def radius(self) -> float:
+        return self._radius
+
+    @radius.setter
+    def radius(self, value: float):
+        self._init(_radius=value)
+        self.parentSketch._changed()
+
+    @property
+    def geometry(self) -> Circle3D:
+        return Circle3D(self.centerSketchPoint.geometry._copy(), self._normal, self._radius)
+
+    def _closed_polygon(self):
+        c = self.centerSketchPoint.geometry
+        if abs(self._normal.x) > POINT_TOLERANCE or abs(self._normal.y) > POINT_TOLERANCE:
+            return [(c.x, c.y, c.z)], None
+        points = [(c.x + self._radius * math.cos(2 * math.pi * i / CIRCLE_SEGMENTS),
+                   c.y + self._radius * math.sin(2 * math.pi * i / CIRCLE_SEGMENTS)) for i in range(CIRCLE_SEGMENTS)]
+        return points, c.z
+
+
+class SketchFittedSpline(SketchCurve):
+    def __init__(self, sketch: 'Sketch', points: list):
+        self._init(parentSketch=sketch, fitPoints=ObjectCollection(), isClosed=False)
+        for point in points:
+            self.fitPoints._items.append(_sketch_point(sketch, point))
+
+    @property
+    def geometry(self) -> NurbsCurve3D:
+        return NurbsCurve3D([p.geometry for p in self.fitPoints])
+
+    def _closed_polygon(self):
+        if not self.isClosed:
+            return None
+        points = [p.geometry for p in self.fitPoints]
+        return [(p.x, p.y) for p in points], points[0].z
+
+    def _ends(self):
+        if self.isClosed:
+            return None
+        points = [p.geometry for p in self.fitPoints]
+        return [(p.x, p.y, p.z) for p in points]
+
+
+class SketchLine(SketchCurve):
+    def __init__(self, sketch: 'Sketch', start, end):
+        self._init(parentSketch=sketch, startSketchPoint=_sketch_point(sketch, start),
+                   endSketchPoint=_sketch_point(sketch, end), isCenterLine=False)
+
+    @property
+    def geometry(self) -> Line3D:
+        return Line3D(self.startSketchPoint.geometry._copy(), self.endSketchPoint.geometry._copy())
+
+    def _ends(self):
+        if self.isCenterLine:
+            return None
+        a, b = self.startSketchPoint.geometry, self.endSketchPoint.geometry
+        return [(a.x, a.y, a.z), (b.x, b.y, b.z)]
+
+
+class SketchArc(SketchCurve):
+    def __init__(self, sketch: 'Sketch', start, point: Point3D, end):
+        self._init(parentSketch=sketch, startSketchPoint=_sketch_point(sketch, start),
+                   endSketchPoint=_sketch_point(sketch, end), _middle=point._copy())
+
+    @property
+    def geometry(self) -> Arc3D:
+        a, b, c = self.startSketchPoint.geometry, self._middle, self.endSketchPoint.geometry
+        d = 2 * (a.x * (b.y - c.y) + b.x * (c.y - a.y) + c.x * (a.y - b.y))
+        if abs(d) < 1e-300:
+            return Arc3D(Point3D(math.inf, math.inf, a.z), math.inf, 0, 0)
+        ux = ((a.x ** 2 + a.y ** 2) * (b.y - c.y) + (b.x ** 2 + b.y ** 2) * (c.y - a.y) +
+              (c.x ** 2 + c.y ** 2) * (a.y - b.y)) / d
+        uy = ((a.x ** 2 + a.y ** 2) * (c.x - b.x) + (b.x ** 2 + b.y ** 2) * (a.x - c.x) +
+              (c.x ** 2 + c.y ** 2) * (b.x - a.x)) / d
+        center = Point3D(ux, uy, a.z)
+        return Arc3D(center, center._distance(a), math.atan2(a.y - uy, a.x - ux), math.atan2(c.y - uy, c.x - ux))
+
+    def _ends(self):
+        a, b, c = self.startSketchPoint.geometry, self._middle, self.endSketchPoint.geometry
+        return [(a.x, a.y, a.z), (b.x, b.y, b.z), (c.x, c.y, c.z)]
+
+
+class SketchCircles(Collection):
+    def __init__(self, sketch: 'Sketch'):
+        self._init_items()
+        self._init(_sketch=sketch)
+
+    def addByCenterRadius(self, center: Point3D, radius: float) -> SketchCircle:
+        return self._sketch._add_curve(self, SketchCircle(self._sketch, center, radius))
+
+    def addByThreePoints(self, a: Point3D, b: Point3D, c: Point3D) -> SketchCircle:
+        # Circumscribed circle of a triangle in 3D
+        ab = (b.x - a.x, b.y - a.y, b.z - a.z)
+        ac = (c.x - a.x, c.y - a.y, c.z - a.z)
+        n = (ab[1] * ac[2] - ab[2] * ac[1], ab[2] * ac[0] - ab[0] * ac[2], ab[0] * ac[1] - ab[1] * ac[0])
+        n2 = n[0] ** 2 + n[1] ** 2 + n[2] ** 2
+        ab2 = sum(v * v for v in ab)
+        ac2 = sum(v * v for v in ac)
+        # center = a + ((|ab|^2 ac - |ac|^2 ab) x n) / (2 |n|^2)
+        w = tuple(ab2 * ac[i] - ac2 * ab[i] for i in range(3))
+        cross = (w[1] * n[2] - w[2] * n[1], w[2] * n[0] - w[0] * n[2], w[0] * n[1] - w[1] * n[0])
+        center = Point3D(a.x + cross[0] / (2 * n2), a.y + cross[1] / (2 * n2), a.z + cross[2] / (2 * n2))
+        length = math.sqrt(n2)
+        circle = SketchCircle(self._sketch, center, center._distance(a),
+                              Vector3D(n[0] / length, n[1] / length, n[2] / length))
+        return self._sketch._add_curve(self, circle)
+
+
+class SketchFittedSplines(Collection):
+    def __init__(self, sketch: 'Sketch'):
+        self._init_items()
+        self._init(_sketch=sketch)
+
+    def add(self, fit_points: ObjectCollection) -> SketchFittedSpline:
+        return self._sketch._add_curve(self, SketchFittedSpline(self._sketch, list(fit_points)))
+
+
+class SketchLines(Collection):
+    def __init__(self, sketch: 'Sketch'):
+        self._init_items()
+        self._init(_sketch=sketch)
+
+    def addByTwoPoints(self, start, end) -> SketchLine:
+        return self._sketch._add_curve(self, SketchLine(self._sketch, start, end))
+
+    def addCenterPointRectangle(self, center: Point3D, corner: Point3D) -> ObjectCollection:
+        dx, dy = corner.x - center.x, corner.y - center.y
+        corners = [SketchPoint(self._sketch, Point3D(center.x + sx * dx, center.y + sy * dy, corner.z))
+                   for sx, sy in ((-1, -1), (1, -1), (1, 1), (-1, 1))]
+        lines = ObjectCollection()
+        for i in range(4):
+            lines._items.append(self._sketch._add_curve(self, SketchLine(self._sketch, corners[i],
+                                                                         corners[(i + 1) % 4])))
+        return lines
+
+
+class SketchArcs(Collection):
+    def __init__(self, sketch: 'Sketch'):
+        self._init_items()
+        self._init(_sketch=sketch)
+
+    def addByThreePoints(self, start, point: Point3D, end) -> SketchArc:
+        return self._sketch._add_curve(self, SketchArc(self._sketch, start, point, end))
+
+
+class SketchCurves(Base):
+    def __init__(self, sketch: 'Sketch'):
+        self._init(sketchCircles=SketchCircles(sketch), sketchFittedSplines=SketchFittedSplines(sketch),
+                   sketchLines=SketchLines(sketch), sketchArcs=SketchArcs(sketch))
+
+    @property
+    def count(self) -> int:
+        return sum(c.count for c in (self.sketchCircles, self.sketchFittedSplines, self.sketchLines, self.sketchArcs))
+
+
+class ProfileCurve(Base):
+    def __init__(self, entity: SketchCurve):
+        self._init(sketchEntity=entity)
+
+    @property
+    def geometry(self):
+        return self.sketchEntity.geometry
+
+    @property
+    def geometryType(self) -> int:
+        return self.sketchEntity.geometry.curveType
+
+
+class ProfileLoop(Base):
+    def __init__(self, curves: list, is_outer: bool):
+        self._init(profileCurves=ObjectCollection(), isOuter=is_outer)
+        self.profileCurves._items.extend(ProfileCurve(curve) for curve in curves)
+
+
+class ProfileLoops(Collection):
+    def __init__(self, loops: list):
+        self._init_items(loops)
+
+
+class AreaProperties(Base):
+    def __init__(self, area: float, centroid: Point3D):
+        self._init(area=area, centroid=centroid)
+
+
+class Profile(Base):
+    def __init__(self, sketch: 'Sketch', outer: '_Loop', inner: list):
+        self._init(parentSketch=sketch, _outer=outer, _inner=inner)
+        loops = [ProfileLoop(outer.curves, True)] + [ProfileLoop(loop.curves, False) for loop in inner]
+        self._init(profileLoops=ProfileLoops(loops))
+
+    @property
+    def _area(self) -> float:
+        return self._outer.area - sum(loop.area for loop in self._inner)
+
+    @property
+    def boundingBox(self) -> BoundingBox3D:
+        xs = [p[0] for p in self._outer.polygon]
+        ys = [p[1] for p in self._outer.polygon]
+        z = self._outer.z
+        return BoundingBox3D(Point3D(min(xs), min(ys), z), Point3D(max(xs), max(ys), z))
+
+    def areaProperties(self, accuracy: int = 0) -> AreaProperties:
+        box = self.boundingBox
+        center = Point3D((box.minPoint.x + box.maxPoint.x) / 2, (box.minPoint.y + box.maxPoint.y) / 2, self._outer.z)
+        return AreaProperties(self._area, center)
+
+
+class Profiles(Collection):
+    def __init__(self, profiles: list):
+        self._init_items(profiles)
+
+
+class _Loop:
+    def __init__(self, curves: list, polygon: list, z):
+        self.curves = curves
+        self.polygon = polygon
+        # None for loops that are not parallel to the sketch plane
+        self.z = z
+        self.area = abs(_polygon_area(polygon)) if z is not None else 0.0
+
+
+class Sketch(TimelineEntity):
+    def __init__(self, component: Component, plane):
+        self._init(parentComponent=component, referencePlane=plane, _curves=[], _profiles=None,
+                   isComputeDeferred=False, attributes=Attributes())
+        self._init(sketchCurves=SketchCurves(self))
+
+    @property
+    def transform(self) -> Matrix3D:
+        matrix = Matrix3D()
+        matrix._cells[11] = self.referencePlane._z
+        return matrix
+
+    def sketchToModelSpace(self, point: Point3D) -> Point3D:
+        return Point3D(point.x, point.y, point.z + self.referencePlane._z)
+
+    def modelToSketchSpace(self, point: Point3D) -> Point3D:
+        return Point3D(point.x, point.y, point.z - self.referencePlane._z)
+
+    @property
+    def profiles(self) -> Profiles:
+        if self._profiles is None:
+            self._init(_profiles=Profiles(self._compute_profiles()))
+        return self._profiles
+
+    def deleteMe(self) -> bool:
+        self.parentComponent.sketches._items.remove(self)
+        return super().deleteMe()
+
+    def _add_curve(self, collection: Collection, curve: SketchCurve) -> SketchCurve:
+        collection._items.append(curve)
+        curve._init(_collection=collection)
+        self._curves.append(curve)
+        self._changed()
+        return curve
+
+    def _changed(self):
+        self._init(_profiles=None)
+
+    def _loops(self) -> list:
+        loops = []
+        chains = []
+        for curve in self._curves:
+            closed = curve._closed_polygon()
+            if closed is not None:
+                loops.append(_Loop([curve], closed[0], closed[1]))
+                continue
+            ends = curve._ends()
+            if ends is not None:
+                chains.append((curve, ends))
+
+        # Open curves are chained end to end into closed loops
+        def same(a, b):
+            return all(abs(u - v) < POINT_TOLERANCE for u, v in zip(a, b))
+
+        while chains:
+            curve, points = chains.pop(0)
+            curves = [curve]
+            points = list(points)
+            while not same(points[0], points[-1]):
+                for i, (other, other_points) in enumerate(chains):
+                    if same(other_points[0], points[-1]):
+                        points += other_points[1:]
+                    elif same(other_points[-1], points[-1]):
+                        points += list(reversed(other_points))[1:]
+                    else:
+                        continue
+                    curves.append(other)
+                    chains.pop(i)
+                    break
+                else:
+                    break
+            if len(curves) > 1 and same(points[0], points[-1]):
+                flat = all(abs(p[2] - points[0][2]) < POINT_TOLERANCE for p in points)
+                loops.append(_Loop(curves, [(p[0], p[1]) for p in points[:-1]], points[0][2] if flat else None))
+        return loops
+
+    def _compute_profiles(self) -> list:
+        loops = self._loops()
+        profiles = []
+        planar = [loop for loop in loops if loop.z is not None]
+        for loop in loops:
+            if loop.z is None:
+                profiles.append(Profile(self, loop, []))
+                continue
+            children = [other for other in planar if other is not loop and abs(other.z - loop.z) < POINT_TOLERANCE
+                        and other.area < loop.area and _inside(other.polygon[0], loop.polygon)]
+            direct = [child for child in children
+                      if not any(other is not child and child.area < other.area and _inside(child.polygon[0],
+                                                                                          other.polygon)
+                                 for other in children)]
+            profiles.append(Profile(self, loop, direct))
+        profiles.sort(key=lambda profile: -profile._area)
+        return profiles
+
+
+class Sketches(Collection):
+    def __init__(self, component: Component):
+        self._init_items()
+        self._init(_component=component)
+
+    def add(self, plane, occurrence=None) -> Sketch:
+        sketch = Sketch(self._component, plane)
+        sketch._register(self._component.parentDesign, 'Sketch{}'.format(len(self._items) + 1))
+        self._items.append(sketch)
+        return sketch
+
+    def itemByName(self, name: str) -> Sketch:
+        return next((sketch for sketch in self._items if sketch.name == name), None)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Bodies
+
+class BRepFace(Base):
+    def __init__(self, body: 'BRepBody', geometry):
+        self._init(body=body, geometry=geometry)
+
+
+class BRepFaces(Collection):
+    def __init__(self, faces: list):
+        self._init_items(faces)
+
+
+class BRepBody(Base):
+    def __init__(self, surfaces: list, name: str = 'Body'):
+        self._init(name=name, parentComponent=None)
+        self._init(faces=BRepFaces([BRepFace(self, surface) for surface in surfaces]))
+
+    def _copy(self) -> 'BRepBody':
+        return BRepBody([face.geometry for face in self.faces], self.name)
+
+    def deleteMe(self) -> bool:
+        if self.parentComponent is not None:
+            self.parentComponent.bRepBodies._items.remove(self)
+        if self.__dict__.get('_feature') is not None:
+            self._feature._bodies._items.remove(self)
+        self._init(_deleted=True)
+        return True
+
+
+class BRepBodies(Collection):
+    def __init__(self, component: Component = None, bodies: list = None):
+        self._init_items(bodies)
+        self._init(_component=component)
+
+    def add(self, body: BRepBody, base_feature: 'BaseFeature' = None) -> BRepBody:
+        added = body._copy()
+        added._init(parentComponent=self._component)
+        self._items.append(added)
+        if base_feature is not None:
+            base_feature._bodies._items.append(added)
+            added._init(_feature=base_feature)
+        return added
+
+    def itemByName(self, name: str) -> BRepBody:
+        return next((body for body in self._items if body.name == name), None)
+
+
+class TemporaryBRepManager(Base):
+    _instance = None
+
+    @staticmethod
+    def get() -> 'TemporaryBRepManager':
+        if TemporaryBRepManager._instance is None:
+            TemporaryBRepManager._instance = TemporaryBRepManager()
+        return TemporaryBRepManager._instance
+
+    def copy(self, body: BRepBody) -> BRepBody:
+        return body._copy()
+
+    def transform(self, body: BRepBody, transform: Matrix3D) -> bool:
+        return True
+
+    def createSphere(self, center: Point3D, radius: float) -> BRepBody:
+        return BRepBody([Sphere(center, radius)])
+
+
+def _body_surfaces(profiles: list) -> list:
+    surfaces = [Plane(Point3D(), Vector3D(0, 0, 1)), Plane(Point3D(), Vector3D(0, 0, -1))]
+    for profile in profiles:
+        for loop in profile.profileLoops:
+            for curve in loop.profileCurves:
+                geometry = curve.geometry
+                if curve.geometryType == Curve3DTypes.Circle3DCurveType:
+                    surfaces.append(Cylinder(geometry.center, geometry.normal, geometry.radius))
+                elif curve.geometryType == Curve3DTypes.Arc3DCurveType:
+                    surfaces.append(Cylinder(geometry.center, Vector3D(0, 0, 1), geometry.radius))
+                elif curve.geometryType == Curve3DTypes.Line3DCurveType:
+                    surfaces.append(Plane(geometry.startPoint, Vector3D(0, 0, 1)))
+                else:
+                    surfaces.append(NurbsSurface())
+    return surfaces
+
+
+def _connected_groups(profiles: list) -> list:
+    # Profiles sharing a sketch curve end up in the same body
+    groups = []
+    for profile in profiles:
+        curves = {id(c.sketchEntity) for loop in profile.profileLoops for c in loop.profileCurves}
+        touching = [group for group in groups if group[1] & curves]
+        merged = ([profile], curves)
+        for group in touching:
+            groups.remove(group)
+            merged = (group[0] + merged[0], group[1] | merged[1])
+        groups.append(merged)
+    return [group[0] for group in groups]
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Features
+
+class ModelParameter(Base):
+    def __init__(self, value: float = 0.0, expression: str = ''):
+        self._init(value=value, expression=expression or str(value))
+
+
+class DistanceExtentDefinition(Base):
+    def __init__(self, distance):
+        self._init(distance=distance)
+
+    @staticmethod
+    def create(distance) -> 'DistanceExtentDefinition':
+        return DistanceExtentDefinition(ModelParameter(distance.realValue if distance.realValue is not None else 0.0,
+                                                       distance.stringValue or ''))
+
+
+class Feature(TimelineEntity):
+    def _setup(self, component: Component, bodies: list = None):
+        self._init(parentComponent=component, _bodies=BRepBodies(component, bodies), healthState=0)
+
+    @property
+    def bodies(self) -> BRepBodies:
+        if self._design.isComputeDeferred:
+            raise RuntimeError('{} is not computed while the compute of the design is deferred'.format(self.name))
+        return self._bodies
+
+    def _add_new_bodies(self, profiles: list, operation: int, name: str):
+        if operation != FeatureOperations.NewBodyFeatureOperation:
+            return
+        for group in _connected_groups(profiles):
+            body = BRepBody(_body_surfaces(group), '{}{}'.format(name, self.parentComponent.bRepBodies.count + 1))
+            body._init(parentComponent=self.parentComponent)
+            self.parentComponent.bRepBodies._items.append(body)
+            self._bodies._items.append(body)
+
+    def deleteMe(self) -> bool:
+        self.parentComponent.features._all.remove(self)
+        self._collection._items.remove(self)
+        for body in list(self._bodies):
+            if body in self.parentComponent.bRepBodies._items:
+                body.deleteMe()
+        return super().deleteMe()
+
+
+def _profile_list(profiles) -> list:
+    if isinstance(profiles, (ObjectCollection, list)):
+        return list(profiles)
+    return [profiles]
+
+
+class ExtrudeFeatureInput(Base):
+    def __init__(self, profiles, operation: int):
+        self._init(profile=profiles, operation=operation, _extent=None, _direction=None, _symmetric=False,
+                   startExtent=None, participantBodies=[])
+
+    def setOneSideExtent(self, extent, direction: int, taper_angle=None) -> bool:
+        self._init(_extent=extent, _direction=direction)
+        return True
+
+    def setDistanceExtent(self, is_symmetric: bool, distance) -> bool:
+        self._init(_extent=DistanceExtentDefinition.create(distance), _symmetric=is_symmetric)
+        return True
+
+    def setSymmetricExtent(self, distance, is_full_length: bool, taper_angle=None) -> bool:
+        self._init(_extent=DistanceExtentDefinition.create(distance), _symmetric=True)
+        return True
+
+
+class ExtrudeFeature(Feature):
+    def __init__(self, component: Component, feature_input: ExtrudeFeatureInput):
+        self._setup(component)
+        self._init(profile=feature_input.profile, operation=feature_input.operation, extentOne=feature_input._extent,
+                   startExtent=feature_input.startExtent)
+
+
+class ExtrudeFeatures(Collection):
+    def __init__(self, features: 'Features'):
+        self._init_items()
+        self._init(_features=features)
+
+    def createInput(self, profiles, operation: int) -> ExtrudeFeatureInput:
+        return ExtrudeFeatureInput(profiles, operation)
+
+    def add(self, feature_input: ExtrudeFeatureInput) -> ExtrudeFeature:
+        feature = ExtrudeFeature(self._features._component, feature_input)
+        self._features._add(self, feature, 'Extrude')
+        feature._add_new_bodies(_profile_list(feature_input.profile), feature_input.operation, 'Body')
+        return feature
+
+    def addSimple(self, profiles, distance, operation: int) -> ExtrudeFeature:
+        feature_input = ExtrudeFeatureInput(profiles, operation)
+        feature_input._init(_extent=DistanceExtentDefinition.create(distance))
+        feature = ExtrudeFeature(self._features._component, feature_input)
+        self._features._add(self, feature, 'Extrude')
+        feature._add_new_bodies(_profile_list(profiles), operation, 'Body')
+        return feature
+
+    def itemByName(self, name: str) -> ExtrudeFeature:
+        return next((feature for feature in self._items if feature.name == name), None)
+
+
+class RevolveFeatureInput(Base):
+    def __init__(self, profile, axis, operation: int):
+        self._init(profile=profile, axis=axis, operation=operation, _angle=None)
+
+    def setAngleExtent(self, is_symmetric: bool, angle) -> bool:
+        self._init(_angle=angle)
+        return True
+
+
+class RevolveFeature(Feature):
+    def __init__(self, component: Component, feature_input: RevolveFeatureInput):
+        self._setup(component)
+        self._init(profile=feature_input.profile, operation=feature_input.operation)
+
+
+class RevolveFeatures(Collection):
+    def __init__(self, features: 'Features'):
+        self._init_items()
+        self._init(_features=features)
+
+    def createInput(self, profile, axis, operation: int) -> RevolveFeatureInput:
+        return RevolveFeatureInput(profile, axis, operation)
+
+    def add(self, feature_input: RevolveFeatureInput) -> RevolveFeature:
+        feature = RevolveFeature(self._features._component, feature_input)
+        self._features._add(self, feature, 'Revolve')
+        if feature_input.operation == FeatureOperations.NewBodyFeatureOperation:
+            center = Point3D()
+            for profile in _profile_list(feature_input.profile):
+                curve = profile.profileLoops.item(0).profileCurves.item(0)
+                if curve.geometryType == Curve3DTypes.Circle3DCurveType:
+                    center = curve.geometry.center
+            body = BRepBody([Sphere(center, 0.0)], 'Body{}'.format(feature.parentComponent.bRepBodies.count + 1))
+            body._init(parentComponent=feature.parentComponent)
+            feature.parentComponent.bRepBodies._items.append(body)
+            feature._bodies._items.append(body)
+        return feature
+
+    def itemByName(self, name: str) -> RevolveFeature:
+        return next((feature for feature in self._items if feature.name == name), None)
+
+
+class CircularPatternFeatureInput(Base):
+    def __init__(self, entities: ObjectCollection, axis):
+        self._init(inputEntities=entities, axis=axis, quantity=None, totalAngle=None, isSymmetric=True)
+
+
+class CircularPatternFeature(Feature):
+    def __init__(self, component: Component, feature_input: CircularPatternFeatureInput):
+        self._setup(component)
+        quantity = feature_input.quantity
+        self._init(inputEntities=feature_input.inputEntities, axis=feature_input.axis,
+                   quantity=ModelParameter(quantity.realValue if quantity is not None else 1.0))
+
+
+class CircularPatternFeatures(Collection):
+    def __init__(self, features: 'Features'):
+        self._init_items()
+        self._init(_features=features)
+
+    def createInput(self, entities: ObjectCollection, axis) -> CircularPatternFeatureInput:
+        return CircularPatternFeatureInput(entities, axis)
+
+    def add(self, feature_input: CircularPatternFeatureInput) -> CircularPatternFeature:
+        feature = CircularPatternFeature(self._features._component, feature_input)
+        self._features._add(self, feature, 'CircularPattern')
+        return feature
+
+    def itemByName(self, name: str) -> CircularPatternFeature:
+        return next((feature for feature in self._items if feature.name == name), None)
+
+
+class BaseFeature(Feature):
+    def __init__(self, component: Component):
+        self._setup(component)
+        self._init(_editing=False)
+
+    def startEdit(self) -> bool:
+        self._init(_editing=True)
+        return True
+
+    def finishEdit(self) -> bool:
+        self._init(_editing=False)
+        return True
+
+
+class BaseFeatures(Collection):
+    def __init__(self, features: 'Features'):
+        self._init_items()
+        self._init(_features=features)
+
+    def add(self) -> BaseFeature:
+        feature = BaseFeature(self._features._component)
+        self._features._add(self, feature, 'BaseFeature')
+        return feature
+
+    def itemByName(self, name: str) -> BaseFeature:
+        return next((feature for feature in self._items if feature.name == name), None)
+
+
+class Features(Base):
+    def __init__(self, component: Component):
+        self._init(_component=component, _all=[])
+        self._init(extrudeFeatures=ExtrudeFeatures(self), revolveFeatures=RevolveFeatures(self),
+                   circularPatternFeatures=CircularPatternFeatures(self), baseFeatures=BaseFeatures(self))
+
+    def _add(self, collection: Collection, feature: Feature, name: str):
+        feature._register(self._component.parentDesign, '{}{}'.format(name, collection.count + 1))
+        feature._init(_collection=collection)
+        collection._items.append(feature)
+        self._all.append(feature)
+
+    @property
+    def count(self) -> int:
+        return len(self._all)
+
+    def item(self, index: int) -> Feature:
+        return self._all[index]
+
+    def itemByName(self, name: str) -> Feature:
+        return next((feature for feature in self._all if feature.name == name), None)